@@ -2,20 +2,47 @@
 
 import os
 import sys
-from functools import lru_cache
+import threading
 
 # Add project root to path so we can import from src
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from src.github_client import GitHubClient
+from src.async_github_client import AsyncGitHubClient
+from src.shared_cache import SharedCache
 
 
-# WHY @lru_cache as singleton: FastAPI calls dependency functions on every request.
-# lru_cache ensures only one GitHubClient (and one PyGithub connection) exists,
-# avoiding redundant token validation and object creation. No need for a DI
-# container — the stdlib does the job.
-@lru_cache()
-def get_github_client() -> GitHubClient:
-    """Create and cache a GitHubClient instance."""
-    token = os.environ.get("GITHUB_TOKEN")
-    return GitHubClient(token=token)
+# WHY a lock-guarded singleton: FastAPI calls dependency functions on every
+# request, so only one AsyncGitHubClient (and one connection pool) may exist
+# for keep-alive connections and the response cache to be shared. Sync
+# dependencies run in FastAPI's threadpool; a bare @lru_cache let a burst of
+# first requests each build their own client, each with a cold cache.
+_client: AsyncGitHubClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_github_client() -> AsyncGitHubClient:
+    """Create (once) and return the shared AsyncGitHubClient instance.
+
+    When REDIS_URL is set, replicas share a Redis cache tier behind each
+    process's in-memory cache (``memory://`` uses an in-process stand-in).
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                token = os.environ.get("GITHUB_TOKEN")
+                _client = AsyncGitHubClient(token=token, shared_cache=SharedCache.from_env())
+    return _client
+
+
+def current_github_client() -> AsyncGitHubClient | None:
+    """Return the shared client if one was created, without creating it."""
+    return _client
+
+
+async def close_github_client() -> None:
+    """Close the shared client's connection pool, if one was created."""
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
@@ -2,6 +2,7 @@
 
 import os
 import sys
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 
@@ -10,17 +11,53 @@ load_dotenv()
 # Add project root to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from src.github_client import AuthenticationError
+from src.metrics import register_client_collector
+from src.watchlist import WatchlistRefresher
+
+from .dependencies import close_github_client, current_github_client, get_github_client
+from .metrics import MetricsMiddleware, ServerTimingMiddleware, TimedJSONResponse
 from .models import HealthResponse
 from .routes import router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the GitHub client, start the watchlist prefetcher (if configured)
+    and release the shared connection pool on shutdown."""
+    # Build the client before the pod reports ready: the first one loads
+    # httpcore's HTTP/2 stack and a TLS context (~0.1 s), which would
+    # otherwise land on the first request after a scale-out. Without a token
+    # the gateway still starts and requests report the error as before.
+    try:
+        get_github_client()
+    except AuthenticationError:
+        pass
+    # Read cache and rate-limit stats at scrape time; never create the client
+    # just to report on it.
+    register_client_collector(current_github_client)
+    refresher = WatchlistRefresher.from_env(get_github_client)
+    if refresher is not None:
+        refresher.start()
+    yield
+    if refresher is not None:
+        await refresher.aclose()
+    await close_github_client()
+
+
 app = FastAPI(
     title="GitHub Analytics API",
     description="REST API wrapper for GitHub Analytics MCP Server",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
 )
 
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(router)
 
 
@@ -28,3 +65,9 @@ app.include_router(router)
 def health_check():
     """Health check endpoint."""
     return HealthResponse()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus metrics in the text exposition format."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,100 @@
+"""Request instrumentation for the FastAPI gateway.
+
+Prometheus metrics, per-request ``Server-Timing`` breakdowns and the
+slow-request profiler.
+"""
+
+import time
+from contextlib import nullcontext
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, serialization_timer
+from src.profiling import SlowRequestProfiler
+from src.timing import TIMING_ENABLED, request_timing, timed_phase
+
+
+class MetricsMiddleware:
+    """Record latency per route template and the number of in-flight requests.
+
+    WHY a plain ASGI middleware rather than ``@app.middleware("http")``: the
+    decorator form wraps responses in an extra stream and stops the clock when
+    headers are sent, so a streamed NDJSON export would look instantaneous.
+    Timing until the final body chunk measures what the client waited for.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # Label by route template, never the raw path: one series per
+            # endpoint instead of one per repository.
+            route = scope.get("route")
+            HTTP_LATENCY.labels(
+                getattr(route, "path", "unmatched"), scope["method"], str(status)
+            ).observe(time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """Add a ``Server-Timing`` header and profile slow requests.
+
+    With ``REQUEST_TIMING=1`` every response carries the request's phases:
+    ``cache`` (in-process lookups), ``fill`` (cache misses, including the
+    shared cache and GitHub), ``throttle`` (waiting for rate-limit budget),
+    ``upstream`` (GitHub calls), ``analytics`` (NumPy aggregation),
+    ``model`` (response model construction), ``encode`` (JSON encoding) and
+    ``total``, plus cache hit/miss counts.
+    Browsers show the header in their network panel; ``curl -v`` prints it.
+
+    With ``REQUEST_PROFILE_THRESHOLD_MS`` set, requests slower than the
+    threshold leave a folded-stack file in ``REQUEST_PROFILE_DIR``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.profiler = SlowRequestProfiler.from_env()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (not TIMING_ENABLED and self.profiler is None):
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.profile(scope["path"]) if self.profiler else nullcontext()
+        with request_timing() as timing, profile:
+
+            async def send_wrapper(message: Message) -> None:
+                # Every phase before the body is sent has finished by now;
+                # streamed exports report time to first byte.
+                if message["type"] == "http.response.start" and timing is not None:
+                    MutableHeaders(scope=message).append("Server-Timing", timing.server_timing())
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records how long encoding the body took."""
+
+    def render(self, content) -> bytes:
+        with serialization_timer("api"), timed_phase("encode"):
+            return super().render(content)
@@ -35,6 +35,7 @@ class CommitsResponse(BaseModel):
     branch: str
     limit: int
     commits: list[CommitItem]
+    next_cursor: str | None = None
 
 
 class ContributorItem(BaseModel):
@@ -42,12 +43,15 @@ class ContributorItem(BaseModel):
     contributions: int
     avatar_url: str
     profile_url: str
+    additions: int | None = None
+    deletions: int | None = None
 
 
 class ContributorsResponse(BaseModel):
     repository: str
     top_n: int
     contributors: list[ContributorItem]
+    line_stats_pending: bool = False
 
 
 class LanguagesResponse(BaseModel):
@@ -55,6 +59,106 @@ class LanguagesResponse(BaseModel):
     languages: dict[str, float]
 
 
+class LanguageShareItem(BaseModel):
+    language: str
+    bytes: int
+    share: float
+    mean_share: float
+    repositories: int
+    primary: int
+
+
+class OtherLanguagesItem(BaseModel):
+    languages: int
+    bytes: int
+    share: float
+
+
+class RepoErrorItem(BaseModel):
+    repository: str
+    error: str
+
+
+class LanguageAggregateResponse(BaseModel):
+    org: str | None = None
+    topic: str | None = None
+    requested: int
+    analyzed: int
+    repositories: int
+    total_bytes: int
+    languages: list[LanguageShareItem]
+    other: OtherLanguagesItem
+    failed: list[RepoErrorItem]
+
+
+class SeriesItem(BaseModel):
+    start: str
+    counts: list[int]
+
+
+class ActivityResponse(BaseModel):
+    repository: str
+    branch: str | None = None
+    days: int
+    truncated: bool
+    total_commits: int
+    first_commit: str | None = None
+    last_commit: str | None = None
+    days_since_last_commit: float | None = None
+    active_days: int
+    average_per_week: float
+    daily: SeriesItem
+    rolling_average: list[float]
+    weekly: SeriesItem
+    weekday: dict[str, int]
+    last_28_days: int
+    previous_28_days: int
+
+
+class AuthorShareItem(BaseModel):
+    author: str
+    commits: int
+    share: float
+    last_commit: str
+
+
+class ConcentrationResponse(BaseModel):
+    repository: str
+    branch: str | None = None
+    days: int
+    truncated: bool
+    total_commits: int
+    authors: int
+    active_authors: int
+    bus_factor: int
+    top_share: float
+    hhi: float
+    gini: float
+    top_authors: list[AuthorShareItem]
+
+
+class RepoRef(BaseModel):
+    owner: str
+    repo: str
+
+
+class BatchStatsRequest(BaseModel):
+    repositories: list[RepoRef] = Field(min_length=1, max_length=500)
+
+
+class BatchStatsItem(BaseModel):
+    repository: str
+    status_code: int
+    stats: RepoStatsResponse | None = None
+    error: str | None = None
+
+
+class BatchStatsResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: list[BatchStatsItem]
+
+
 class ErrorResponse(BaseModel):
     error: str
     detail: str = ""
@@ -1,20 +1,45 @@
 """API route definitions."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+import os
+from datetime import datetime
+from functools import partial
+from typing import AsyncIterator
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
+from src.async_github_client import AsyncGitHubClient
+from src.cache import current_freshness
+from src.executor import gather_bounded
+from src.timing import timed_phase
+from src.tools.commits import commit_activity
+from src.tools.contributors import author_concentration
+from src.tools.languages import (
+    MAX_AGGREGATE_REPOSITORIES,
+    aggregate_language_bytes,
+    collect_language_bytes,
+    resolve_repositories,
+)
 from src.github_client import (
-    GitHubClient,
     GitHubClientError,
     RepositoryNotFoundError,
     AuthenticationError,
     RateLimitError,
+    StatisticsPendingError,
 )
 
 from .dependencies import get_github_client
 from .models import (
+    ActivityResponse,
+    BatchStatsItem,
+    BatchStatsRequest,
+    BatchStatsResponse,
     RepoStatsResponse,
     CommitsResponse,
+    ConcentrationResponse,
     ContributorsResponse,
+    LanguageAggregateResponse,
     LanguagesResponse,
 )
 
@@ -22,6 +47,24 @@ from .models import (
 # at /api/v2 while v1 continues serving existing consumers.
 router = APIRouter(prefix="/api/v1")
 
+# Upstream calls a single batch request may have in flight at once. Kept at or
+# below GITHUB_MAX_CONNECTIONS so one batch cannot starve other requests.
+BATCH_CONCURRENCY = int(os.environ.get("API_BATCH_CONCURRENCY", "16"))
+
+
+def error_status_code(e: GitHubClientError) -> int:
+    """Map a domain error to its HTTP status code."""
+    if isinstance(e, RepositoryNotFoundError):
+        return 404
+    elif isinstance(e, AuthenticationError):
+        return 401
+    elif isinstance(e, RateLimitError):
+        return 429
+    elif isinstance(e, StatisticsPendingError):
+        return 503
+    else:
+        return 502
+
 
 def handle_github_error(e: GitHubClientError):
     """Convert GitHubClientError to HTTPException.
@@ -30,85 +73,335 @@ def handle_github_error(e: GitHubClientError):
     semantics. This bridge maps each domain error to the correct HTTP status code
     so route handlers stay clean. See docs/adr/ADR-002-exception-hierarchy.md.
     """
-    if isinstance(e, RepositoryNotFoundError):
-        raise HTTPException(status_code=404, detail=str(e))
-    elif isinstance(e, AuthenticationError):
-        raise HTTPException(status_code=401, detail=str(e))
-    elif isinstance(e, RateLimitError):
-        raise HTTPException(status_code=429, detail=str(e))
-    else:
-        raise HTTPException(status_code=502, detail=str(e))
+    headers = None
+    if isinstance(e, RateLimitError) and e.retry_after:
+        headers = {"Retry-After": str(e.retry_after)}
+    raise HTTPException(status_code=error_status_code(e), detail=str(e), headers=headers)
+
+
+def set_age_header(response: Response) -> None:
+    """Expose how old the served data is as an HTTP ``Age`` header.
+
+    WHY: with stale-while-revalidate enabled, a response may be served from an
+    expired cache entry while a background task refreshes it. ``Age`` (RFC 9111)
+    lets clients and proxies see exactly how old the data is.
+    """
+    freshness = current_freshness()
+    if freshness is not None:
+        response.headers["Age"] = str(int(freshness.age))
 
 
 @router.get("/repo/{owner}/{repo}/stats", response_model=RepoStatsResponse)
-def get_repo_stats(
+async def get_repo_stats(
     owner: str,
     repo: str,
-    client: GitHubClient = Depends(get_github_client),
+    response: Response,
+    client: AsyncGitHubClient = Depends(get_github_client),
 ):
     """Get repository statistics."""
     try:
-        stats = client.get_repo_statistics(owner, repo)
-        return RepoStatsResponse(
-            repository=f"{owner}/{repo}",
-            **stats,
-        )
+        stats = await client.get_repo_statistics(owner, repo)
+        set_age_header(response)
+        with timed_phase("model"):
+            return RepoStatsResponse(
+                repository=f"{owner}/{repo}",
+                **stats,
+            )
     except GitHubClientError as e:
         handle_github_error(e)
 
 
+@router.post("/repos/stats:batch", response_model=BatchStatsResponse)
+async def get_repo_stats_batch(
+    body: BatchStatsRequest,
+    client: AsyncGitHubClient = Depends(get_github_client),
+):
+    """Get statistics for many repositories in one request.
+
+    Repositories are fetched concurrently (bounded by API_BATCH_CONCURRENCY)
+    through the same cache as the single-repo endpoint. Failures are reported
+    per repository; one bad repository does not fail the batch.
+    """
+    results = await gather_bounded(
+        [partial(client.get_repo_statistics, r.owner, r.repo) for r in body.repositories],
+        limit=BATCH_CONCURRENCY,
+    )
+
+    items = []
+    for ref, result in zip(body.repositories, results):
+        repository = f"{ref.owner}/{ref.repo}"
+        if isinstance(result, GitHubClientError):
+            items.append(BatchStatsItem(
+                repository=repository,
+                status_code=error_status_code(result),
+                error=str(result),
+            ))
+        elif isinstance(result, Exception):
+            raise result
+        else:
+            items.append(BatchStatsItem(
+                repository=repository,
+                status_code=200,
+                stats=RepoStatsResponse(repository=repository, **result),
+            ))
+
+    succeeded = sum(1 for item in items if item.stats is not None)
+    with timed_phase("model"):
+        return BatchStatsResponse(
+            succeeded=succeeded,
+            failed=len(items) - succeeded,
+            results=items,
+        )
+
+
 @router.get("/repo/{owner}/{repo}/commits", response_model=CommitsResponse)
-def get_commits(
+async def get_commits(
     owner: str,
     repo: str,
+    response: Response,
     limit: int = Query(default=10, ge=1, le=100),
     branch: str | None = Query(default=None),
-    client: GitHubClient = Depends(get_github_client),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    path: str | None = Query(default=None),
+    cursor: str | None = Query(default=None),
+    client: AsyncGitHubClient = Depends(get_github_client),
 ):
-    """Get recent commits."""
+    """Get recent commits.
+
+    Pass the returned `next_cursor` as `cursor` to fetch the next page; the
+    cursor carries the page size, branch and filters of the first request.
+    """
     try:
-        commits = client.get_recent_commits(owner, repo, limit=limit, branch=branch)
-        return CommitsResponse(
-            repository=f"{owner}/{repo}",
-            branch=branch or "default",
+        page = await client.get_commit_page(
+            owner,
+            repo,
             limit=limit,
-            commits=commits,
+            branch=branch,
+            since=since.isoformat() if since else None,
+            until=until.isoformat() if until else None,
+            path=path,
+            cursor=cursor,
         )
+        set_age_header(response)
+        with timed_phase("model"):
+            return CommitsResponse(
+                repository=f"{owner}/{repo}",
+                branch=page["branch"] or "default",
+                limit=page["limit"],
+                commits=page["commits"],
+                next_cursor=page["next_cursor"],
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except GitHubClientError as e:
+        handle_github_error(e)
+
+
+@router.get("/repo/{owner}/{repo}/commits/export")
+async def export_commits(
+    owner: str,
+    repo: str,
+    branch: str | None = Query(default=None),
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    path: str | None = Query(default=None),
+    after: str | None = Query(default=None, description="Resume after this commit SHA"),
+    client: AsyncGitHubClient = Depends(get_github_client),
+):
+    """Stream the full commit history as NDJSON (one commit object per line).
+
+    WHY streaming instead of CommitsResponse: an audit export can be tens of
+    thousands of commits. Building and validating that list before sending a
+    byte costs memory proportional to the history and delays the first byte
+    until the last upstream page. Here each upstream page is written as soon
+    as it arrives, and the next page is only fetched once the client has
+    consumed the current one, so memory stays at about two pages.
+
+    If the stream fails midway, the last line is an error object whose
+    `resume_after` can be passed back as `after` to continue.
+    """
+    pages = client.iter_commit_pages(
+        owner,
+        repo,
+        branch=branch,
+        since=since.isoformat() if since else None,
+        until=until.isoformat() if until else None,
+        path=path,
+        after=after,
+    )
+    # Fetch the first page before responding so a missing repository or an
+    # exhausted rate limit is still reported with a proper status code.
+    try:
+        first = await anext(pages)
     except GitHubClientError as e:
+        await pages.aclose()
         handle_github_error(e)
 
+    return StreamingResponse(
+        _ndjson_commits(first, pages, resume_after=after),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _ndjson_commits(
+    first: list[dict],
+    pages: AsyncIterator[list[dict]],
+    resume_after: str | None,
+) -> AsyncIterator[bytes]:
+    """Encode commit pages as NDJSON chunks, ending with an error line on failure."""
+    page = first
+    try:
+        while True:
+            if page:
+                resume_after = page[-1]["sha"]
+                yield "".join(
+                    json.dumps(commit, ensure_ascii=False) + "\n" for commit in page
+                ).encode()
+            page = await anext(pages)
+    except StopAsyncIteration:
+        return
+    except GitHubClientError as e:
+        error: dict = {"error": str(e), "resume_after": resume_after}
+        if isinstance(e, RateLimitError) and e.retry_after:
+            error["retry_after_seconds"] = e.retry_after
+        yield (json.dumps(error) + "\n").encode()
+    finally:
+        await pages.aclose()
+
 
 @router.get("/repo/{owner}/{repo}/contributors", response_model=ContributorsResponse)
-def get_contributors(
+async def get_contributors(
     owner: str,
     repo: str,
+    response: Response,
     top_n: int = Query(default=10, ge=1, le=100),
-    client: GitHubClient = Depends(get_github_client),
+    client: AsyncGitHubClient = Depends(get_github_client),
 ):
     """Get top contributors."""
     try:
-        contributors = client.get_contributors_stats(owner, repo, top_n=top_n)
-        return ContributorsResponse(
-            repository=f"{owner}/{repo}",
-            top_n=top_n,
-            contributors=contributors,
-        )
+        stats = await client.get_contributor_line_stats(owner, repo, top_n=top_n)
+        set_age_header(response)
+        with timed_phase("model"):
+            return ContributorsResponse(
+                repository=f"{owner}/{repo}",
+                top_n=top_n,
+                **stats,
+            )
+    except GitHubClientError as e:
+        handle_github_error(e)
+
+
+@router.get("/repo/{owner}/{repo}/contributors/concentration", response_model=ConcentrationResponse)
+async def get_contributor_concentration(
+    owner: str,
+    repo: str,
+    response: Response,
+    branch: str | None = Query(default=None),
+    days: int = Query(default=365, ge=1, le=3650),
+    top_n: int = Query(default=10, ge=1, le=100),
+    client: AsyncGitHubClient = Depends(get_github_client),
+):
+    """Get how concentrated commits are among authors (bus factor, HHI, Gini)."""
+    try:
+        timeline = await client.get_commit_timeline(owner, repo, branch=branch, days=days)
+        set_age_header(response)
+        with timed_phase("analytics"):
+            concentration = author_concentration(timeline, top_n=top_n)
+        with timed_phase("model"):
+            return ConcentrationResponse(
+                repository=f"{owner}/{repo}",
+                branch=branch,
+                days=days,
+                truncated=timeline["truncated"],
+                **concentration,
+            )
+    except GitHubClientError as e:
+        handle_github_error(e)
+
+
+@router.get("/repo/{owner}/{repo}/activity", response_model=ActivityResponse)
+async def get_activity(
+    owner: str,
+    repo: str,
+    response: Response,
+    branch: str | None = Query(default=None),
+    days: int = Query(default=365, ge=1, le=3650),
+    client: AsyncGitHubClient = Depends(get_github_client),
+):
+    """Get daily/weekly commit activity with a 7-day rolling average."""
+    try:
+        timeline = await client.get_commit_timeline(owner, repo, branch=branch, days=days)
+        set_age_header(response)
+        with timed_phase("analytics"):
+            activity = commit_activity(timeline)
+        with timed_phase("model"):
+            return ActivityResponse(
+                repository=f"{owner}/{repo}",
+                branch=branch,
+                days=days,
+                truncated=timeline["truncated"],
+                **activity,
+            )
     except GitHubClientError as e:
         handle_github_error(e)
 
 
 @router.get("/repo/{owner}/{repo}/languages", response_model=LanguagesResponse)
-def get_languages(
+async def get_languages(
     owner: str,
     repo: str,
-    client: GitHubClient = Depends(get_github_client),
+    response: Response,
+    client: AsyncGitHubClient = Depends(get_github_client),
 ):
     """Get language breakdown."""
     try:
-        languages = client.get_languages(owner, repo)
-        return LanguagesResponse(
-            repository=f"{owner}/{repo}",
-            languages=languages,
+        languages = await client.get_languages(owner, repo)
+        set_age_header(response)
+        with timed_phase("model"):
+            return LanguagesResponse(
+                repository=f"{owner}/{repo}",
+                languages=languages,
+            )
+    except GitHubClientError as e:
+        handle_github_error(e)
+
+
+@router.get("/languages/aggregate", response_model=LanguageAggregateResponse)
+async def aggregate_languages(
+    org: str | None = Query(default=None),
+    topic: str | None = Query(default=None),
+    repo: list[str] = Query(default=[], description="owner/repo; repeat for several"),
+    limit: int = Query(default=100, ge=1, le=MAX_AGGREGATE_REPOSITORIES),
+    top_n: int = Query(default=15, ge=1, le=100),
+    include_forks: bool = Query(default=False),
+    client: AsyncGitHubClient = Depends(get_github_client),
+):
+    """Aggregate language share across an org, a topic or a list of repositories.
+
+    Shares are weighted by bytes of code. Per-repository byte counts are cached,
+    and simultaneous cache misses are merged into GraphQL batches by the client.
+    """
+    try:
+        targets = await resolve_repositories(
+            client, org, topic, repo or None, limit=limit, include_forks=include_forks
+        )
+        names, byte_counts, failed = await collect_language_bytes(
+            client, targets, BATCH_CONCURRENCY
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except GitHubClientError as e:
         handle_github_error(e)
+
+    with timed_phase("analytics"):
+        aggregate = aggregate_language_bytes(byte_counts, top_n=top_n)
+    with timed_phase("model"):
+        return LanguageAggregateResponse(
+            org=org,
+            topic=topic,
+            requested=len(targets),
+            analyzed=len(names),
+            failed=failed,
+            **aggregate,
+        )
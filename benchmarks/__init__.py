@@ -0,0 +1 @@
+"""Offline benchmarks: a fake GitHub API and a harness that drives the API and MCP tools."""
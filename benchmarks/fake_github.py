@@ -0,0 +1,447 @@
+"""A local stand-in for the GitHub API, served from fixtures.
+
+``FakeGitHub`` runs a real HTTP server on 127.0.0.1 in a background thread,
+so requests go through the client's connection pool, headers and JSON
+decoding exactly as they do against api.github.com. It implements the
+endpoints the client uses:
+
+- REST: repository, languages, contributors, commits (paginated, with
+  ``sha``/``since``/``until``), contributor statistics, owner repository
+  listings and topic search
+- GraphQL: the aliased batch queries built by ``src.graphql_batch``
+- Pagination ``Link`` headers, ``ETag``/``If-None-Match`` (304s are free, as
+  on GitHub) and ``X-RateLimit-*`` headers with a per-token, per-resource
+  budget that answers 403 once spent
+
+Every request is counted by route template so a benchmark can report how
+many upstream calls each tool made.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+DEFAULT_RATE_LIMITS = {"core": 5000, "search": 30, "graphql": 5000}
+RATE_LIMIT_WINDOW = 3600
+
+_REPO_PATH = re.compile(r"^/repos/([^/]+)/([^/]+)(/.*)?$")
+_GRAPHQL_REPOSITORY = re.compile(
+    r'(r\d+): repository\(owner: ("(?:[^"\\]|\\.)*"), name: ("(?:[^"\\]|\\.)*")\) \{(.*?)\n  \}',
+    re.DOTALL,
+)
+_GRAPHQL_HISTORY = re.compile(
+    r'(h\d+): (?:object\(expression: ("(?:[^"\\]|\\.)*")\)|defaultBranchRef)'
+    r".*?history\(first: (\d+)\)"
+)
+
+
+class _Response(Exception):
+    """Raised by route handlers to answer with a status, body and headers."""
+
+    def __init__(self, status: int, body: Any = None, headers: dict | None = None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+def _not_found() -> _Response:
+    return _Response(404, {
+        "message": "Not Found",
+        "documentation_url": "https://docs.github.com/rest",
+    })
+
+
+def _int_param(query: dict, name: str, default: int) -> int:
+    try:
+        return int(query.get(name, default))
+    except ValueError:
+        raise _Response(422, {"message": f"Invalid {name}"})
+
+
+class FakeGitHub:
+    """Fake GitHub API server.
+
+    Attributes:
+        url: base URL to use as GITHUB_API_URL
+        calls: requests served, keyed by ``METHOD /route/{template}``
+        not_modified: conditional requests answered with 304
+        rate_limited: requests refused because the budget was spent
+    """
+
+    def __init__(
+        self,
+        fixtures: dict[str, dict],
+        latency_ms: float = 50.0,
+        jitter_ms: float = 0.0,
+        rate_limits: dict[str, int] | None = None,
+        seed: int = 0,
+    ):
+        """Create the server (call ``start()`` or use it as a context manager).
+
+        Args:
+            fixtures: ``owner/repo`` -> fixture (see benchmarks.fixtures)
+            latency_ms: delay added to every response
+            jitter_ms: extra uniformly distributed delay, 0 to jitter_ms
+            rate_limits: budget per resource (core, search, graphql)
+            seed: seed for the jitter
+        """
+        self.fixtures = {name.lower(): fixture for name, fixture in fixtures.items()}
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self.calls: Counter = Counter()
+        self.not_modified = 0
+        self.rate_limited = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._used: Counter = Counter()
+        self._reset_at = int(time.time()) + RATE_LIMIT_WINDOW
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+        self._owners: dict[str, list[dict]] = {}
+        for fixture in self.fixtures.values():
+            owner = fixture["repository"]["owner"]["login"].lower()
+            self._owners.setdefault(owner, []).append(fixture["repository"])
+        for repositories in self._owners.values():
+            repositories.sort(key=lambda r: r.get("pushed_at") or "", reverse=True)
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self) -> "FakeGitHub":
+        fake = self
+
+        class Handler(_Handler):
+            server_fake = fake
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-github", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeGitHub":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self) -> None:
+        """Clear call counters and refill every rate-limit budget."""
+        with self._lock:
+            self.calls.clear()
+            self.not_modified = 0
+            self.rate_limited = 0
+            self._used.clear()
+            self._reset_at = int(time.time()) + RATE_LIMIT_WINDOW
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    # -- request handling ----------------------------------------------------
+
+    def _delay(self) -> float:
+        with self._lock:
+            return self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _spend(self, token: str, resource: str, cost: int) -> dict[str, str]:
+        """Charge the budget and return the rate-limit headers for the response."""
+        with self._lock:
+            limit = self.rate_limits[resource]
+            used = self._used[token, resource]
+            allowed = used + cost <= limit
+            if allowed:
+                used = self._used[token, resource] = used + cost
+            else:
+                self.rate_limited += 1
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(max(0, limit - used)),
+            "X-RateLimit-Used": str(used),
+            "X-RateLimit-Reset": str(self._reset_at),
+            "X-RateLimit-Resource": resource,
+        }
+        if not allowed:
+            raise _Response(403, {
+                "message": "API rate limit exceeded",
+                "documentation_url": "https://docs.github.com/rest/rate-limit",
+            }, headers)
+        return headers
+
+    def handle(self, method: str, target: str, headers: dict, body: bytes) -> tuple:
+        """Answer one request; returns (status, headers, body bytes, route)."""
+        split = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(split.query).items()}
+        token = headers.get("authorization", "").removeprefix("Bearer ").strip() or "anonymous"
+        route = "unmatched"
+        response_headers: dict[str, str] = {"Content-Type": "application/json; charset=utf-8"}
+        try:
+            route, resource, handler = self._route(method, split.path)
+            if resource == "graphql":
+                request = json.loads(body or b"{}")
+                response_headers.update(self._spend(token, resource, 1))
+                payload = handler(request.get("query", ""))
+            else:
+                payload, extra = handler(split.path, query)
+                digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+                etag = f'"{digest}"'
+                if headers.get("if-none-match") == etag:
+                    # GitHub does not charge conditional requests answered with 304
+                    with self._lock:
+                        self.not_modified += 1
+                    raise _Response(304, None, {"ETag": etag, **self._spend(token, resource, 0)})
+                response_headers.update(self._spend(token, resource, 1))
+                response_headers.update(extra)
+                response_headers["ETag"] = etag
+            status = 200
+        except _Response as e:
+            status, payload = e.status, e.body
+            response_headers.update(e.headers)
+
+        with self._lock:
+            self.calls[f"{method} {route}"] += 1
+        data = b"" if payload is None or status == 304 else json.dumps(payload).encode()
+        return status, response_headers, data, route
+
+    def _route(self, method: str, path: str) -> tuple:
+        if method == "POST" and path == "/graphql":
+            return "/graphql", "graphql", self._graphql
+        if method != "GET":
+            raise _not_found()
+
+        if path == "/search/repositories":
+            return path, "search", self._search
+        match = re.fullmatch(r"/users/([^/]+)/repos", path)
+        if match:
+            return "/users/{owner}/repos", "core", self._owner_repositories
+        match = _REPO_PATH.match(path)
+        if match:
+            rest = match.group(3) or ""
+            for suffix, handler in (
+                ("", self._repository),
+                ("/languages", self._languages),
+                ("/contributors", self._contributors),
+                ("/commits", self._commits),
+                ("/stats/contributors", self._stats_contributors),
+            ):
+                if rest == suffix:
+                    return "/repos/{owner}/{repo}" + suffix, "core", handler
+        raise _not_found()
+
+    # -- REST ----------------------------------------------------------------
+
+    def _fixture(self, path: str) -> dict:
+        match = _REPO_PATH.match(path)
+        fixture = self.fixtures.get(f"{match.group(1)}/{match.group(2)}".lower())
+        if fixture is None:
+            raise _not_found()
+        return fixture
+
+    def _paginate(self, path: str, query: dict, items: list, max_per_page: int = 100) -> tuple:
+        per_page = min(_int_param(query, "per_page", 30), max_per_page)
+        page = max(1, _int_param(query, "page", 1))
+        start = (page - 1) * per_page
+        headers = {}
+        if start + per_page < len(items):
+            next_query = urlencode({**query, "page": page + 1, "per_page": per_page})
+            last_query = urlencode({
+                **query, "page": -(-len(items) // per_page), "per_page": per_page
+            })
+            headers["Link"] = (
+                f'<{self.url}{path}?{next_query}>; rel="next", '
+                f'<{self.url}{path}?{last_query}>; rel="last"'
+            )
+        return items[start:start + per_page], headers
+
+    def _repository(self, path: str, query: dict) -> tuple:
+        return self._fixture(path)["repository"], {}
+
+    def _languages(self, path: str, query: dict) -> tuple:
+        return self._fixture(path)["languages"], {}
+
+    def _contributors(self, path: str, query: dict) -> tuple:
+        return self._paginate(path, query, self._fixture(path)["contributors"])
+
+    def _stats_contributors(self, path: str, query: dict) -> tuple:
+        return self._fixture(path)["stats_contributors"], {}
+
+    def _history(self, fixture: dict, ref: str | None) -> list[dict]:
+        """Commits reachable from a branch name or commit SHA, newest first."""
+        commits = fixture["commits"]
+        if not ref or ref == fixture["repository"]["default_branch"]:
+            return commits
+        for index, commit in enumerate(commits):
+            if commit["sha"].startswith(ref):
+                return commits[index:]
+        raise _Response(404, {"message": f"No commit found for SHA: {ref}"})
+
+    def _commits(self, path: str, query: dict) -> tuple:
+        # The fixtures carry no file lists, so a path filter matches every commit
+        commits = self._history(self._fixture(path), query.get("sha"))
+        since, until = query.get("since"), query.get("until")
+        if since or until:
+            since = _epoch(since) if since else float("-inf")
+            until = _epoch(until) if until else float("inf")
+            commits = [
+                commit for commit in commits
+                if since <= _epoch(commit["commit"]["author"]["date"]) <= until
+            ]
+        return self._paginate(path, query, commits)
+
+    def _owner_repositories(self, path: str, query: dict) -> tuple:
+        owner = path.split("/")[2].lower()
+        if owner not in self._owners:
+            raise _not_found()
+        return self._paginate(path, query, self._owners[owner])
+
+    def _search(self, path: str, query: dict) -> tuple:
+        match = re.search(r"topic:(\S+)", query.get("q", ""))
+        topic = match.group(1).lower() if match else None
+        items = sorted(
+            (
+                fixture["repository"] for fixture in self.fixtures.values()
+                if topic in fixture["repository"].get("topics", [])
+            ),
+            key=lambda r: r.get("stargazers_count", 0),
+            reverse=True,
+        )[:1000]
+        page, headers = self._paginate(path, query, items)
+        return {"total_count": len(items), "incomplete_results": False, "items": page}, headers
+
+    # -- GraphQL -------------------------------------------------------------
+
+    def _graphql(self, query: str) -> dict:
+        data: dict[str, Any] = {"rateLimit": {"cost": 1}}
+        errors = []
+        for alias, owner, name, fields in _GRAPHQL_REPOSITORY.findall(query):
+            fixture = self.fixtures.get(f"{json.loads(owner)}/{json.loads(name)}".lower())
+            if fixture is None:
+                data[alias] = None
+                errors.append({
+                    "type": "NOT_FOUND",
+                    "path": [alias],
+                    "message": "Could not resolve to a Repository",
+                })
+                continue
+            data[alias] = _graphql_repository(fixture, fields)
+        body: dict[str, Any] = {"data": data}
+        if errors:
+            body["errors"] = errors
+        return body
+
+
+def _epoch(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _graphql_repository(fixture: dict, fields: str) -> dict:
+    repository = fixture["repository"]
+    node: dict[str, Any] = {}
+    if "stargazerCount" in fields:
+        node.update({
+            "stargazerCount": repository["stargazers_count"],
+            "forkCount": repository["forks_count"],
+            "description": repository.get("description"),
+            "createdAt": repository.get("created_at"),
+            "updatedAt": repository.get("updated_at"),
+            "watchers": {"totalCount": repository.get("subscribers_count", 0)},
+            # REST folds open pull requests into open_issues_count
+            "issues": {"totalCount": repository["open_issues_count"]},
+            "pullRequests": {"totalCount": 0},
+            "primaryLanguage": (
+                {"name": repository["language"]} if repository.get("language") else None
+            ),
+            "defaultBranchRef": {"name": repository["default_branch"]},
+        })
+    if "languages(" in fields:
+        edges = sorted(fixture["languages"].items(), key=lambda item: -item[1])
+        node["languages"] = {
+            "totalSize": sum(fixture["languages"].values()),
+            "pageInfo": {"hasNextPage": len(edges) > 100},
+            "edges": [{"size": size, "node": {"name": name}} for name, size in edges[:100]],
+        }
+    for alias, expression, first in _GRAPHQL_HISTORY.findall(fields):
+        branch = json.loads(expression) if expression else None
+        commits = fixture["commits"]
+        if branch and branch != repository["default_branch"]:
+            commits = next(
+                (commits[i:] for i, c in enumerate(commits) if c["sha"].startswith(branch)),
+                None,
+            )
+        if commits is None:
+            node[alias] = None
+            continue
+        history = {"history": {"nodes": [_graphql_commit(c) for c in commits[:int(first)]]}}
+        node[alias] = history if branch else {"target": history}
+    return node
+
+
+def _graphql_commit(commit: dict) -> dict:
+    author = commit["commit"].get("author")
+    return {
+        "oid": commit["sha"],
+        "message": commit["commit"]["message"],
+        "url": commit["html_url"],
+        "author": author and {
+            "name": author["name"],
+            "date": author["date"],
+            "user": {"login": commit["author"]["login"]} if commit.get("author") else None,
+        },
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 refuses connections under a concurrent burst
+    request_queue_size = 256
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, like api.github.com; the client's pool reuses connections
+    protocol_version = "HTTP/1.1"
+    server_fake: FakeGitHub
+
+    def _serve(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        headers = {key.lower(): value for key, value in self.headers.items()}
+        delay = self.server_fake._delay()
+        if delay:
+            time.sleep(delay)
+        status, response_headers, data, _ = self.server_fake.handle(
+            self.command, self.path, headers, body
+        )
+        self.send_response(status)
+        for key, value in response_headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+
+    do_GET = _serve
+    do_POST = _serve
+
+    def log_message(self, format: str, *args) -> None:
+        pass
@@ -0,0 +1,238 @@
+"""Fixtures served by the fake GitHub API.
+
+A fixture is the raw GitHub JSON for one repository, in the shape the REST
+API returns it::
+
+    {
+        "repository": {...},            # GET /repos/{owner}/{repo}
+        "languages": {...},             # GET /repos/{owner}/{repo}/languages
+        "contributors": [...],          # GET /repos/{owner}/{repo}/contributors
+        "commits": [...],               # GET /repos/{owner}/{repo}/commits, newest first
+        "stats_contributors": [...],    # GET /repos/{owner}/{repo}/stats/contributors
+    }
+
+``record_fixtures`` captures these from live GitHub into one JSON file per
+repository; ``load_fixtures`` reads them back. ``synthetic_fixtures`` builds
+a deterministic set of the same shape so CI needs neither a token nor the
+network.
+"""
+
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+import httpx
+
+SYNTHETIC_OWNER = "bench-org"
+SYNTHETIC_TOPIC = "bench"
+
+_LANGUAGES = (
+    "Python", "Go", "Rust", "TypeScript", "JavaScript", "C", "C++", "Shell",
+    "Java", "Ruby", "HTML", "CSS", "Dockerfile", "Makefile",
+)
+_WEEK = 7 * 86400
+
+
+def _iso(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+def _user(login: str) -> dict:
+    return {
+        "login": login,
+        "avatar_url": f"https://avatars.githubusercontent.com/{login}",
+        "html_url": f"https://github.com/{login}",
+    }
+
+
+def synthetic_fixture(
+    owner: str,
+    repo: str,
+    rng: random.Random,
+    commits: int = 500,
+    contributors: int = 40,
+    now: float | None = None,
+) -> dict:
+    """Build one repository fixture with realistic proportions.
+
+    Commit authorship follows a power law (a few authors write most commits)
+    so the concentration analytics have something to measure.
+    """
+    now = time.time() if now is None else now
+    full_name = f"{owner}/{repo}"
+    logins = [f"dev-{index:03d}" for index in range(contributors)]
+    weights = [1 / (rank + 1) ** 1.2 for rank in range(contributors)]
+
+    history = []
+    timestamp = now - rng.uniform(0, 86400)
+    for index in range(commits):
+        login = rng.choices(logins, weights)[0]
+        # Roughly 5% of commits come from unlinked git identities
+        linked = rng.random() > 0.05
+        sha = f"{rng.getrandbits(160):040x}"
+        history.append({
+            "sha": sha,
+            "html_url": f"https://github.com/{full_name}/commit/{sha}",
+            "commit": {
+                "message": f"Change {commits - index} in {repo}\n\nDetails for the change.",
+                "author": {
+                    "name": login.replace("-", " ").title(),
+                    "email": f"{login}@example.com",
+                    "date": _iso(timestamp),
+                },
+            },
+            "author": _user(login) if linked else None,
+        })
+        timestamp -= rng.expovariate(1 / 14400)
+
+    counts: dict[str, int] = {}
+    for commit in history:
+        if commit["author"]:
+            counts[commit["author"]["login"]] = counts.get(commit["author"]["login"], 0) + 1
+    ranked = sorted(counts.items(), key=lambda item: -item[1])
+
+    weeks = int((now - timestamp) // _WEEK) + 1
+    first_week = int(now // _WEEK - weeks + 1) * _WEEK
+    stats = []
+    for login, total in ranked[:100]:
+        series = [{"w": first_week + i * _WEEK, "a": 0, "d": 0, "c": 0} for i in range(weeks)]
+        for _ in range(total):
+            week = series[rng.randrange(weeks)]
+            week["c"] += 1
+            week["a"] += rng.randint(1, 400)
+            week["d"] += rng.randint(0, 200)
+        stats.append({"author": _user(login), "total": total, "weeks": series})
+
+    languages = {
+        language: rng.randint(1_000, 2_000_000)
+        for language in rng.sample(_LANGUAGES, rng.randint(1, 6))
+    }
+    primary = max(languages, key=languages.get)
+
+    return {
+        "repository": {
+            "name": repo,
+            "full_name": full_name,
+            "owner": {"login": owner},
+            "description": f"Synthetic benchmark repository {repo}",
+            "fork": rng.random() < 0.1,
+            "archived": rng.random() < 0.05,
+            "language": primary,
+            "topics": [SYNTHETIC_TOPIC],
+            "stargazers_count": rng.randint(0, 50_000),
+            "forks_count": rng.randint(0, 5_000),
+            "open_issues_count": rng.randint(0, 500),
+            "subscribers_count": rng.randint(0, 1_000),
+            "default_branch": "main",
+            "created_at": _iso(timestamp),
+            "updated_at": _iso(now - 3600),
+            "pushed_at": _iso(now - 3600),
+        },
+        "languages": languages,
+        "contributors": [
+            {**_user(login), "contributions": total} for login, total in ranked
+        ],
+        "commits": history,
+        "stats_contributors": stats,
+    }
+
+
+def synthetic_fixtures(
+    repositories: int = 20,
+    commits: int = 500,
+    contributors: int = 40,
+    seed: int = 0,
+) -> dict[str, dict]:
+    """Build a deterministic set of repositories owned by ``bench-org``.
+
+    Returns:
+        dict: ``owner/repo`` (lower case) -> fixture
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    fixtures = {}
+    for index in range(repositories):
+        repo = f"repo-{index:03d}"
+        fixtures[f"{SYNTHETIC_OWNER}/{repo}"] = synthetic_fixture(
+            SYNTHETIC_OWNER, repo, rng, commits=commits, contributors=contributors, now=now
+        )
+    return fixtures
+
+
+def load_fixtures(directory: str | os.PathLike) -> dict[str, dict]:
+    """Load recorded fixtures (``*.json``, one repository per file)."""
+    fixtures = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        fixture = json.loads(path.read_text())
+        fixtures[fixture["repository"]["full_name"].lower()] = fixture
+    return fixtures
+
+
+def _get_all(client: httpx.Client, path: str, limit: int, **params) -> list:
+    items: list = []
+    page = 1
+    while len(items) < limit:
+        response = client.get(path, params={**params, "per_page": 100, "page": page})
+        if response.status_code == 202:
+            # Statistics are still being computed; ask again shortly
+            time.sleep(2)
+            continue
+        response.raise_for_status()
+        batch = response.json() or []
+        items.extend(batch)
+        if len(batch) < 100 or "next" not in response.links:
+            break
+        page += 1
+    return items[:limit]
+
+
+def record_fixtures(
+    repositories: list[str],
+    directory: str | os.PathLike,
+    token: str | None = None,
+    max_commits: int = 1000,
+) -> list[Path]:
+    """Record fixtures for ``owner/repo`` names from live GitHub.
+
+    Args:
+        repositories: ``owner/repo`` names
+        directory: output directory (one ``owner__repo.json`` per repository)
+        token: GitHub token, defaults to GITHUB_TOKEN
+        max_commits: most recent commits to keep per repository
+
+    Returns:
+        list[Path]: written files
+    """
+    token = token or os.environ.get("GITHUB_TOKEN")
+    headers = {"Accept": "application/vnd.github+json", "User-Agent": "github-analytics-bench"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    output = Path(directory)
+    output.mkdir(parents=True, exist_ok=True)
+    written = []
+    with httpx.Client(
+        base_url=os.environ.get("GITHUB_API_URL", "https://api.github.com"),
+        headers=headers,
+        timeout=60,
+    ) as client:
+        for name in repositories:
+            owner, repo = name.split("/", 1)
+            base = f"/repos/{owner}/{repo}"
+            repository = client.get(base)
+            repository.raise_for_status()
+            languages = client.get(f"{base}/languages")
+            languages.raise_for_status()
+            fixture = {
+                "repository": repository.json(),
+                "languages": languages.json(),
+                "contributors": _get_all(client, f"{base}/contributors", 500),
+                "commits": _get_all(client, f"{base}/commits", max_commits),
+                "stats_contributors": _get_all(client, f"{base}/stats/contributors", 100),
+            }
+            path = output / f"{owner}__{repo}.json"
+            path.write_text(json.dumps(fixture))
+            written.append(path)
+    return written
@@ -0,0 +1,413 @@
+"""Offline benchmark harness.
+
+Runs every scenario against a local ``FakeGitHub`` through two interfaces:
+
+- ``api``: the FastAPI app, in process over ``httpx.ASGITransport``
+- ``mcp``: ``src.server.call_tool``, the entry point the MCP SDK calls
+
+Each (interface, scenario) pair starts with a fresh client and cold caches
+and sends ``--requests`` calls at ``--concurrency``, cycling through the
+fixture repositories, so the numbers include both cache misses and hits.
+The report gives throughput, p50/p95/p99 latency and the number of upstream
+GitHub calls, which is the figure most regressions show up in first.
+
+Usage::
+
+    python -m benchmarks                          # all scenarios, both interfaces
+    python -m benchmarks --scenario get_repo_stats --interface mcp --latency 100
+    python -m benchmarks --output results.json --baseline benchmarks/baseline.json
+    python -m benchmarks --fixtures benchmarks/recorded
+    python -m benchmarks record octocat/Hello-World --out benchmarks/recorded
+    python -m benchmarks startup --budget benchmarks/startup_budget.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable
+
+import httpx
+import numpy as np
+
+from .fake_github import FakeGitHub
+from .fixtures import load_fixtures, record_fixtures, synthetic_fixtures
+
+INTERFACES = ("api", "mcp")
+
+
+@dataclass
+class Scenario:
+    """One tool, as an MCP call and as the equivalent API request.
+
+    ``tool`` and ``api`` receive the list of ``owner/repo`` names and the
+    request index and return the MCP arguments / the (method, URL, JSON body).
+    """
+
+    name: str
+    tool: Callable[[list[str], int], dict]
+    api: Callable[[list[str], int], tuple[str, str, Any]]
+
+
+def _pick(repos: list[str], index: int) -> tuple[str, str]:
+    owner, repo = repos[index % len(repos)].split("/", 1)
+    return owner, repo
+
+
+def _window(repos: list[str], index: int, size: int = 5) -> list[str]:
+    start = (index * size) % len(repos)
+    return [repos[(start + offset) % len(repos)] for offset in range(min(size, len(repos)))]
+
+
+def _repo_args(repos: list[str], index: int, **extra) -> dict:
+    owner, repo = _pick(repos, index)
+    return {"owner": owner, "repo": repo, **extra}
+
+
+def _repo_url(repos: list[str], index: int, suffix: str) -> tuple[str, str, None]:
+    owner, repo = _pick(repos, index)
+    return "GET", f"/api/v1/repo/{owner}/{repo}{suffix}", None
+
+
+SCENARIOS = [
+    Scenario(
+        "get_repo_stats",
+        lambda repos, i: _repo_args(repos, i),
+        lambda repos, i: _repo_url(repos, i, "/stats"),
+    ),
+    Scenario(
+        "list_recent_commits",
+        lambda repos, i: _repo_args(repos, i, limit=30),
+        lambda repos, i: _repo_url(repos, i, "/commits?limit=30"),
+    ),
+    Scenario(
+        "analyze_contributors",
+        lambda repos, i: _repo_args(repos, i),
+        lambda repos, i: _repo_url(repos, i, "/contributors"),
+    ),
+    Scenario(
+        "get_language_breakdown",
+        lambda repos, i: _repo_args(repos, i),
+        lambda repos, i: _repo_url(repos, i, "/languages"),
+    ),
+    Scenario(
+        "analyze_commit_activity",
+        lambda repos, i: _repo_args(repos, i),
+        lambda repos, i: _repo_url(repos, i, "/activity"),
+    ),
+    Scenario(
+        "analyze_contributor_concentration",
+        lambda repos, i: _repo_args(repos, i),
+        lambda repos, i: _repo_url(repos, i, "/contributors/concentration"),
+    ),
+    Scenario(
+        # The API has no multi-facet endpoint; its batch stats request is the
+        # closest equivalent
+        "analyze_repositories",
+        lambda repos, i: {"repositories": _window(repos, i)},
+        lambda repos, i: (
+            "POST",
+            "/api/v1/repos/stats:batch",
+            {"repositories": [
+                dict(zip(("owner", "repo"), name.split("/", 1))) for name in _window(repos, i)
+            ]},
+        ),
+    ),
+    Scenario(
+        "aggregate_languages",
+        lambda repos, i: {"org": _pick(repos, 0)[0]},
+        lambda repos, i: ("GET", f"/api/v1/languages/aggregate?org={_pick(repos, 0)[0]}", None),
+    ),
+]
+
+
+@dataclass
+class Result:
+    """Measurements for one (interface, scenario) run."""
+
+    interface: str
+    scenario: str
+    requests: int
+    concurrency: int
+    errors: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    upstream_calls: int
+    upstream_per_request: float
+    not_modified: int
+    rate_limited: int
+    upstream: dict[str, int] = field(default_factory=dict)
+
+
+async def _drive(
+    call: Callable[[int], Awaitable[bool]], requests: int, concurrency: int
+) -> tuple[list[float], int, float]:
+    """Send ``requests`` calls with at most ``concurrency`` in flight."""
+    latencies: list[float] = []
+    errors = 0
+    issued = 0
+
+    async def worker() -> None:
+        nonlocal errors, issued
+        while issued < requests:
+            index = issued
+            issued += 1
+            started = time.perf_counter()
+            ok = await call(index)
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    return latencies, errors, time.perf_counter() - started
+
+
+class _Interfaces:
+    """Imports the app lazily: the client reads GITHUB_API_URL and friends
+    from the environment, which must point at the fake server first."""
+
+    def __init__(self):
+        from api import dependencies
+        from api.main import app
+        from src import server
+
+        self.dependencies = dependencies
+        self.server = server
+        self.http = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60
+        )
+
+    async def reset(self) -> None:
+        """Drop both clients so the next run starts with cold caches."""
+        await self.dependencies.close_github_client()
+        if self.server.github_client is not None:
+            await self.server.github_client.aclose()
+            self.server.github_client = None
+
+    def caller(self, interface: str, scenario: Scenario, repos: list[str]):
+        if interface == "api":
+            async def call(index: int) -> bool:
+                method, url, body = scenario.api(repos, index)
+                response = await self.http.request(method, url, json=body)
+                return response.status_code == 200
+        else:
+            async def call(index: int) -> bool:
+                result = await self.server.call_tool(scenario.name, scenario.tool(repos, index))
+                return not result.isError and "error" not in json.loads(result.content[0].text)
+        return call
+
+    async def aclose(self) -> None:
+        await self.reset()
+        await self.http.aclose()
+
+
+async def run_benchmarks(
+    fake: FakeGitHub,
+    repos: list[str],
+    interfaces: list[str],
+    scenarios: list[Scenario],
+    requests: int,
+    concurrency: int,
+) -> list[Result]:
+    targets = _Interfaces()
+    results = []
+    try:
+        for interface in interfaces:
+            for scenario in scenarios:
+                await targets.reset()
+                fake.reset()
+                latencies, errors, seconds = await _drive(
+                    targets.caller(interface, scenario, repos), requests, concurrency
+                )
+                p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+                upstream = Counter(fake.calls)
+                results.append(Result(
+                    interface=interface,
+                    scenario=scenario.name,
+                    requests=requests,
+                    concurrency=concurrency,
+                    errors=errors,
+                    seconds=round(seconds, 3),
+                    throughput=round(requests / seconds, 1),
+                    p50_ms=round(float(p50), 2),
+                    p95_ms=round(float(p95), 2),
+                    p99_ms=round(float(p99), 2),
+                    upstream_calls=sum(upstream.values()),
+                    upstream_per_request=round(sum(upstream.values()) / requests, 3),
+                    not_modified=fake.not_modified,
+                    rate_limited=fake.rate_limited,
+                    upstream=dict(upstream.most_common()),
+                ))
+    finally:
+        await targets.aclose()
+    return results
+
+
+def format_report(results: list[Result]) -> str:
+    header = (
+        f"{'interface':<9} {'scenario':<34} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'upstream':>8} {'/req':>6} {'errors':>6}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.interface:<9} {r.scenario:<34} {r.throughput:>8.1f} {r.p50_ms:>8.2f} "
+            f"{r.p95_ms:>8.2f} {r.p99_ms:>8.2f} {r.upstream_calls:>8} "
+            f"{r.upstream_per_request:>6.2f} {r.errors:>6}"
+        )
+    return "\n".join(lines)
+
+
+# Baseline metrics and whether a higher value is a regression
+_CHECKS = {
+    "upstream_calls": True,
+    "p50_ms": True,
+    "p95_ms": True,
+    "p99_ms": True,
+    "throughput": False,
+}
+# Absolute allowance on upstream call counts: on a slow runner a GraphQL
+# batching window can split one query in two
+UPSTREAM_SLACK = 2
+
+
+def compare_to_baseline(results: list[Result], baseline: dict, tolerance: float) -> list[str]:
+    """Return a message for every metric worse than the baseline by more than tolerance.
+
+    The baseline maps ``interface/scenario`` to the metrics to check; only the
+    metrics present are compared, so a baseline can pin upstream call counts
+    (stable across machines) without pinning latency (which is not).
+    """
+    failures = []
+    for r in results:
+        expected = baseline.get(f"{r.interface}/{r.scenario}")
+        if expected is None:
+            continue
+        if r.errors:
+            failures.append(f"{r.interface}/{r.scenario}: {r.errors} failed requests")
+        for metric, higher_is_worse in _CHECKS.items():
+            if metric not in expected:
+                continue
+            actual, limit = getattr(r, metric), expected[metric]
+            slack = UPSTREAM_SLACK if metric == "upstream_calls" else 0
+            if higher_is_worse and actual > limit * (1 + tolerance) + slack:
+                failures.append(
+                    f"{r.interface}/{r.scenario}: {metric} {actual} > {limit} (+{tolerance:.0%})"
+                )
+            elif not higher_is_worse and actual < limit * (1 - tolerance):
+                failures.append(
+                    f"{r.interface}/{r.scenario}: {metric} {actual} < {limit} (-{tolerance:.0%})"
+                )
+    return failures
+
+
+def _configure_environment(url: str, args: argparse.Namespace) -> None:
+    os.environ.update({
+        "GITHUB_API_URL": url,
+        "GITHUB_TOKEN": "benchmark-token",
+        # Set, even if empty, so a local .env cannot point the run at real
+        # services (load_dotenv never overrides existing variables)
+        "GITHUB_GRAPHQL_URL": "",
+        "GITHUB_TOKENS": "",
+        "GITHUB_TOKENS_FILE": "",
+        "REDIS_URL": "",
+        "GITHUB_COMMIT_STORE": "",
+        "MCP_MAX_CONCURRENCY": str(args.concurrency),
+    })
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n")[0])
+    parser.add_argument("--interface", choices=INTERFACES, action="append",
+                        help="interface to benchmark (repeatable; default: both)")
+    parser.add_argument("--scenario", choices=[s.name for s in SCENARIOS], action="append",
+                        help="scenario to run (repeatable; default: all)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight")
+    parser.add_argument("--latency", type=float, default=50.0,
+                        help="fake GitHub response latency in ms")
+    parser.add_argument("--jitter", type=float, default=10.0,
+                        help="extra random latency in ms (0 to JITTER)")
+    parser.add_argument("--rate-limit", type=int, default=5000,
+                        help="core and GraphQL budget per token")
+    parser.add_argument("--fixtures", help="directory of recorded fixtures (default: synthetic)")
+    parser.add_argument("--repos", type=int, default=20, help="synthetic repositories")
+    parser.add_argument("--commits", type=int, default=500, help="commits per synthetic repository")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="fail if results regress against this JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed regression against the baseline (fraction)")
+    return parser.parse_args(argv)
+
+
+def _record(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks record", description="Record fixtures from live GitHub."
+    )
+    parser.add_argument("repositories", nargs="+", help="owner/repo")
+    parser.add_argument("--out", default="benchmarks/recorded")
+    parser.add_argument("--max-commits", type=int, default=1000)
+    args = parser.parse_args(argv)
+    for path in record_fixtures(args.repositories, args.out, max_commits=args.max_commits):
+        print(f"wrote {path}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["record"]:
+        return _record(argv[1:])
+    if argv[:1] == ["startup"]:
+        from .startup import main as startup
+
+        return startup(argv[1:])
+
+    args = _parse_args(argv)
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+        if not fixtures:
+            print(f"no fixtures found in {args.fixtures}", file=sys.stderr)
+            return 2
+    else:
+        fixtures = synthetic_fixtures(args.repos, commits=args.commits, seed=args.seed)
+    repos = [f["repository"]["full_name"] for f in fixtures.values()]
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    fake = FakeGitHub(
+        fixtures,
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        rate_limits={"core": args.rate_limit, "graphql": args.rate_limit},
+        seed=args.seed,
+    )
+    with fake:
+        _configure_environment(fake.url, args)
+        results = asyncio.run(run_benchmarks(
+            fake, repos, args.interface or list(INTERFACES), scenarios,
+            args.requests, args.concurrency,
+        ))
+
+    print(format_report(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failures = compare_to_baseline(results, baseline, args.tolerance)
+        if failures:
+            print("\nRegressions against " + args.baseline + ":", file=sys.stderr)
+            for failure in failures:
+                print("  " + failure, file=sys.stderr)
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
@@ -0,0 +1,253 @@
+"""Cold-start benchmark.
+
+Each run starts a fresh process and measures, in wall-clock time from spawn:
+
+- ``mcp``: ``python -m src.server`` answering ``initialize`` (``ready_ms``)
+  and then its first ``tools/call`` (``first_request_ms``)
+- ``api``: uvicorn serving ``api.main:app`` answering ``/health``
+  (``ready_ms``) and then its first repository request (``first_request_ms``)
+- ``healthcheck``: ``python -m src.healthcheck`` running to completion
+  (``total_ms``)
+
+GitHub is a local ``FakeGitHub`` with no added latency, so the numbers are
+the processes' own start-up cost. One discarded warm-up run per target
+writes the bytecode caches; the rest are reported as median and minimum.
+``--budget`` fails the run when a median exceeds its budget.
+
+Usage::
+
+    python -m benchmarks startup
+    python -m benchmarks startup --runs 10 --budget benchmarks/startup_budget.json
+"""
+
+import argparse
+import json
+import os
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from statistics import median
+
+import httpx
+
+from .fake_github import FakeGitHub
+from .fixtures import SYNTHETIC_OWNER, synthetic_fixtures
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGETS = ("mcp", "api", "healthcheck")
+TIMEOUT = 60.0
+POLL_INTERVAL = 0.005
+REPO = "repo-000"
+
+
+def _environment(url: str) -> dict[str, str]:
+    # Empty values so a local .env cannot add Redis, a disk cache, a watchlist,
+    # a metrics port or a ready file to the measured processes
+    return {
+        **os.environ,
+        "GITHUB_API_URL": url,
+        "GITHUB_TOKEN": "benchmark-token",
+        "GITHUB_GRAPHQL_URL": "",
+        "GITHUB_TOKENS": "",
+        "GITHUB_TOKENS_FILE": "",
+        "REDIS_URL": "",
+        "GITHUB_DISK_CACHE": "",
+        "GITHUB_COMMIT_STORE": "",
+        "WATCHLIST": "",
+        "WATCHLIST_FILE": "",
+        "MCP_METRICS_PORT": "",
+        "MCP_READY_FILE": "",
+    }
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def measure_mcp(env: dict[str, str]) -> dict[str, float]:
+    """Spawn the MCP server over stdio and time the handshake and first tool call."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.server"],
+        cwd=ROOT, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True,
+    )
+    lines: queue.Queue = queue.Queue()
+    threading.Thread(
+        target=lambda: [lines.put(line) for line in process.stdout], daemon=True
+    ).start()
+
+    def send(message: dict) -> None:
+        process.stdin.write(json.dumps(message) + "\n")
+        process.stdin.flush()
+
+    def response(request_id: int) -> dict:
+        while True:
+            message = json.loads(lines.get(timeout=TIMEOUT))
+            if message.get("id") == request_id:
+                return message
+
+    try:
+        send({
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "startup-benchmark", "version": "1"},
+            },
+        })
+        response(1)
+        ready = _elapsed_ms(started)
+        send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        send({
+            "jsonrpc": "2.0", "id": 2, "method": "tools/call",
+            "params": {
+                "name": "get_repo_stats",
+                "arguments": {"owner": SYNTHETIC_OWNER, "repo": REPO},
+            },
+        })
+        result = response(2)
+        first_request = _elapsed_ms(started)
+        if "error" in result or result["result"].get("isError"):
+            raise RuntimeError(f"MCP tool call failed: {result}")
+    finally:
+        process.stdin.close()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    return {"ready_ms": ready, "first_request_ms": first_request}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_api(env: dict[str, str]) -> dict[str, float]:
+    """Spawn the gateway under uvicorn and time /health and the first repository request."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=TIMEOUT) as client:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+                if time.perf_counter() - started > TIMEOUT:
+                    raise TimeoutError("gateway did not become healthy")
+                try:
+                    if client.get(f"{base}/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(POLL_INTERVAL)
+            ready = _elapsed_ms(started)
+            response = client.get(f"{base}/api/v1/repo/{SYNTHETIC_OWNER}/{REPO}/stats")
+            response.raise_for_status()
+            first_request = _elapsed_ms(started)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    return {"ready_ms": ready, "first_request_ms": first_request}
+
+
+def measure_healthcheck(env: dict[str, str]) -> dict[str, float]:
+    """Time one run of the container health check."""
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "src.healthcheck"], cwd=ROOT, env=env, check=True, timeout=TIMEOUT
+    )
+    return {"total_ms": _elapsed_ms(started)}
+
+
+MEASURES = {"mcp": measure_mcp, "api": measure_api, "healthcheck": measure_healthcheck}
+
+
+def run_startup(targets: list[str], runs: int, env: dict[str, str]) -> dict[str, dict]:
+    """Measure each target ``runs`` times after one warm-up run.
+
+    Returns:
+        dict: target -> metric -> {"median": ms, "min": ms}
+    """
+    results = {}
+    for target in targets:
+        measure = MEASURES[target]
+        measure(env)
+        samples = [measure(env) for _ in range(runs)]
+        results[target] = {
+            metric: {
+                "median": round(median(s[metric] for s in samples), 1),
+                "min": round(min(s[metric] for s in samples), 1),
+            }
+            for metric in samples[0]
+        }
+    return results
+
+
+def format_report(results: dict[str, dict]) -> str:
+    lines = [f"{'target':<12} {'metric':<18} {'median ms':>10} {'min ms':>10}"]
+    for target, metrics in results.items():
+        for metric, values in metrics.items():
+            lines.append(
+                f"{target:<12} {metric:<18} {values['median']:>10.1f} {values['min']:>10.1f}"
+            )
+    return "\n".join(lines)
+
+
+def check_budget(results: dict[str, dict], budget: dict) -> list[str]:
+    """Return a message for every median above its budget (``target -> metric -> ms``)."""
+    failures = []
+    for target, limits in budget.items():
+        for metric, limit in limits.items():
+            actual = results.get(target, {}).get(metric)
+            if actual is not None and actual["median"] > limit:
+                failures.append(f"{target}: {metric} {actual['median']:.1f} ms > {limit} ms")
+    return failures
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks startup", description=__doc__.split("\n")[0]
+    )
+    parser.add_argument("--target", choices=TARGETS, action="append",
+                        help="process to measure (repeatable; default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="measured runs per target")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--budget", help="fail if a median exceeds this JSON's budget")
+    args = parser.parse_args(argv)
+
+    with FakeGitHub(synthetic_fixtures(1, commits=50), latency_ms=0, jitter_ms=0) as fake:
+        results = run_startup(args.target or list(TARGETS), args.runs, _environment(fake.url))
+
+    print(format_report(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget:
+        with open(args.budget) as f:
+            budget = json.load(f)
+        failures = check_budget(results, budget)
+        if failures:
+            print("\nOver the start-up budget in " + args.budget + ":", file=sys.stderr)
+            for failure in failures:
+                print("  " + failure, file=sys.stderr)
+            return 1
+        print(f"\nWithin the start-up budget in {args.budget}")
+    return 0
@@ -0,0 +1,1544 @@
+# 非同步 GitHub API 客戶端
+# 以 httpx 直接呼叫 GitHub REST API,提供與 GitHubClient 相同的查詢方法
+#
+# WHY a second client instead of wrapping GitHubClient in threads: PyGithub is
+# blocking, so every call inside an `async def` handler stalls the whole event
+# loop, and every sync FastAPI route pins a worker thread while it waits on
+# GitHub. httpx.AsyncClient keeps one pooled set of keep-alive (HTTP/2 when `h2`
+# is installed) connections per process and lets hundreds of upstream calls wait
+# concurrently on a single thread. GitHubClient stays for scripts that want a
+# plain blocking API; both share the same domain exceptions (ADR-002).
+
+import asyncio
+import base64
+import importlib.util
+import json
+import os
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, astuple, dataclass, replace
+from datetime import datetime, timezone
+from functools import partial
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import httpx
+
+from .cache import (
+    DEFAULT_NEGATIVE_TTL,
+    CacheEntry,
+    TTLCache,
+    load_ttls,
+    record_freshness,
+)
+from .commit_store import CommitStore
+from .github_client import (
+    GitHubClientError,
+    RepositoryNotFoundError,
+    StatisticsPendingError,
+    raise_github_error,
+    retry_at_from_headers,
+)
+from .graphql_batch import (
+    GRAPHQL_METHODS,
+    Fallback,
+    GraphQLBatcher,
+    language_percentages,
+)
+from .metrics import UPSTREAM_IN_FLIGHT, observe_upstream, upstream_method
+from .ratelimit import Priority, prioritized, set_priority
+from .shared_cache import SharedCache
+from .singleflight import SingleFlight
+from .timing import count_event, record_phase, timed_phase
+from .token_pool import TokenPool
+
+if TYPE_CHECKING:
+    # 僅供型別檢查:Self 在 3.11 才進入 typing
+    from typing_extensions import Self
+
+T = TypeVar("T")
+
+# 預取時的 (刷新間隔, 最短 TTL);None 表示一般查詢 (見 refreshing())
+_refresh: ContextVar[tuple[float, float] | None] = ContextVar("refresh", default=None)
+
+
+@contextmanager
+def refreshing(interval: float = 0.0, min_ttl: float = 0.0) -> Iterator[None]:
+    """此區塊內的查詢略過仍有效的快取項目,重新載入並寫回 L1 與 L2
+
+    用於在項目過期前預先刷新。已有 ETag 的項目以條件式請求重新驗證,
+    內容沒有改變時 GitHub 回應 304,不消耗額度。
+
+    WHY only methods that outlive the interval are stretched: their entries
+    are meant to last from one refresh to the next, so a late round should not
+    let them expire. Commit lists (60 s) are expected to be live; stretching
+    them to the prefetch interval would serve minutes-old commits as fresh.
+
+    Args:
+        interval: 預取的刷新間隔 (秒)
+        min_ttl: TTL 長於 interval 的方法,寫入項目的最短 TTL (秒);讓項目撐到下一次預取
+    """
+    token = _refresh.set((interval, min_ttl))
+    try:
+        yield
+    finally:
+        _refresh.reset(token)
+
+GITHUB_API_URL = "https://api.github.com"
+
+# WHY these pool defaults: A single gateway pod rarely has more than a few dozen
+# requests in flight (HPA scales out before that), and GitHub closes idle
+# connections after ~60s. Keeping keep-alive expiry below that avoids reusing
+# sockets the server has already dropped.
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 10.0
+
+# WHY 20s: GitHub usually finishes computing /stats/* within a few seconds of
+# the first 202. Waiting up to 20s (polling with backoff) answers most calls
+# in one go while staying under the 30s MCP tool timeout.
+DEFAULT_STATS_WAIT = 20.0
+STATS_POLL_INITIAL = 1.0
+STATS_POLL_MAX = 5.0
+
+# GitHub REST 每頁最多 100 筆
+MAX_COMMIT_PAGE = 100
+
+# WHY cap analytics at 100k commits: that covers all but a handful of huge
+# repositories, and without the commit store each 100 commits is one request.
+MAX_TIMELINE_COMMITS = 100_000
+
+# 搜尋 API 對單一查詢最多回傳的結果數
+MAX_SEARCH_RESULTS = 1000
+
+
+@dataclass
+class _Validators:
+    """條件式請求的 validator;請求成功後以回應標頭更新"""
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class _NotModified(Exception):
+    """GitHub 回應 304,表示快取的內容仍然有效"""
+
+
+class _Pending(Exception):
+    """GitHub 回應 202,統計資料仍在背景計算中"""
+
+
+@dataclass(frozen=True)
+class _CommitCursor:
+    """commit 分頁位置;編碼後作為不透明的 cursor 交給呼叫端
+
+    WHY pin the head: page N of "commits on main" shifts every time someone
+    pushes. Once a caller starts paging, the cursor fixes `sha` to the commit
+    that was the tip on the first page, so later pages list exactly the
+    continuation of what the caller has already seen.
+
+    Attributes:
+        sha: 起始分支或 commit SHA (None 表示預設分支)
+        page: GitHub 的頁碼 (從 1 開始)
+        per_page: 每頁 commit 數
+        since: 只列出此時間之後的 commits (ISO 8601)
+        until: 只列出此時間之前的 commits (ISO 8601)
+        path: 只列出修改此路徑的 commits
+        pinned: sha 是否已固定為第一頁時的 HEAD commit
+        branch: 第一頁要求的分支名稱 (sha 固定為 commit 後仍保留,用於回報)
+    """
+
+    sha: str | None
+    page: int
+    per_page: int
+    since: str | None = None
+    until: str | None = None
+    path: str | None = None
+    pinned: bool = False
+    branch: str | None = None
+
+    def encode(self) -> str:
+        raw = json.dumps(asdict(self), separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "_CommitCursor":
+        """還原 encode() 產生的 cursor
+
+        Raises:
+            ValueError: cursor 格式不正確
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            position = cls(**json.loads(raw))
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid cursor") from e
+        if position.page < 1 or not 1 <= position.per_page <= 100:
+            raise ValueError("Invalid cursor")
+        return position
+
+    @property
+    def filtered(self) -> bool:
+        return bool(self.since or self.until or self.path)
+
+
+def _isoformat(value: str | None) -> str:
+    """將 GitHub 的 ISO 8601 時間字串正規化
+
+    GitHub 回傳 "2024-01-01T00:00:00Z",PyGithub 會轉成 datetime 再輸出
+    "2024-01-01T00:00:00+00:00"。這裡做相同轉換,讓兩個客戶端的輸出一致。
+    """
+    if not value:
+        return ""
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).isoformat()
+
+
+def _repo_key(owner: str, repo: str) -> str:
+    """commit 儲存中的倉庫鍵 (GitHub 的名稱不分大小寫)"""
+    return f"{owner}/{repo}".lower()
+
+
+def _repository_ref(repository: dict) -> dict:
+    """將 GitHub 倉庫 JSON 精簡為彙總分析需要的欄位"""
+    return {
+        "owner": repository["owner"]["login"],
+        "repo": repository["name"],
+        "fork": repository.get("fork", False),
+        "archived": repository.get("archived", False),
+        "stars": repository.get("stargazers_count", 0),
+    }
+
+
+def _commit_dict(commit: dict) -> dict:
+    """將 GitHub commit JSON 轉為 get_recent_commits 的回傳格式"""
+    git_author = commit["commit"].get("author")
+    return {
+        "sha": commit["sha"],
+        "message": commit["commit"]["message"],
+        "author": git_author["name"] if git_author else "Unknown",
+        "author_login": commit["author"]["login"] if commit.get("author") else "",
+        "date": _isoformat(git_author["date"]) if git_author else "",
+        "url": commit["html_url"],
+    }
+
+
+class AsyncGitHubClient:
+    """非同步 GitHub API 客戶端
+
+    使用單一 httpx.AsyncClient 連線池與 GitHub REST API 互動,
+    方法名稱與回傳格式和 GitHubClient 完全相同,只是改為 coroutine。
+
+    Attributes:
+        _http: 共用的 httpx.AsyncClient (keep-alive 連線池)
+        _cache: 各方法回傳值的 TTL + LRU 快取 (L1)
+        _shared_cache: 跨副本共用快取 (L2,可選)
+        _inflight: 合併相同鍵並行載入的 SingleFlight
+        _tokens: token 池;每個 token 有自己的 RateLimitScheduler
+        _graphql: 將並行的查詢合併成單一 GraphQL 請求的批次查詢器
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        tokens: list[str] | None = None,
+        base_url: str | None = None,
+        max_connections: int | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: TTLCache | None = None,
+        shared_cache: SharedCache | None = None,
+        commit_store: CommitStore | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """初始化非同步 GitHub 客戶端
+
+        Args:
+            token: GitHub Personal Access Token。
+                   若未提供,將從環境變數 GITHUB_TOKEN 讀取。
+            tokens: 多個 token 組成的池 (見 TokenPool.from_env);
+                    未提供時也會讀取 GITHUB_TOKENS / GITHUB_TOKENS_FILE
+            base_url: GitHub API 位址,預設讀取 GITHUB_API_URL 或 https://api.github.com
+                      (GraphQL 位址由此推得,或讀取 GITHUB_GRAPHQL_URL)
+            max_connections: 連線池上限,預設讀取 GITHUB_MAX_CONNECTIONS 或 20
+            timeout: 單次請求逾時秒數
+            cache: 回應快取 (L1),預設依環境變數建立 TTLCache
+            shared_cache: 跨副本共用快取 (L2),未提供時只使用 L1
+            commit_store: 本機 commit 儲存,預設依 GITHUB_COMMIT_STORE 建立 (未設定則停用)
+            transport: 自訂 httpx transport (測試時以 httpx.MockTransport 取代網路)
+
+        Raises:
+            AuthenticationError: 當 token 未提供時
+        """
+        self._tokens = TokenPool.from_env(token=token, tokens=tokens)
+
+        base_url = base_url or os.environ.get("GITHUB_API_URL", GITHUB_API_URL)
+        # GitHub Enterprise Server 的 REST 在 /api/v3,GraphQL 在 /api/graphql
+        self._graphql_url = os.environ.get("GITHUB_GRAPHQL_URL") or (
+            base_url.rstrip("/").removesuffix("/v3") + "/graphql"
+        )
+
+        if max_connections is None:
+            max_connections = int(
+                os.environ.get("GITHUB_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)
+            )
+
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+                "User-Agent": "github-analytics-mcp",
+            },
+            # WHY optional HTTP/2: multiplexing lets concurrent calls share one
+            # TLS connection, but it needs the `h2` package. Fall back to pooled
+            # HTTP/1.1 keep-alive rather than failing when it is missing.
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY,
+            ),
+            timeout=timeout,
+            transport=transport,
+        )
+
+        self._cache = cache if cache is not None else TTLCache.from_env()
+        self._shared_cache = shared_cache
+        self._not_modified = 0
+        self._inflight = SingleFlight()
+        self._graphql = GraphQLBatcher(self._send_graphql)
+        self._background: set[asyncio.Task] = set()
+        self._stale_served = 0
+        self._ttls = load_ttls()
+        self._negative_ttl = float(
+            os.environ.get("GITHUB_CACHE_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL)
+        )
+        self._stats_wait = float(os.environ.get("GITHUB_STATS_WAIT", DEFAULT_STATS_WAIT))
+        self._commit_store = (
+            commit_store if commit_store is not None else CommitStore.from_env()
+        )
+
+    async def aclose(self) -> None:
+        """取消背景刷新並關閉連線池、共用快取連線與 commit 儲存"""
+        for task in list(self._background):
+            task.cancel()
+        await self._http.aclose()
+        if self._shared_cache is not None:
+            await self._shared_cache.aclose()
+        if self._commit_store is not None:
+            await asyncio.to_thread(self._commit_store.close)
+
+    async def __aenter__(self) -> "Self":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        owner: str,
+        repo: str,
+        params: dict[str, Any] | None = None,
+        json: Any | None = None,
+        headers: dict[str, str] | None = None,
+        resource: str = "core",
+        cost: int = 1,
+    ) -> httpx.Response:
+        """以 token 池中最適合的 token 送出請求,錯誤轉換為領域例外
+
+        某個 token 回應 401 或速率限制時,若池中還有其他 token,
+        隔離該 token 並改用下一個重試;只有一個 token 時直接拋出例外。
+
+        Args:
+            method: HTTP 方法
+            path: API 路徑
+            owner: 倉庫擁有者 (用於錯誤訊息)
+            repo: 倉庫名稱 (用於錯誤訊息)
+            params: Query string 參數
+            json: JSON 請求內容
+            headers: 額外的請求標頭
+            resource: 速率限制資源 (core、graphql…)
+            cost: 此請求消耗的額度 (GraphQL 為預估點數)
+
+        Returns:
+            httpx.Response: 狀態碼小於 400 的回應
+
+        Raises:
+            RepositoryNotFoundError: 404 錯誤
+            AuthenticationError: 401/403 錯誤
+            RateLimitError: 速率限制錯誤 (包含排程器判斷額度不足而未送出的請求)
+            GitHubClientError: 其他錯誤或網路錯誤
+        """
+        attempts = len(self._tokens)
+        for attempt in range(attempts):
+            state = self._tokens.select(resource)
+            with timed_phase("throttle"):
+                await state.scheduler.acquire(resource, cost)
+            state.requests += 1
+            started = time.perf_counter()
+            try:
+                with UPSTREAM_IN_FLIGHT.track_inprogress():
+                    response = await self._http.request(
+                        method,
+                        path,
+                        params=params,
+                        json=json,
+                        headers={**(headers or {}), "Authorization": f"Bearer {state.token}"},
+                    )
+            except httpx.HTTPError as e:
+                observe_upstream("error", time.perf_counter() - started)
+                record_phase("upstream", time.perf_counter() - started)
+                raise GitHubClientError(f"GitHub API request failed: {e}") from e
+            elapsed = time.perf_counter() - started
+            observe_upstream(response.status_code, elapsed)
+            record_phase("upstream", elapsed)
+            state.scheduler.observe(response.headers, resource)
+
+            if response.status_code < 400:
+                return response
+
+            retry_at = retry_at_from_headers(response.headers)
+            can_retry = attempt + 1 < attempts
+            if response.status_code == 401:
+                rotated = self._tokens.quarantine_unauthorized(state)
+            elif response.status_code in (403, 429) and retry_at is not None:
+                rotated = self._tokens.quarantine_rate_limited(state, retry_at)
+            else:
+                rotated = False
+            if rotated and can_retry:
+                continue
+
+            try:
+                data = response.json()
+            except ValueError:
+                data = response.text
+            raise_github_error(
+                response.status_code, data, owner, repo, retry_at=retry_at
+            )
+
+    async def _get(
+        self,
+        path: str,
+        owner: str,
+        repo: str,
+        params: dict[str, Any] | None = None,
+        validators: _Validators | None = None,
+        resource: str = "core",
+    ) -> Any:
+        """送出 GET 請求並回傳 JSON 內容
+
+        Args:
+            path: API 路徑 (例如 /repos/{owner}/{repo})
+            owner: 倉庫擁有者 (用於錯誤訊息)
+            repo: 倉庫名稱 (用於錯誤訊息)
+            params: Query string 參數
+            validators: 若提供,送出條件式請求,並以回應的 ETag/Last-Modified 更新
+            resource: 速率限制資源 (搜尋 API 為 search)
+
+        Returns:
+            Any: 解析後的 JSON;204 No Content 時回傳 None
+
+        Raises:
+            _NotModified: 條件式請求得到 304
+            _Pending: 統計端點回應 202 (仍在計算)
+            RepositoryNotFoundError: 404 錯誤
+            AuthenticationError: 401/403 錯誤
+            RateLimitError: 速率限制錯誤 (包含排程器判斷額度不足而未送出的請求)
+            GitHubClientError: 其他錯誤或網路錯誤
+        """
+        headers = {}
+        if validators is not None:
+            if validators.etag:
+                headers["If-None-Match"] = validators.etag
+            if validators.last_modified:
+                headers["If-Modified-Since"] = validators.last_modified
+
+        response = await self._request(
+            "GET", path, owner, repo, params=params, headers=headers, resource=resource
+        )
+
+        if response.status_code == 304:
+            raise _NotModified()
+        if response.status_code == 202:
+            raise _Pending()
+
+        if validators is not None:
+            validators.etag = response.headers.get("ETag")
+            validators.last_modified = response.headers.get("Last-Modified")
+
+        if response.status_code == 204:
+            return None
+        return response.json()
+
+    async def _send_graphql(self, query: str, cost: int) -> dict:
+        """送出 GraphQL 查詢並回傳回應 JSON (由 GraphQLBatcher 呼叫)"""
+        with upstream_method("graphql_batch"):
+            response = await self._request(
+                "POST",
+                self._graphql_url,
+                "graphql",
+                "batch",
+                json={"query": query},
+                resource="graphql",
+                cost=cost,
+            )
+        return response.json()
+
+    async def get_repository(self, owner: str, repo: str) -> dict:
+        """取得倉庫原始資料
+
+        Args:
+            owner: 倉庫擁有者 (使用者名稱或組織名稱)
+            repo: 倉庫名稱
+
+        Returns:
+            dict: GitHub `GET /repos/{owner}/{repo}` 回傳的 JSON
+
+        Raises:
+            RepositoryNotFoundError: 倉庫不存在
+            AuthenticationError: 認證失敗或無權限存取
+            RateLimitError: API 速率限制
+            GitHubClientError: 其他 API 錯誤
+        """
+        return await self._get(f"/repos/{owner}/{repo}", owner, repo)
+
+    async def _cached(
+        self,
+        method: str,
+        key: tuple,
+        fetch: Callable[..., Awaitable[T]],
+        *args,
+    ) -> T:
+        """先查快取 (L1 程序內 → L2 共用),未命中時呼叫 fetch 並依該方法的 TTL 寫入快取
+
+        在 refreshing() 區塊內一律重新載入 (仍與進行中的相同查詢合併)。
+
+        Args:
+            method: 方法名稱 (決定 TTL,也是快取鍵的一部分)
+            key: 該方法內的快取鍵 (已正規化的參數)
+            fetch: 實際向 GitHub 取資料的 coroutine 函式
+            *args: 傳給 fetch 的參數
+
+        Returns:
+            T: fetch 的回傳值 (可能來自快取)
+
+        Raises:
+            RepositoryNotFoundError: 倉庫不存在 (可能來自負面快取)
+            GitHubClientError: 其他 API 錯誤 (不快取)
+        """
+        cache_key = (method, *key)
+        fill = partial(self._fill, cache_key, method, fetch, *args)
+
+        if _refresh.get() is None:
+            started = time.perf_counter()
+            entry = self._cache.get(cache_key)
+            record_phase("cache", time.perf_counter() - started)
+            if entry is not None:
+                count_event("cache_hit")
+                record_freshness(entry)
+                return entry.unwrap()
+
+            stale = self._servable_stale(cache_key)
+            if stale is not None:
+                count_event("cache_stale")
+                # WHY serve stale: the first request after expiry would otherwise pay
+                # the full GitHub latency. Within the stale window it gets the old
+                # value immediately and a background task refreshes the entry.
+                self._refresh_in_background(cache_key, fill)
+                self._stale_served += 1
+                record_freshness(stale, stale=True)
+                return stale.unwrap()
+
+        # 相同鍵的並行未命中只會產生一次載入,結果分送給所有呼叫者
+        count_event("cache_miss")
+        with timed_phase("fill"):
+            entry = await self._inflight.do(cache_key, fill)
+        record_freshness(entry)
+        return entry.unwrap()
+
+    def _servable_stale(self, cache_key: tuple) -> CacheEntry | None:
+        """回傳仍在 stale window 內、可先行回傳的過期項目"""
+        if self._cache.stale_window <= 0:
+            return None
+        stale = self._cache.get_stale(cache_key)
+        if stale is None or stale.error is not None:
+            return None
+        if time.time() > stale.expires_at + self._cache.stale_window:
+            return None
+        return stale
+
+    def _refresh_in_background(
+        self, cache_key: tuple, fill: Callable[[], Awaitable[CacheEntry]]
+    ) -> None:
+        """在背景重新載入項目 (同一個鍵同時只會有一個刷新)"""
+        if cache_key in self._inflight:
+            return
+        task = asyncio.ensure_future(self._background_fill(cache_key, fill))
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    async def _background_fill(
+        self, cache_key: tuple, fill: Callable[[], Awaitable[CacheEntry]]
+    ) -> CacheEntry:
+        # 背景刷新以 BACKGROUND 優先權送出,額度偏低時由排程器延後
+        set_priority(Priority.BACKGROUND)
+        return await self._inflight.do(cache_key, fill)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        # 背景刷新失敗時保留舊項目,直到 stale window 結束後由前景請求重試
+        if not task.cancelled():
+            task.exception()
+
+    async def _fill(
+        self,
+        cache_key: tuple,
+        method: str,
+        fetch: Callable[..., Awaitable[T]],
+        *args,
+    ) -> CacheEntry:
+        """從 L2 或 GitHub 載入項目並寫入 L1"""
+        load = partial(self._load, cache_key, method, fetch, *args)
+        if self._shared_cache is None:
+            entry = await load()
+        elif _refresh.get() is not None:
+            # 預取:L2 中的項目可能正是要刷新的那份;重新載入後寫回給其他程序
+            entry = await load()
+            await self._shared_cache.put(cache_key, entry)
+        else:
+            entry = await self._shared_cache.get_or_load(cache_key, load)
+        self._cache.put(cache_key, entry)
+        return entry
+
+    async def _load(
+        self,
+        cache_key: tuple,
+        method: str,
+        fetch: Callable[..., Awaitable[T]],
+        *args,
+    ) -> CacheEntry:
+        """呼叫 fetch 並包裝成帶有該方法 TTL 的快取項目
+
+        若 L1 中有帶 validator 的過期項目,fetch 會送出條件式請求;
+        GitHub 回應 304 時直接延長舊項目的到期時間。
+
+        WHY revalidate instead of refetch: a 304 does not count against the
+        rate limit and carries no body, so refreshing mostly-static
+        repositories becomes nearly free.
+        """
+        ttl = self._ttls.get(method, 0.0)
+        refresh = _refresh.get()
+        if refresh is not None and ttl > refresh[0]:
+            ttl = max(ttl, refresh[1])
+        stale = self._cache.get_stale(cache_key)
+        validators = _Validators()
+        if stale is not None and stale.revalidatable:
+            validators = _Validators(stale.etag, stale.last_modified)
+
+        try:
+            with upstream_method(method):
+                if self._batchable(method) and not (
+                    validators.etag or validators.last_modified
+                ):
+                    value = await self._load_batched(method, fetch, *args)
+                else:
+                    value = await fetch(*args, validators=validators)
+        except _NotModified:
+            self._not_modified += 1
+            now = time.time()
+            return replace(stale, expires_at=now + ttl, stored_at=now)
+        except RepositoryNotFoundError as e:
+            # WHY only not-found is cached: auth and rate-limit failures depend
+            # on the token and the clock, not on the repository, so caching them
+            # would keep failing after the condition has cleared.
+            return CacheEntry.for_error(e, self._negative_ttl)
+        return CacheEntry.for_value(
+            value, ttl, etag=validators.etag, last_modified=validators.last_modified
+        )
+
+    def _batchable(self, method: str) -> bool:
+        """此方法的未命中是否交給 GraphQL 批次查詢"""
+        if _refresh.get() is not None:
+            # WHY prefetch stays on REST: GraphQL responses carry no ETag or
+            # Last-Modified, so an entry filled through a batch can never be
+            # revalidated with a free 304. Watched repositories are refreshed
+            # every round; one full REST fetch buys 304s for all later rounds.
+            return False
+        if method == "get_recent_commits" and self._commit_store is not None:
+            # 有本機 commit 儲存時,增量同步比每次重新查詢更省
+            return False
+        return method in GRAPHQL_METHODS and self._graphql.enabled
+
+    async def _load_batched(
+        self, method: str, fetch: Callable[..., Awaitable[T]], *args
+    ) -> T:
+        """經由 GraphQL 批次取得;無法批次時改用 REST fetch
+
+        有 validator 的項目不走這條路徑:REST 的 304 不消耗額度,比 GraphQL 便宜。
+        經由此路徑寫入的項目沒有 validator,過期後會重新完整查詢,而不是以 304 重新驗證。
+        """
+        try:
+            return await self._graphql.load(method, *args)
+        except Fallback:
+            return await fetch(*args, validators=_Validators())
+
+    def rate_limit_stats(self) -> dict[str, dict]:
+        """回傳每個 token 在各資源 (core、graphql…) 的剩餘額度、請求數與隔離狀態"""
+        return self._tokens.stats()
+
+    def ttl(self, method: str) -> float:
+        """回傳方法的快取 TTL (秒);0 表示不快取"""
+        return self._ttls.get(method, 0.0)
+
+    def cache_stats(self) -> dict[str, int]:
+        """回傳快取命中/未命中/淘汰統計,304、請求合併與過期先行回傳次數,以及 GraphQL 批次統計"""
+        return {
+            **self._cache.stats(),
+            "not_modified": self._not_modified,
+            "coalesced": self._inflight.shared,
+            "stale_served": self._stale_served,
+            **self._graphql.stats(),
+        }
+
+    async def get_repo_statistics(self, owner: str, repo: str) -> dict:
+        """取得倉庫基本統計資訊
+
+        回傳格式與 GitHubClient.get_repo_statistics 相同。
+
+        Raises:
+            RepositoryNotFoundError: 倉庫不存在
+            AuthenticationError: 認證失敗
+            GitHubClientError: 其他 API 錯誤
+        """
+        return await self._cached(
+            "get_repo_statistics",
+            (owner.lower(), repo.lower()),
+            self._fetch_repo_statistics,
+            owner,
+            repo,
+        )
+
+    async def _fetch_repo_statistics(
+        self, owner: str, repo: str, validators: _Validators | None = None
+    ) -> dict:
+        repository = await self._get(
+            f"/repos/{owner}/{repo}", owner, repo, validators=validators
+        )
+
+        return {
+            "stars": repository["stargazers_count"],
+            "forks": repository["forks_count"],
+            "open_issues": repository["open_issues_count"],
+            "watchers": repository.get("subscribers_count", 0),
+            "description": repository.get("description") or "",
+            "language": repository.get("language") or "",
+            "created_at": _isoformat(repository.get("created_at")),
+            "updated_at": _isoformat(repository.get("updated_at")),
+            "default_branch": repository["default_branch"],
+        }
+
+    async def get_recent_commits(
+        self,
+        owner: str,
+        repo: str,
+        limit: int = 10,
+        branch: str | None = None,
+    ) -> list[dict]:
+        """取得最近的 commits
+
+        回傳格式與 GitHubClient.get_recent_commits 相同。
+
+        Raises:
+            RepositoryNotFoundError: 倉庫不存在
+            AuthenticationError: 認證失敗
+            GitHubClientError: 其他 API 錯誤
+        """
+        return await self._cached(
+            "get_recent_commits",
+            (owner.lower(), repo.lower(), limit, branch),
+            self._fetch_recent_commits,
+            owner,
+            repo,
+            limit,
+            branch,
+        )
+
+    async def _fetch_recent_commits(
+        self,
+        owner: str,
+        repo: str,
+        limit: int,
+        branch: str | None,
+        validators: _Validators | None = None,
+    ) -> list[dict]:
+        if self._commit_store is not None:
+            await self.sync_commits(owner, repo, branch)
+            return await asyncio.to_thread(
+                self._commit_store.recent, _repo_key(owner, repo), branch or "", limit
+            )
+
+        # 若未指定分支,省略 sha 參數,GitHub 會自動使用預設分支
+        params: dict[str, Any] = {"per_page": limit}
+        if branch:
+            params["sha"] = branch
+
+        commits = await self._get(
+            f"/repos/{owner}/{repo}/commits",
+            owner,
+            repo,
+            params=params,
+            validators=validators,
+        )
+
+        return [_commit_dict(commit) for commit in commits[:limit]]
+
+    async def sync_commits(
+        self, owner: str, repo: str, branch: str | None = None
+    ) -> None:
+        """將分支的新 commits 同步到本機 commit 儲存 (需啟用 GITHUB_COMMIT_STORE)
+
+        同一個分支的並行同步只會執行一次。
+
+        Raises:
+            RepositoryNotFoundError: 倉庫或分支不存在
+            GitHubClientError: 其他 API 錯誤
+        """
+        if self._commit_store is None:
+            return
+        key = ("sync_commits", *_repo_key(owner, repo).split("/"), branch or "")
+        await self._inflight.do(key, partial(self._sync_commits, owner, repo, branch))
+
+    async def _sync_commits(self, owner: str, repo: str, branch: str | None) -> None:
+        """增量同步
+
+        1. 以上次的 ETag 條件式取得第一頁 commits;304 表示沒有新 push,不再發出請求
+        2. HEAD 改變時以 compare API 比較新舊 HEAD:
+           - ahead: 只接上新增的 commits
+           - diverged / behind (force push): 從 merge base 之後重新接上
+        3. 沒有同步紀錄、merge base 不在儲存中或差異過大時,以第一頁重建
+        """
+        store = self._commit_store
+        repo_key = _repo_key(owner, repo)
+        branch_key = branch or ""
+        state = await asyncio.to_thread(store.state, repo_key, branch_key)
+
+        params: dict[str, Any] = {"per_page": MAX_COMMIT_PAGE}
+        if branch:
+            params["sha"] = branch
+        validators = _Validators(etag=state.etag if state else None)
+        try:
+            page = await self._get(
+                f"/repos/{owner}/{repo}/commits",
+                owner,
+                repo,
+                params=params,
+                validators=validators,
+            )
+        except _NotModified:
+            await asyncio.to_thread(store.touch, repo_key, branch_key, validators.etag)
+            return
+
+        commits = [_commit_dict(commit) for commit in page]
+        if not commits:
+            return
+        head = commits[0]["sha"]
+
+        if state is not None and head == state.head_sha:
+            await asyncio.to_thread(store.touch, repo_key, branch_key, validators.etag)
+            return
+
+        if state is not None:
+            try:
+                compare = await self._get(
+                    f"/repos/{owner}/{repo}/compare/{state.head_sha}...{head}", owner, repo
+                )
+            except RepositoryNotFoundError:
+                # 舊 HEAD 在 force push 後已被回收;無法計算 merge base
+                compare = None
+
+            if compare is not None and compare["total_commits"] == len(compare["commits"]):
+                base = compare["merge_base_commit"]["sha"]
+                if await asyncio.to_thread(store.contains, repo_key, branch_key, base):
+                    # WHY compare instead of paging until the old head: after a
+                    # merge, side-branch commits older than the old head are
+                    # listed below it, so stopping there would miss them.
+                    # compare returns exactly the commits reachable from the new
+                    # head but not from the merge base.
+                    await asyncio.to_thread(
+                        store.advance,
+                        repo_key,
+                        branch_key,
+                        base,
+                        [_commit_dict(commit) for commit in compare["commits"]],
+                        head,
+                        validators.etag,
+                    )
+                    return
+
+        await asyncio.to_thread(
+            store.replace,
+            repo_key,
+            branch_key,
+            commits,
+            validators.etag,
+            len(commits) < MAX_COMMIT_PAGE,
+        )
+
+    async def get_commit_timeline(
+        self,
+        owner: str,
+        repo: str,
+        branch: str | None = None,
+        days: int | None = None,
+    ) -> dict:
+        """以欄位形式取得 commit 時間與作者,供向量化分析使用
+
+        啟用 commit 儲存時由本機資料表回答 (必要時先同步並回補歷史);
+        否則逐頁向 GitHub 取得。最多 MAX_TIMELINE_COMMITS 筆。
+
+        Args:
+            owner: 倉庫擁有者
+            repo: 倉庫名稱
+            branch: 指定分支名稱,若為 None 則使用預設分支
+            days: 只包含最近幾天的 commits;None 表示全部歷史
+
+        Returns:
+            dict: 包含:
+                - timestamps (list[int]): commit 時間 (epoch 秒)
+                - author_ids (list[int]): 作者在 authors 中的索引,與 timestamps 對應
+                - authors (list[str]): 作者 (GitHub 帳號,沒有時為 git 作者名稱)
+                - since (int | None): 時間範圍的起點 (epoch 秒,已取整到 UTC 日界)
+                - truncated (bool): 是否因筆數上限而沒有包含所有符合條件的 commits
+
+        Raises:
+            RepositoryNotFoundError: 倉庫或分支不存在
+            AuthenticationError: 認證失敗
+            GitHubClientError: 其他 API 錯誤
+        """
+        since = None
+        if days is not None:
+            # 取整到 UTC 日界,同一天內的查詢共用同一個快取項目
+            since = (int(time.time()) // 86400 - days) * 86400
+        return await self._cached(
+            "get_commit_timeline",
+            (owner.lower(), repo.lower(), branch, since),
+            self._fetch_commit_timeline,
+            owner,
+            repo,
+            branch,
+            since,
+        )
+
+    async def _fetch_commit_timeline(
+        self,
+        owner: str,
+        repo: str,
+        branch: str | None,
+        since: int | None,
+        validators: _Validators | None = None,
+    ) -> dict:
+        since_iso = (
+            datetime.fromtimestamp(since, timezone.utc).isoformat() if since is not None else None
+        )
+
+        if self._commit_store is not None:
+            await self.sync_commits(owner, repo, branch)
+            truncated = await self._backfill_commits(owner, repo, branch, since_iso)
+            rows = await asyncio.to_thread(
+                self._commit_store.timeline, _repo_key(owner, repo), branch or "", since_iso
+            )
+        else:
+            rows = []
+            truncated = False
+            pages = self.iter_commit_pages(owner, repo, branch=branch, since=since_iso)
+            try:
+                async for page in pages:
+                    rows.extend(
+                        (int(datetime.fromisoformat(c["date"]).timestamp()),
+                         c["author_login"] or c["author"])
+                        for c in page
+                        if c["date"]
+                    )
+                    if len(rows) >= MAX_TIMELINE_COMMITS:
+                        truncated = True
+                        break
+            finally:
+                await pages.aclose()
+
+        # 作者以字典編碼儲存:每筆 commit 只存一個整數索引
+        index: dict[str, int] = {}
+        author_ids = [index.setdefault(author, len(index)) for _, author in rows]
+        return {
+            "timestamps": [timestamp for timestamp, _ in rows],
+            "author_ids": author_ids,
+            "authors": list(index),
+            "since": since,
+            "truncated": truncated,
+        }
+
+    async def _backfill_commits(
+        self, owner: str, repo: str, branch: str | None, since: str | None
+    ) -> bool:
+        """向前回補 commit 儲存,直到涵蓋 since、到達最早的 commit 或筆數上限
+
+        Returns:
+            bool: 是否因筆數上限而停止
+        """
+        store = self._commit_store
+        repo_key = _repo_key(owner, repo)
+        branch_key = branch or ""
+        while True:
+            state = await asyncio.to_thread(store.state, repo_key, branch_key)
+            oldest = await asyncio.to_thread(store.oldest, repo_key, branch_key)
+            if state is None or oldest is None or state.complete:
+                return False
+            oldest_sha, oldest_date, count = oldest
+            if since is not None and oldest_date <= since:
+                return False
+            if count >= MAX_TIMELINE_COMMITS:
+                return True
+
+            page = await self._get(
+                f"/repos/{owner}/{repo}/commits",
+                owner,
+                repo,
+                params={"per_page": MAX_COMMIT_PAGE, "sha": oldest_sha},
+            )
+            older = [_commit_dict(commit) for commit in page if commit["sha"] != oldest_sha]
+            await asyncio.to_thread(
+                store.extend, repo_key, branch_key, older, len(page) < MAX_COMMIT_PAGE
+            )
+
+    async def get_commit_page(
+        self,
+        owner: str,
+        repo: str,
+        limit: int = 10,
+        branch: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        path: str | None = None,
+        cursor: str | None = None,
+    ) -> dict:
+        """取得一頁 commits,以及取得下一頁用的 cursor
+
+        篩選條件直接交給 GitHub 處理,每頁只發出一次請求 (per_page = limit)。
+        提供 cursor 時,limit、branch 與篩選條件都由 cursor 決定。
+
+        Args:
+            owner: 倉庫擁有者
+            repo: 倉庫名稱
+            limit: 每頁 commit 數量 (1-100)
+            branch: 指定分支名稱,若為 None 則使用預設分支
+            since: 只列出此時間之後的 commits (ISO 8601)
+            until: 只列出此時間之前的 commits (ISO 8601)
+            path: 只列出修改此檔案或目錄的 commits
+            cursor: 上一頁回傳的 next_cursor
+
+        Returns:
+            dict: 包含:
+                - commits (list[dict]): 格式與 get_recent_commits 相同
+                - next_cursor (str | None): 下一頁的 cursor;沒有下一頁時為 None
+                - branch (str | None): 實際使用的分支 (None 表示預設分支)
+                - limit (int): 實際使用的每頁數量
+
+        Raises:
+            ValueError: cursor 格式不正確
+            RepositoryNotFoundError: 倉庫或分支不存在
+            AuthenticationError: 認證失敗
+            GitHubClientError: 其他 API 錯誤
+        """
+        if cursor is not None:
+            position = _CommitCursor.decode(cursor)
+        else:
+            position = _CommitCursor(
+                sha=branch,
+                page=1,
+                per_page=limit,
+                since=since,
+                until=until,
+                path=path,
+                branch=branch,
+            )
+        page = await self._cached(
+            "get_commit_page",
+            (owner.lower(), repo.lower(), *astuple(position)),
+            self._fetch_commit_page,
+            owner,
+            repo,
+            position,
+        )
+        # WHY report the cursor's values: with a cursor the request's own
+        # branch and limit are ignored, so echoing them would misdescribe the page
+        return {**page, "branch": position.branch, "limit": position.per_page}
+
+    async def _fetch_commit_page(
+        self,
+        owner: str,
+        repo: str,
+        position: _CommitCursor,
+        validators: _Validators | None = None,
+    ) -> dict:
+        params: dict[str, Any] = {"per_page": position.per_page, "page": position.page}
+        for name in ("sha", "since", "until", "path"):
+            value = getattr(position, name)
+            if value:
+                params[name] = value
+
+        commits = await self._get(
+            f"/repos/{owner}/{repo}/commits",
+            owner,
+            repo,
+            params=params,
+            validators=validators,
+        )
+
+        # 拿到整頁時才可能有下一頁;最後一頁剛好滿時,下一頁會是空的
+        next_cursor = None
+        if len(commits) == position.per_page:
+            if not position.pinned:
+                head = await self._head_sha(owner, repo, position, commits)
+                position = replace(position, sha=head, pinned=True)
+            next_cursor = replace(position, page=position.page + 1).encode()
+
+        return {
+            "commits": [_commit_dict(commit) for commit in commits],
+            "next_cursor": next_cursor,
+        }
+
+    async def iter_commit_pages(
+        self,
+        owner: str,
+        repo: str,
+        branch: str | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        path: str | None = None,
+        after: str | None = None,
+    ) -> AsyncIterator[list[dict]]:
+        """逐頁產生完整的 commit 歷史 (每頁最多 100 筆),用於匯出
+
+        不經過快取,且以 BACKGROUND 優先權送出:大量匯出不應佔用介面層保留的額度。
+        同時最多只預先取得下一頁,呼叫端讀取變慢時,向 GitHub 的分頁也會跟著暫停。
+
+        Args:
+            owner: 倉庫擁有者
+            repo: 倉庫名稱
+            branch: 指定分支名稱,若為 None 則使用預設分支
+            since: 只列出此時間之後的 commits (ISO 8601)
+            until: 只列出此時間之前的 commits (ISO 8601)
+            path: 只列出修改此檔案或目錄的 commits
+            after: 從此 commit 之後繼續 (不含該 commit),用於中斷後續傳;
+                   會列出從該 commit 可到達的歷史
+
+        Yields:
+            list[dict]: 一頁 commits,格式與 get_recent_commits 相同
+
+        Raises:
+            RepositoryNotFoundError: 倉庫、分支或 commit 不存在
+            RateLimitError: 額度不足 (可稍後以 after 續傳)
+            GitHubClientError: 其他 API 錯誤
+        """
+        # WHY prioritized() around each fetch: generator code runs in the
+        # consumer's context, so setting the priority once here would leave the
+        # rest of the consumer's request at BACKGROUND.
+        position = _CommitCursor(
+            sha=after or branch,
+            page=1,
+            per_page=100,
+            since=since,
+            until=until,
+            path=path,
+            pinned=after is not None,
+            branch=branch,
+        )
+        with upstream_method("iter_commit_pages"), prioritized(Priority.BACKGROUND):
+            page = await self._fetch_commit_page(owner, repo, position)
+        if after is not None and page["commits"] and page["commits"][0]["sha"] == after:
+            page["commits"] = page["commits"][1:]
+
+        while True:
+            prefetch = None
+            if page["next_cursor"]:
+                position = _CommitCursor.decode(page["next_cursor"])
+                with upstream_method("iter_commit_pages"), prioritized(Priority.BACKGROUND):
+                    # task 建立時複製目前的 context,因此也帶有此標記與優先權
+                    prefetch = asyncio.ensure_future(
+                        self._fetch_commit_page(owner, repo, position)
+                    )
+            try:
+                yield page["commits"]
+            except BaseException:
+                # 呼叫端中途停止 (例如連線中斷) 時取消預先取得的下一頁
+                if prefetch is not None:
+                    prefetch.cancel()
+                raise
+            if prefetch is None:
+                return
+            page = await prefetch
+
+    async def _head_sha(
+        self, owner: str, repo: str, position: _CommitCursor, commits: list[dict]
+    ) -> str:
+        """取得第一頁時分支的 HEAD commit SHA (用於固定後續分頁)"""
+        if not position.filtered:
+            # 沒有篩選時,第一頁的第一個 commit 就是 HEAD
+            return commits[0]["sha"]
+        params: dict[str, Any] = {"per_page": 1}
+        if position.sha:
+            params["sha"] = position.sha
+        head = await self._get(f"/repos/{owner}/{repo}/commits", owner, repo, params=params)
+        return head[0]["sha"]
+
+    async def get_contributors_stats(
+        self, owner: str, repo: str, top_n: int = 10
+    ) -> list[dict]:
+        """取得貢獻者統計資訊
+
+        回傳格式與 GitHubClient.get_contributors_stats 相同。
+
+        Raises:
+            RepositoryNotFoundError: 倉庫不存在
+            AuthenticationError: 認證失敗
+            GitHubClientError: 其他 API 錯誤
+        """
+        return await self._cached(
+            "get_contributors_stats",
+            (owner.lower(), repo.lower(), top_n),
+            self._fetch_contributors_stats,
+            owner,
+            repo,
+            top_n,
+        )
+
+    async def _fetch_contributors_stats(
+        self,
+        owner: str,
+        repo: str,
+        top_n: int,
+        validators: _Validators | None = None,
+    ) -> list[dict]:
+        contributors = await self._get(
+            f"/repos/{owner}/{repo}/contributors",
+            owner,
+            repo,
+            params={"per_page": top_n},
+            validators=validators,
+        )
+
+        result = []
+        for contributor in (contributors or [])[:top_n]:
+            result.append({
+                "login": contributor["login"],
+                "contributions": contributor["contributions"],
+                "avatar_url": contributor["avatar_url"],
+                "profile_url": contributor["html_url"],
+            })
+
+        return result
+
+    async def get_languages(self, owner: str, repo: str) -> dict:
+        """取得倉庫程式語言分布
+
+        回傳格式與 GitHubClient.get_languages 相同 (語言 → 百分比)。
+        百分比由快取的原始 bytes (get_language_bytes) 計算。
+
+        Raises:
+            RepositoryNotFoundError: 倉庫不存在
+            AuthenticationError: 認證失敗
+            GitHubClientError: 其他 API 錯誤
+        """
+        return language_percentages(await self.get_language_bytes(owner, repo))
+
+    async def get_language_bytes(self, owner: str, repo: str) -> dict[str, int]:
+        """取得倉庫各程式語言的原始 bytes 數
+
+        WHY cache bytes rather than percentages: rounded percentages cannot be
+        recombined across repositories; bytes can be summed and reweighted.
+
+        Returns:
+            dict[str, int]: 語言 → bytes 數
+
+        Raises:
+            RepositoryNotFoundError: 倉庫不存在
+            AuthenticationError: 認證失敗
+            GitHubClientError: 其他 API 錯誤
+        """
+        return await self._cached(
+            "get_language_bytes",
+            (owner.lower(), repo.lower()),
+            self._fetch_language_bytes,
+            owner,
+            repo,
+        )
+
+    async def _fetch_language_bytes(
+        self, owner: str, repo: str, validators: _Validators | None = None
+    ) -> dict[str, int]:
+        languages = await self._get(
+            f"/repos/{owner}/{repo}/languages", owner, repo, validators=validators
+        )
+        return dict(languages or {})
+
+    async def list_owner_repositories(self, owner: str, limit: int = 100) -> list[dict]:
+        """列出使用者或組織的公開倉庫 (依最後 push 時間排序)
+
+        Args:
+            owner: 使用者名稱或組織名稱
+            limit: 最多回傳的倉庫數
+
+        Returns:
+            list[dict]: 每個倉庫包含 owner、repo、fork、archived、stars
+
+        Raises:
+            RepositoryNotFoundError: 使用者或組織不存在
+            AuthenticationError: 認證失敗
+            GitHubClientError: 其他 API 錯誤
+        """
+        return await self._cached(
+            "list_owner_repositories",
+            (owner.lower(), limit),
+            self._fetch_owner_repositories,
+            owner,
+            limit,
+        )
+
+    async def _fetch_owner_repositories(
+        self, owner: str, limit: int, validators: _Validators | None = None
+    ) -> list[dict]:
+        result = []
+        page = 1
+        per_page = min(limit, MAX_COMMIT_PAGE)
+        while len(result) < limit:
+            try:
+                # /users/{owner}/repos 對組織同樣有效
+                repositories = await self._get(
+                    f"/users/{owner}/repos",
+                    owner,
+                    "",
+                    params={"type": "owner", "sort": "pushed", "per_page": per_page, "page": page},
+                )
+            except RepositoryNotFoundError as e:
+                raise RepositoryNotFoundError(
+                    f"User or organization '{owner}' not found"
+                ) from e
+            result.extend(_repository_ref(repository) for repository in repositories)
+            if len(repositories) < per_page:
+                break
+            page += 1
+        return result[:limit]
+
+    async def search_topic_repositories(self, topic: str, limit: int = 100) -> list[dict]:
+        """搜尋帶有指定 topic 的倉庫 (依 stars 排序)
+
+        使用搜尋 API,額度與 core 分開計算 (search 資源);GitHub 最多回傳 1000 筆。
+
+        Args:
+            topic: GitHub topic 名稱
+            limit: 最多回傳的倉庫數
+
+        Returns:
+            list[dict]: 格式與 list_owner_repositories 相同
+
+        Raises:
+            AuthenticationError: 認證失敗
+            RateLimitError: 搜尋 API 速率限制
+            GitHubClientError: 其他 API 錯誤
+        """
+        return await self._cached(
+            "search_topic_repositories",
+            (topic.lower(), limit),
+            self._fetch_topic_repositories,
+            topic,
+            limit,
+        )
+
+    async def _fetch_topic_repositories(
+        self, topic: str, limit: int, validators: _Validators | None = None
+    ) -> list[dict]:
+        result = []
+        page = 1
+        per_page = min(limit, MAX_COMMIT_PAGE)
+        while len(result) < min(limit, MAX_SEARCH_RESULTS):
+            body = await self._get(
+                "/search/repositories",
+                "topic",
+                topic,
+                params={
+                    "q": f"topic:{topic}",
+                    "sort": "stars",
+                    "order": "desc",
+                    "per_page": per_page,
+                    "page": page,
+                },
+                resource="search",
+            )
+            items = body.get("items") or []
+            result.extend(_repository_ref(repository) for repository in items)
+            if len(items) < per_page:
+                break
+            page += 1
+        return result[:limit]
+
+    async def get_pushed_at(self, owner: str, repo: str) -> str:
+        """取得倉庫最後一次 push 的時間 (ISO 8601),用於「直到下次 push 前都有效」的快取
+
+        Raises:
+            RepositoryNotFoundError: 倉庫不存在
+            GitHubClientError: 其他 API 錯誤
+        """
+        return await self._cached(
+            "get_pushed_at",
+            (owner.lower(), repo.lower()),
+            self._fetch_pushed_at,
+            owner,
+            repo,
+        )
+
+    async def _fetch_pushed_at(
+        self, owner: str, repo: str, validators: _Validators | None = None
+    ) -> str:
+        repository = await self._get(
+            f"/repos/{owner}/{repo}", owner, repo, validators=validators
+        )
+        return _isoformat(repository.get("pushed_at"))
+
+    async def get_contributor_activity(self, owner: str, repo: str) -> dict:
+        """取得每位貢獻者每週的新增/刪除行數與 commit 數
+
+        資料來自 GitHub 的 /stats/contributors (預設分支、前 100 名貢獻者)。
+        GitHub 回應 202 時以退避方式非同步輪詢,最多等待 GITHUB_STATS_WAIT 秒。
+        結果以最後 push 時間作為快取鍵,直到下一次 push 前都不會重新計算。
+
+        Returns:
+            dict: 精簡的週資料,包含:
+                - week_start (int): 第一週的起始時間 (epoch 秒);之後每週遞增 604800
+                - weeks (int): 週數 (已去除開頭沒有任何活動的週)
+                - authors (list[dict]): 依 commit 數由多到少排序,每位包含
+                  login、avatar_url、profile_url、commits (總數),
+                  以及長度為 weeks 的 weekly_additions、weekly_deletions、weekly_commits
+
+        Raises:
+            StatisticsPendingError: 等待時間內 GitHub 仍未完成計算
+            RepositoryNotFoundError: 倉庫不存在
+            AuthenticationError: 認證失敗
+            GitHubClientError: 其他 API 錯誤
+        """
+        pushed_at = await self.get_pushed_at(owner, repo)
+        return await self._cached(
+            "get_contributor_activity",
+            (owner.lower(), repo.lower(), pushed_at),
+            self._fetch_contributor_activity,
+            owner,
+            repo,
+        )
+
+    async def _fetch_contributor_activity(
+        self, owner: str, repo: str, validators: _Validators | None = None
+    ) -> dict:
+        path = f"/repos/{owner}/{repo}/stats/contributors"
+        deadline = time.monotonic() + self._stats_wait
+        delay = STATS_POLL_INITIAL
+        while True:
+            try:
+                stats = await self._get(path, owner, repo, validators=validators)
+                break
+            except _Pending:
+                # WHY sleep instead of blocking: the first request only asks
+                # GitHub to start computing. Waiting with asyncio.sleep keeps the
+                # event loop serving other calls, and SingleFlight makes every
+                # concurrent caller share this one polling loop.
+                if time.monotonic() + delay > deadline:
+                    raise StatisticsPendingError(
+                        f"GitHub is still computing contributor statistics for "
+                        f"'{owner}/{repo}'; try again shortly"
+                    )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, STATS_POLL_MAX)
+
+        return _compact_activity(stats or [])
+
+    async def get_contributor_line_stats(
+        self, owner: str, repo: str, top_n: int = 10
+    ) -> dict:
+        """取得貢獻者統計,並加上每位貢獻者的新增/刪除行數
+
+        Returns:
+            dict: 包含:
+                - contributors (list[dict]): get_contributors_stats 的欄位,另外包含
+                  additions、deletions (int | None);該貢獻者不在行數統計的前 100 名,
+                  或 GitHub 仍在計算時為 None
+                - line_stats_pending (bool): GitHub 仍在計算行數統計 (回應 202),稍後再查詢即可取得
+
+        Raises:
+            RepositoryNotFoundError: 倉庫不存在
+            AuthenticationError: 認證失敗
+            GitHubClientError: 其他 API 錯誤
+        """
+        # WHY sequential awaits: both usually come from cache, and the freshness
+        # recorded by a lookup stays in the task that ran it. Awaiting directly
+        # keeps it in the caller's context; the contributor list goes last
+        # because the line counts are keyed by pushed_at and so always current.
+        try:
+            activity = await self.get_contributor_activity(owner, repo)
+            pending = False
+        except StatisticsPendingError:
+            activity = {"authors": []}
+            pending = True
+        contributors = await self.get_contributors_stats(owner, repo, top_n=top_n)
+
+        lines = {
+            author["login"]: (
+                sum(author["weekly_additions"]),
+                sum(author["weekly_deletions"]),
+            )
+            for author in activity["authors"]
+        }
+        result = []
+        for contributor in contributors:
+            additions, deletions = lines.get(contributor["login"], (None, None))
+            result.append({**contributor, "additions": additions, "deletions": deletions})
+
+        return {"contributors": result, "line_stats_pending": pending}
+
+
+def _compact_activity(stats: list[dict]) -> dict:
+    """將 /stats/contributors 的回應轉為共用週序列的精簡格式
+
+    GitHub 為每位作者重複每一週的 {"w", "a", "d", "c"} 物件;
+    這裡只保留一次週起點,每位作者存三個整數陣列,大約只需原本 1/4 的空間。
+    """
+    if not stats:
+        return {"week_start": 0, "weeks": 0, "authors": []}
+
+    weeks = [week["w"] for week in stats[0]["weeks"]]
+    first = len(weeks)
+    for author in stats:
+        for index, week in enumerate(author["weeks"][:first]):
+            if week["a"] or week["d"] or week["c"]:
+                first = index
+                break
+
+    authors = []
+    for author in stats:
+        user = author.get("author")
+        series = author["weeks"][first:]
+        authors.append({
+            # 已刪除的帳號沒有 author;GitHub 介面上顯示為 ghost
+            "login": user["login"] if user else "ghost",
+            "avatar_url": user["avatar_url"] if user else "",
+            "profile_url": user["html_url"] if user else "",
+            "commits": author["total"],
+            "weekly_additions": [week["a"] for week in series],
+            "weekly_deletions": [week["d"] for week in series],
+            "weekly_commits": [week["c"] for week in series],
+        })
+    authors.sort(key=lambda a: a["commits"], reverse=True)
+
+    return {
+        "week_start": weeks[first] if first < len(weeks) else 0,
+        "weeks": len(weeks) - first,
+        "authors": authors,
+    }
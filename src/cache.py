@@ -0,0 +1,297 @@
+# 回應快取
+# 以記憶體大小為上限的 LRU + TTL 快取,供 AsyncGitHubClient 使用
+#
+# WHY cache method results instead of HTTP responses: Dashboards poll the same
+# handful of repositories all day. Caching the already-transformed dicts means a
+# hit skips the upstream call *and* the JSON-to-dict transformation, and the key
+# (method + arguments) is exactly what callers ask for.
+
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+# WHY 16 MiB: the estimate below counts serialized JSON bytes, and CPython's
+# dict/str objects take roughly 3x that in memory. 16 MiB of JSON therefore
+# lands around 50 MiB resident — comfortable inside the 256Mi pod limit
+# (k8s/deployment-api.yaml) next to the ~50MB uvicorn baseline.
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# WHY these TTLs: language breakdowns and contributor rankings move slowly,
+# while commit lists are what users expect to be "live". Repo stats (stars,
+# issues) sit in between.
+DEFAULT_TTLS = {
+    "get_repo_statistics": 300.0,
+    "get_recent_commits": 60.0,
+    "get_commit_page": 60.0,
+    "get_commit_timeline": 300.0,
+    "get_contributors_stats": 3600.0,
+    # 快取原始 bytes (百分比由此計算),跨倉庫彙總時才能正確加權
+    "get_language_bytes": 6 * 3600.0,
+    "list_owner_repositories": 3600.0,
+    "search_topic_repositories": 3600.0,
+    # 程式碼行數統計以最後 push 時間為快取鍵的一部分,push 之前都不會改變;
+    # 這裡的 TTL 只決定舊項目多久後被淘汰
+    "get_pushed_at": 60.0,
+    "get_contributor_activity": 7 * 24 * 3600.0,
+}
+
+# 負面結果 (例如 RepositoryNotFoundError) 只快取很短的時間,避免倉庫建立後仍回傳 404
+DEFAULT_NEGATIVE_TTL = 30.0
+
+
+@dataclass
+class CacheEntry:
+    """快取項目
+
+    Attributes:
+        value: 快取的回傳值 (error 為 None 時有效)
+        error: 快取的例外 (負面快取),以 (例外類別, 參數) 儲存
+        expires_at: 過期時間 (time.time(),跨程序共用快取時也能比較)
+        size: 估計的大小 (bytes)
+        etag: GitHub 回應的 ETag,用於 If-None-Match 重新驗證
+        last_modified: GitHub 回應的 Last-Modified,用於 If-Modified-Since
+        stored_at: 取得 (或重新驗證) 資料的時間,用於計算 Age
+    """
+
+    value: Any
+    error: tuple[type, tuple] | None
+    expires_at: float
+    size: int
+    etag: str | None = None
+    last_modified: str | None = None
+    stored_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def for_value(
+        cls,
+        value: Any,
+        ttl: float,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> "CacheEntry":
+        """建立一般快取項目"""
+        return cls(
+            value=value,
+            error=None,
+            expires_at=time.time() + ttl,
+            size=_estimate_size(value),
+            etag=etag,
+            last_modified=last_modified,
+        )
+
+    @property
+    def revalidatable(self) -> bool:
+        """是否帶有可用於條件式請求的 validator"""
+        return self.error is None and bool(self.etag or self.last_modified)
+
+    @classmethod
+    def for_error(cls, error: Exception, ttl: float) -> "CacheEntry":
+        """建立負面快取項目"""
+        return cls(
+            value=None,
+            error=(type(error), error.args),
+            expires_at=time.time() + ttl,
+            size=_estimate_size(error.args),
+        )
+
+    def unwrap(self) -> Any:
+        """回傳快取值;若為負面快取則重新拋出例外"""
+        if self.error is not None:
+            exc_type, args = self.error
+            raise exc_type(*args)
+        return self.value
+
+
+@dataclass(frozen=True)
+class Freshness:
+    """回傳資料的新鮮度
+
+    Attributes:
+        age: 資料自取得 (或上次重新驗證) 以來的秒數
+        stale: 是否為過期後仍先行回傳的資料 (stale-while-revalidate)
+    """
+
+    age: float
+    stale: bool
+
+
+_freshness: ContextVar[Freshness | None] = ContextVar("freshness", default=None)
+
+
+def record_freshness(entry: CacheEntry, stale: bool = False) -> None:
+    """記錄目前 context 最近一次回傳資料的新鮮度"""
+    _freshness.set(Freshness(age=max(0.0, time.time() - entry.stored_at), stale=stale))
+
+
+def current_freshness() -> Freshness | None:
+    """取得目前 context 最近一次 AsyncGitHubClient 呼叫的資料新鮮度
+
+    WHY a context variable: the client methods return plain dicts shared with
+    the cache, so they cannot carry per-request metadata. Each HTTP request and
+    MCP tool call runs in its own asyncio task, so the value read here belongs
+    to the caller's own most recent lookup.
+    """
+    return _freshness.get()
+
+
+def _estimate_size(value: Any) -> int:
+    """以 JSON 序列化長度估計物件大小"""
+    return len(json.dumps(value, default=str))
+
+
+class TTLCache:
+    """以記憶體大小為上限的 LRU + TTL 快取
+
+    不是 thread-safe;設計上只在單一 event loop 中使用。
+    回傳的快取值與其他呼叫者共用,呼叫端不應修改。
+
+    Attributes:
+        max_bytes: 估計大小上限 (bytes)
+        stale_window: 過期後仍保留、可先行回傳的秒數 (0 表示停用)
+        hits: 命中次數
+        misses: 未命中次數 (包含已過期)
+        evictions: 因超過大小上限被移除的項目數
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, stale_window: float = 0.0):
+        """初始化快取
+
+        Args:
+            max_bytes: 估計大小上限 (bytes)
+            stale_window: 過期後仍保留、可先行回傳的秒數 (0 表示停用)
+        """
+        self.max_bytes = max_bytes
+        self.stale_window = stale_window
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "TTLCache":
+        """依環境變數 GITHUB_CACHE_MAX_BYTES / GITHUB_CACHE_STALE_WINDOW 建立快取"""
+        return cls(
+            max_bytes=int(os.environ.get("GITHUB_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            stale_window=float(os.environ.get("GITHUB_CACHE_STALE_WINDOW", "0")),
+        )
+
+    def get(self, key: Hashable) -> CacheEntry | None:
+        """取得未過期的快取項目
+
+        過期但帶有 validator 或仍在 stale_window 內的項目會保留 (直到被 LRU 淘汰),
+        讓呼叫端可用 get_stale() 取出,先行回傳或向 GitHub 發出條件式請求。
+
+        Args:
+            key: 快取鍵
+
+        Returns:
+            Optional[CacheEntry]: 命中時回傳項目,否則回傳 None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        now = time.time()
+        if entry.expires_at <= now:
+            if not entry.revalidatable and now > entry.expires_at + self.stale_window:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def get_stale(self, key: Hashable) -> CacheEntry | None:
+        """取得項目 (不論是否過期),不影響命中統計
+
+        Args:
+            key: 快取鍵
+
+        Returns:
+            Optional[CacheEntry]: 項目或 None
+        """
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """寫入快取值
+
+        Args:
+            key: 快取鍵
+            value: 要快取的值 (必須可 JSON 序列化)
+            ttl: 存活秒數
+        """
+        self.put(key, CacheEntry.for_value(value, ttl))
+
+    def set_error(self, key: Hashable, error: Exception, ttl: float) -> None:
+        """寫入負面快取 (例外)
+
+        Args:
+            key: 快取鍵
+            error: 要快取的例外
+            ttl: 存活秒數
+        """
+        self.put(key, CacheEntry.for_error(error, ttl))
+
+    def put(self, key: Hashable, entry: CacheEntry) -> None:
+        """寫入項目並依 LRU 順序淘汰超出上限的項目
+
+        Args:
+            key: 快取鍵
+            entry: 快取項目 (例如從共用快取層讀回的項目)
+        """
+        if entry.size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = entry
+        self._bytes += entry.size
+
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def clear(self) -> None:
+        """清空快取 (統計數字保留)"""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """回傳快取統計資訊"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def load_ttls() -> dict[str, float]:
+    """讀取各方法的 TTL 設定
+
+    預設值為 DEFAULT_TTLS,可用 GITHUB_CACHE_TTLS 覆寫,例如:
+    GITHUB_CACHE_TTLS="get_language_bytes=21600,get_recent_commits=60"
+
+    Returns:
+        dict[str, float]: 方法名稱 → TTL 秒數
+    """
+    ttls = dict(DEFAULT_TTLS)
+    for item in os.environ.get("GITHUB_CACHE_TTLS", "").split(","):
+        if "=" in item:
+            method, seconds = item.split("=", 1)
+            ttls[method.strip()] = float(seconds)
+    return ttls
@@ -0,0 +1,333 @@
+# 本機 commit 儲存 (SQLite)
+# 依倉庫與分支保存已同步的 commit 歷史,每次只向 GitHub 取得新增的部分
+#
+# WHY a local store: commit history is append-only in the common case, yet every
+# commit request re-downloaded it from the top. Keeping what was already seen
+# on disk turns a refresh into one conditional request (a free 304 when nothing
+# was pushed) plus one compare call when something was, and lets history
+# queries run against indexed tables instead of paging the API.
+#
+# 所有方法都是同步的 (sqlite3);AsyncGitHubClient 以 asyncio.to_thread 呼叫,
+# 不會阻塞事件迴圈。
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    repo TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    message TEXT NOT NULL,
+    author TEXT NOT NULL,
+    author_login TEXT NOT NULL,
+    date TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (repo, sha)
+);
+CREATE INDEX IF NOT EXISTS commits_repo_date ON commits (repo, date);
+CREATE INDEX IF NOT EXISTS commits_repo_author ON commits (repo, author_login);
+
+CREATE TABLE IF NOT EXISTS branch_commits (
+    repo TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    sha TEXT NOT NULL,
+    PRIMARY KEY (repo, branch, seq)
+);
+CREATE UNIQUE INDEX IF NOT EXISTS branch_commits_sha ON branch_commits (repo, branch, sha);
+
+CREATE TABLE IF NOT EXISTS branches (
+    repo TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    head_sha TEXT NOT NULL,
+    etag TEXT,
+    complete INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (repo, branch)
+);
+"""
+
+_COLUMNS = ("sha", "message", "author", "author_login", "date", "url")
+
+
+@dataclass
+class BranchState:
+    """分支的同步狀態
+
+    Attributes:
+        head_sha: 最後一次同步時的 HEAD commit
+        etag: 最後一次同步時第一頁 commits 的 ETag (用於條件式請求)
+        complete: 是否已保存到最早的 commit
+        synced_at: 最後同步時間 (epoch 秒)
+    """
+
+    head_sha: str
+    etag: str | None
+    complete: bool
+    synced_at: float
+
+
+class CommitStore:
+    """以 SQLite 保存的 commit 歷史
+
+    每個分支的 commit 以 seq 排序:數字越大越新,與 GitHub 列出的順序一致。
+    分支空字串表示預設分支。
+    """
+
+    def __init__(self, path: str):
+        """開啟 (或建立) 資料庫
+
+        Args:
+            path: SQLite 檔案路徑;":memory:" 表示只存在記憶體中
+        """
+        # WHY one shared connection behind a lock: calls arrive from the
+        # to_thread worker pool, and SQLite serializes writers anyway. WAL lets
+        # readers in other processes proceed while a sync is writing.
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> "CommitStore | None":
+        """依環境變數 GITHUB_COMMIT_STORE (檔案路徑) 建立;未設定時回傳 None"""
+        path = os.environ.get("GITHUB_COMMIT_STORE")
+        if not path:
+            return None
+        return cls(path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def state(self, repo: str, branch: str) -> BranchState | None:
+        """取得分支的同步狀態;尚未同步過時回傳 None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT head_sha, etag, complete, synced_at FROM branches "
+                "WHERE repo = ? AND branch = ?",
+                (repo, branch),
+            ).fetchone()
+        if row is None:
+            return None
+        return BranchState(row["head_sha"], row["etag"], bool(row["complete"]), row["synced_at"])
+
+    def touch(self, repo: str, branch: str, etag: str | None) -> None:
+        """HEAD 沒有改變時,只更新 ETag 與同步時間"""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE branches SET etag = ?, synced_at = ? WHERE repo = ? AND branch = ?",
+                (etag, time.time(), repo, branch),
+            )
+
+    def contains(self, repo: str, branch: str, sha: str) -> bool:
+        """分支中是否已有此 commit"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM branch_commits WHERE repo = ? AND branch = ? AND sha = ?",
+                (repo, branch, sha),
+            ).fetchone()
+        return row is not None
+
+    def replace(
+        self,
+        repo: str,
+        branch: str,
+        commits: list[dict],
+        etag: str | None,
+        complete: bool,
+    ) -> None:
+        """清除分支並以 commits (由新到舊) 重新建立
+
+        Args:
+            repo: 倉庫 (owner/repo,小寫)
+            branch: 分支名稱 (空字串為預設分支)
+            commits: 由新到舊的 commits,格式與 get_recent_commits 相同
+            etag: 第一頁 commits 的 ETag
+            complete: commits 是否已包含最早的 commit
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM branch_commits WHERE repo = ? AND branch = ?", (repo, branch)
+            )
+            self._insert(repo, branch, commits, start=0, step=-1)
+            self._db.execute(
+                "INSERT OR REPLACE INTO branches "
+                "(repo, branch, head_sha, etag, complete, synced_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (repo, branch, commits[0]["sha"], etag, int(complete), time.time()),
+            )
+
+    def advance(
+        self,
+        repo: str,
+        branch: str,
+        base_sha: str,
+        commits: list[dict],
+        head_sha: str,
+        etag: str | None,
+    ) -> None:
+        """將分支移到新的 HEAD
+
+        先移除 base_sha 之後 (較新) 的 commit,再接上 commits。
+        fast-forward 時 base_sha 就是原本的 HEAD,不會移除任何 commit;
+        force push 時 base_sha 是新舊 HEAD 的 merge base,被覆寫掉的 commit 會被移除。
+
+        Args:
+            repo: 倉庫 (owner/repo,小寫)
+            branch: 分支名稱 (空字串為預設分支)
+            base_sha: 保留的最新 commit (必須已在分支中)
+            commits: base_sha 之後的新 commits,由舊到新
+            head_sha: 新的 HEAD commit
+            etag: 第一頁 commits 的 ETag
+        """
+        with self._lock, self._db:
+            (base_seq,) = self._db.execute(
+                "SELECT seq FROM branch_commits WHERE repo = ? AND branch = ? AND sha = ?",
+                (repo, branch, base_sha),
+            ).fetchone()
+            self._db.execute(
+                "DELETE FROM branch_commits WHERE repo = ? AND branch = ? AND seq > ?",
+                (repo, branch, base_seq),
+            )
+            self._insert(repo, branch, commits, start=base_seq + 1, step=1)
+            self._db.execute(
+                "UPDATE branches SET head_sha = ?, etag = ?, synced_at = ? "
+                "WHERE repo = ? AND branch = ?",
+                (head_sha, etag, time.time(), repo, branch),
+            )
+
+    def extend(self, repo: str, branch: str, commits: list[dict], complete: bool) -> int:
+        """在分支最舊的 commit 之前接上更舊的 commits (回補歷史)
+
+        沒有任何新 commit 時也視為已到達最早的 commit,避免回補無限重複。
+
+        Args:
+            repo: 倉庫 (owner/repo,小寫)
+            branch: 分支名稱 (空字串為預設分支)
+            commits: 由新到舊的 commits;已在分支中的會被略過
+            complete: 是否已到達最早的 commit
+
+        Returns:
+            int: 實際新增的 commit 數
+        """
+        with self._lock, self._db:
+            (oldest_seq,) = self._db.execute(
+                "SELECT MIN(seq) FROM branch_commits WHERE repo = ? AND branch = ?",
+                (repo, branch),
+            ).fetchone()
+            known = {
+                row[0]
+                for row in self._db.execute(
+                    "SELECT sha FROM branch_commits WHERE repo = ? AND branch = ? "
+                    f"AND sha IN ({', '.join('?' for _ in commits)})",
+                    (repo, branch, *(commit["sha"] for commit in commits)),
+                )
+            }
+            new = [commit for commit in commits if commit["sha"] not in known]
+            self._insert(repo, branch, new, start=oldest_seq - 1, step=-1)
+            self._db.execute(
+                "UPDATE branches SET complete = ? WHERE repo = ? AND branch = ?",
+                (int(complete or not new), repo, branch),
+            )
+        return len(new)
+
+    def oldest(self, repo: str, branch: str) -> tuple[str, str, int] | None:
+        """回傳分支中最舊 commit 的 (sha, date) 與已保存的 commit 數"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT b.sha, c.date, (SELECT COUNT(*) FROM branch_commits "
+                "WHERE repo = b.repo AND branch = b.branch) AS count "
+                "FROM branch_commits b JOIN commits c ON c.repo = b.repo AND c.sha = b.sha "
+                "WHERE b.repo = ? AND b.branch = ? ORDER BY b.seq LIMIT 1",
+                (repo, branch),
+            ).fetchone()
+        if row is None:
+            return None
+        return row["sha"], row["date"], row["count"]
+
+    def timeline(
+        self, repo: str, branch: str, since: str | None = None
+    ) -> list[tuple[int, str]]:
+        """以 (epoch 秒, 作者) 的欄位形式回傳 commits,供向量化分析使用
+
+        作者優先使用 GitHub 帳號,沒有帳號時使用 git 作者名稱。
+        """
+        query = (
+            "SELECT CAST(strftime('%s', c.date) AS INTEGER), "
+            "CASE WHEN c.author_login != '' THEN c.author_login ELSE c.author END "
+            "FROM branch_commits b JOIN commits c ON c.repo = b.repo AND c.sha = b.sha "
+            "WHERE b.repo = ? AND b.branch = ? AND c.date != ''"
+        )
+        params: list = [repo, branch]
+        if since:
+            query += " AND c.date >= ?"
+            params.append(since)
+        with self._lock:
+            return self._db.execute(query, params).fetchall()
+
+    def _insert(
+        self, repo: str, branch: str, commits: list[dict], start: int, step: int
+    ) -> None:
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO commits (repo, {', '.join(_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' for _ in _COLUMNS)})",
+            [(repo, *(commit[column] for column in _COLUMNS)) for commit in commits],
+        )
+        self._db.executemany(
+            "INSERT OR REPLACE INTO branch_commits (repo, branch, seq, sha) VALUES (?, ?, ?, ?)",
+            [
+                (repo, branch, start + index * step, commit["sha"])
+                for index, commit in enumerate(commits)
+            ],
+        )
+
+    def recent(
+        self,
+        repo: str,
+        branch: str,
+        limit: int | None = None,
+        since: str | None = None,
+        until: str | None = None,
+        author_login: str | None = None,
+    ) -> list[dict]:
+        """依 GitHub 的順序 (由新到舊) 查詢分支中的 commits
+
+        Args:
+            repo: 倉庫 (owner/repo,小寫)
+            branch: 分支名稱 (空字串為預設分支)
+            limit: 最多回傳幾筆;None 表示全部
+            since: 只包含此時間 (含) 之後的 commits (UTC ISO 8601)
+            until: 只包含此時間 (含) 之前的 commits (UTC ISO 8601)
+            author_login: 只包含此 GitHub 帳號的 commits
+
+        Returns:
+            list[dict]: 格式與 get_recent_commits 相同
+        """
+        query = (
+            f"SELECT {', '.join('c.' + column for column in _COLUMNS)} "
+            "FROM branch_commits b JOIN commits c ON c.repo = b.repo AND c.sha = b.sha "
+            "WHERE b.repo = ? AND b.branch = ?"
+        )
+        params: list = [repo, branch]
+        if since:
+            query += " AND c.date >= ?"
+            params.append(since)
+        if until:
+            query += " AND c.date <= ?"
+            params.append(until)
+        if author_login:
+            query += " AND c.author_login = ?"
+            params.append(author_login)
+        query += " ORDER BY b.seq DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [dict(row) for row in rows]
@@ -0,0 +1,115 @@
+# MCP 工具呼叫執行器與並行工具
+# 限制同時執行的工具呼叫數量、套用逾時,並提供排隊/執行中數量的 gauge
+#
+# WHY a bounded executor: The MCP SDK dispatches every incoming `call_tool` as
+# its own task, so an agent firing 50 parallel calls would open 50 concurrent
+# upstream requests and exhaust the connection pool (and GitHub's secondary
+# rate limit) at once. Capping concurrency makes excess calls queue instead,
+# the timeout keeps one hung upstream call from occupying a slot forever, and
+# the gauge shows whether latency comes from waiting in the queue or from
+# GitHub itself.
+
+import asyncio
+import os
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TOOL_TIMEOUT = 30.0
+
+
+class ToolExecutor:
+    """有上限的工具呼叫執行器
+
+    Attributes:
+        max_concurrency: 同時執行的工具呼叫上限
+        timeout: 單次工具呼叫逾時秒數 (包含排隊時間)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+    ):
+        """初始化執行器
+
+        Args:
+            max_concurrency: 同時執行上限,預設讀取 MCP_MAX_CONCURRENCY 或 8
+            timeout: 逾時秒數,預設讀取 MCP_TOOL_TIMEOUT 或 30
+        """
+        self.max_concurrency = max_concurrency or int(
+            os.environ.get("MCP_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+        )
+        self.timeout = timeout or float(
+            os.environ.get("MCP_TOOL_TIMEOUT", DEFAULT_TOOL_TIMEOUT)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._queued = 0
+        self._in_flight = 0
+
+    async def run(self, func: Callable[..., Awaitable[T]], *args) -> T:
+        """在並行上限與逾時限制下執行 coroutine 函式
+
+        Args:
+            func: 要執行的 async 函式
+            *args: 傳給 func 的參數
+
+        Returns:
+            T: func 的回傳值
+
+        Raises:
+            asyncio.TimeoutError: 排隊加上執行超過 timeout 秒
+        """
+        # WHY the deadline covers the queue wait: callers see the timeout as
+        # the longest a tool call can take; starting it only once a slot is
+        # free would let a call overrun it by the whole time spent queued.
+        return await asyncio.wait_for(self._run(func, *args), timeout=self.timeout)
+
+    async def _run(self, func: Callable[..., Awaitable[T]], *args) -> T:
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+
+        self._in_flight += 1
+        try:
+            return await func(*args)
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def gauge(self) -> dict[str, int]:
+        """回傳目前排隊中與執行中的呼叫數量"""
+        return {
+            "queued": self._queued,
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+        }
+
+
+async def gather_bounded(
+    funcs: list[Callable[[], Awaitable[T]]], limit: int
+) -> list[T | Exception]:
+    """以並行上限同時執行多個 coroutine 函式
+
+    WHY return exceptions instead of raising: fan-out callers (batch endpoints,
+    multi-repository tools) report failures per item, so one missing
+    repository must not discard the results of all the others.
+
+    Args:
+        funcs: 不帶參數的 async 函式清單
+        limit: 同時執行的上限
+
+    Returns:
+        list[Union[T, Exception]]: 與 funcs 順序相同的結果;失敗的項目為例外物件
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(func: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            return await func()
+
+    return await asyncio.gather(*(run(func) for func in funcs), return_exceptions=True)
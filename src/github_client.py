@@ -7,35 +7,120 @@
 # so both the MCP server and FastAPI gateway can handle errors without parsing
 # status codes. See docs/adr/ADR-002-exception-hierarchy.md.
 
+import math
 import os
-from typing import Optional
+import time
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, NoReturn
 
-from github import Github, GithubException
-from github.Repository import Repository
+# WHY PyGithub is imported inside GitHubClient: only this synchronous client
+# uses it, but the exceptions below are imported by everything (the MCP server,
+# the gateway, the health check). Importing PyGithub here would add ~0.1 s to
+# every process start for a library the running services never call.
+if TYPE_CHECKING:
+    from github import GithubException
+    from github.Repository import Repository
 
 
 class GitHubClientError(Exception):
     """GitHub 客戶端錯誤基類"""
 
-    pass
-
 
 class RepositoryNotFoundError(GitHubClientError):
     """倉庫不存在"""
 
-    pass
-
 
 class AuthenticationError(GitHubClientError):
     """認證失敗"""
 
-    pass
-
 
 class RateLimitError(GitHubClientError):
-    """API 速率限制"""
+    """API 速率限制
+
+    Attributes:
+        reset_at: 速率限制解除的時間 (epoch 秒),未知時為 None
+    """
+
+    def __init__(self, message: str, reset_at: float | None = None):
+        super().__init__(message)
+        self.reset_at = reset_at
+
+    @property
+    def retry_after(self) -> int | None:
+        """距離速率限制解除的秒數 (至少 1),未知時為 None"""
+        if self.reset_at is None:
+            return None
+        return max(1, math.ceil(self.reset_at - time.time()))
 
-    pass
+
+class StatisticsPendingError(GitHubClientError):
+    """GitHub 仍在計算統計資料 (回應 202),稍後再試即可取得"""
+
+
+def retry_at_from_headers(headers: Mapping[str, str] | None) -> float | None:
+    """從回應標頭判斷速率限制解除時間
+
+    Secondary rate limit 會帶 Retry-After (秒);primary rate limit 用盡時
+    X-RateLimit-Remaining 為 0,解除時間為 X-RateLimit-Reset (epoch 秒)。
+
+    Args:
+        headers: HTTP 回應標頭 (不分大小寫的 mapping)
+
+    Returns:
+        Optional[float]: 解除時間 (epoch 秒);未受速率限制時為 None
+    """
+    if not headers:
+        return None
+    retry_after = headers.get("Retry-After") or headers.get("retry-after")
+    if retry_after and retry_after.isdigit():
+        return time.time() + int(retry_after)
+    remaining = headers.get("X-RateLimit-Remaining") or headers.get("x-ratelimit-remaining")
+    reset = headers.get("X-RateLimit-Reset") or headers.get("x-ratelimit-reset")
+    if remaining == "0" and reset and reset.isdigit():
+        return float(reset)
+    return None
+
+
+# WHY a module-level function: The PyGithub-backed GitHubClient and the httpx-backed
+# AsyncGitHubClient receive errors in different shapes (GithubException vs. raw
+# status + body), but must map them to the same domain exceptions. Keeping the
+# status-code mapping in one place means ADR-002 has exactly one implementation.
+def raise_github_error(
+    status: int,
+    data: Any,
+    owner: str,
+    repo: str,
+    retry_at: float | None = None,
+) -> NoReturn:
+    """將 GitHub API 的錯誤狀態碼轉換為領域例外
+
+    Args:
+        status: HTTP 狀態碼
+        data: GitHub 回傳的錯誤內容 (JSON 或純文字)
+        owner: 倉庫擁有者
+        repo: 倉庫名稱
+        retry_at: 由回應標頭得到的速率限制解除時間 (見 retry_at_from_headers)
+
+    Raises:
+        RepositoryNotFoundError: 404 錯誤
+        AuthenticationError: 401/403 錯誤
+        RateLimitError: 速率限制錯誤 (403 rate limit / 429)
+        GitHubClientError: 其他錯誤
+    """
+    if status == 404:
+        raise RepositoryNotFoundError(f"Repository '{owner}/{repo}' not found")
+    elif status == 401:
+        raise AuthenticationError("Invalid GitHub token")
+    elif status == 403:
+        if retry_at is not None or "rate limit" in str(data).lower():
+            raise RateLimitError("GitHub API rate limit exceeded", reset_at=retry_at)
+        raise AuthenticationError(
+            f"Access denied to repository '{owner}/{repo}'"
+        )
+    elif status == 429:
+        raise RateLimitError("GitHub API rate limit exceeded", reset_at=retry_at)
+    else:
+        raise GitHubClientError(f"GitHub API error: {data}")
 
 
 class GitHubClient:
@@ -48,7 +133,7 @@ class GitHubClient:
         _github: PyGithub 的 Github 實例
     """
 
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self, token: str | None = None):
         """初始化 GitHub 客戶端
 
         Args:
@@ -64,9 +149,14 @@ class GitHubClient:
                 "GitHub token is required. Set GITHUB_TOKEN environment variable "
                 "or pass token to constructor."
             )
-        self._github = Github(self._token)
+        # WHY per_page=100: PyGithub pages at 30 by default, so slicing the
+        # first 100 commits costs 4 requests. 100 is GitHub's maximum page
+        # size and makes any limit up to 100 a single request.
+        from github import Github
 
-    def _handle_github_exception(self, e: GithubException, owner: str, repo: str):
+        self._github = Github(self._token, per_page=100)
+
+    def _handle_github_exception(self, e: "GithubException", owner: str, repo: str):
         """處理 GitHub API 例外
 
         Args:
@@ -80,20 +170,11 @@ class GitHubClient:
             RateLimitError: 速率限制錯誤
             GitHubClientError: 其他錯誤
         """
-        if e.status == 404:
-            raise RepositoryNotFoundError(f"Repository '{owner}/{repo}' not found")
-        elif e.status == 401:
-            raise AuthenticationError("Invalid GitHub token")
-        elif e.status == 403:
-            if "rate limit" in str(e.data).lower():
-                raise RateLimitError("GitHub API rate limit exceeded")
-            raise AuthenticationError(
-                f"Access denied to repository '{owner}/{repo}'"
-            )
-        else:
-            raise GitHubClientError(f"GitHub API error: {e.data}")
+        raise_github_error(
+            e.status, e.data, owner, repo, retry_at=retry_at_from_headers(e.headers)
+        )
 
-    def get_repository(self, owner: str, repo: str) -> Repository:
+    def get_repository(self, owner: str, repo: str) -> "Repository":
         """取得倉庫物件
 
         Args:
@@ -109,11 +190,24 @@ class GitHubClient:
             RateLimitError: API 速率限制
             GitHubClientError: 其他 API 錯誤
         """
+        from github import GithubException
+
         try:
             return self._github.get_repo(f"{owner}/{repo}")
         except GithubException as e:
             self._handle_github_exception(e, owner, repo)
 
+    def _lazy_repository(self, owner: str, repo: str) -> "Repository":
+        """取得不會立即發出請求的倉庫物件
+
+        WHY lazy: commits/contributors/languages only need the repository's URL
+        path, not its metadata. A non-lazy get_repo() costs a full
+        `GET /repos/{owner}/{repo}` round trip (and rate-limit budget) before the
+        request that matters; a missing repository still surfaces as a 404 on
+        the target endpoint.
+        """
+        return self._github.get_repo(f"{owner}/{repo}", lazy=True)
+
     def get_repo_statistics(self, owner: str, repo: str) -> dict:
         """取得倉庫基本統計資訊
 
@@ -157,7 +251,7 @@ class GitHubClient:
         owner: str,
         repo: str,
         limit: int = 10,
-        branch: Optional[str] = None,
+        branch: str | None = None,
     ) -> list[dict]:
         """取得最近的 commits
 
@@ -181,28 +275,31 @@ class GitHubClient:
             AuthenticationError: 認證失敗
             GitHubClientError: 其他 API 錯誤
         """
-        repository = self.get_repository(owner, repo)
+        from github import GithubException
 
-        # 若未指定分支,使用預設分支
-        sha = branch if branch else repository.default_branch
+        repository = self._lazy_repository(owner, repo)
 
+        # 若未指定分支,GitHub 會自動使用預設分支,不需要先查詢倉庫
         try:
-            commits = repository.get_commits(sha=sha)
+            if branch:
+                commits = repository.get_commits(sha=branch)
+            else:
+                commits = repository.get_commits()
+
+            result = []
+            for commit in commits[:limit]:
+                commit_data = {
+                    "sha": commit.sha,
+                    "message": commit.commit.message,
+                    "author": commit.commit.author.name if commit.commit.author else "Unknown",
+                    "author_login": commit.author.login if commit.author else "",
+                    "date": commit.commit.author.date.isoformat() if commit.commit.author else "",
+                    "url": commit.html_url,
+                }
+                result.append(commit_data)
         except GithubException as e:
             self._handle_github_exception(e, owner, repo)
 
-        result = []
-        for commit in commits[:limit]:
-            commit_data = {
-                "sha": commit.sha,
-                "message": commit.commit.message,
-                "author": commit.commit.author.name if commit.commit.author else "Unknown",
-                "author_login": commit.author.login if commit.author else "",
-                "date": commit.commit.author.date.isoformat() if commit.commit.author else "",
-                "url": commit.html_url,
-            }
-            result.append(commit_data)
-
         return result
 
     def get_contributors_stats(
@@ -227,22 +324,25 @@ class GitHubClient:
             AuthenticationError: 認證失敗
             GitHubClientError: 其他 API 錯誤
         """
-        repository = self.get_repository(owner, repo)
+        from github import GithubException
 
+        repository = self._lazy_repository(owner, repo)
+
+        # PaginatedList 在迭代時才發出請求,因此迭代也必須在 try 內
         try:
             contributors = repository.get_contributors()
+
+            result = []
+            for contributor in contributors[:top_n]:
+                result.append({
+                    "login": contributor.login,
+                    "contributions": contributor.contributions,
+                    "avatar_url": contributor.avatar_url,
+                    "profile_url": contributor.html_url,
+                })
         except GithubException as e:
             self._handle_github_exception(e, owner, repo)
 
-        result = []
-        for contributor in contributors[:top_n]:
-            result.append({
-                "login": contributor.login,
-                "contributions": contributor.contributions,
-                "avatar_url": contributor.avatar_url,
-                "profile_url": contributor.html_url,
-            })
-
         return result
 
     def get_languages(self, owner: str, repo: str) -> dict:
@@ -261,7 +361,9 @@ class GitHubClient:
             AuthenticationError: 認證失敗
             GitHubClientError: 其他 API 錯誤
         """
-        repository = self.get_repository(owner, repo)
+        from github import GithubException
+
+        repository = self._lazy_repository(owner, repo)
 
         try:
             languages = repository.get_languages()
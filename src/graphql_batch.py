@@ -0,0 +1,368 @@
+# GraphQL 批次查詢
+# 將同一時間窗口內多個倉庫的 stats / languages / commits 查詢合併成一個帶別名的 GraphQL 請求
+#
+# WHY GraphQL for batches: over REST every repository costs one request per
+# method, so comparing 20 repositories is 60 calls against the core budget.
+# One aliased GraphQL query returns all of it in a single round trip for a few
+# points of the separate GraphQL budget. A lone lookup still goes over REST,
+# where conditional requests (free 304s) make it cheaper than one GraphQL point.
+
+import asyncio
+import json
+import os
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from .github_client import GitHubClientError, RepositoryNotFoundError
+
+# 可由 GraphQL 取得、且輸出與 REST 完全相同的方法
+GRAPHQL_METHODS = frozenset({"get_repo_statistics", "get_language_bytes", "get_recent_commits"})
+
+# WHY 25 repositories per query: keeps each query far below GitHub's node limit
+# and its 10s server-side timeout even with 100-commit histories requested.
+DEFAULT_MAX_BATCH = 25
+# 收集同一批查詢的等待時間 (秒);遠小於一次 GitHub 往返
+DEFAULT_WINDOW = 0.005
+
+# GraphQL connection 的 first 上限
+MAX_PAGE_SIZE = 100
+
+_STATS_FIELDS = """
+    stargazerCount
+    forkCount
+    description
+    createdAt
+    updatedAt
+    watchers { totalCount }
+    issues(states: OPEN) { totalCount }
+    pullRequests(states: OPEN) { totalCount }
+    primaryLanguage { name }
+    defaultBranchRef { name }"""
+
+_LANGUAGES_FIELDS = """
+    languages(first: 100, orderBy: {field: SIZE, direction: DESC}) {
+      totalSize
+      pageInfo { hasNextPage }
+      edges { size node { name } }
+    }"""
+
+_HISTORY_FIELDS = (
+    "history(first: %d) { nodes { oid message url author { name date user { login } } } }"
+)
+
+
+class Fallback(Exception):
+    """此項目無法由 GraphQL 取得 (或批次只有一個項目),呼叫端應改用 REST"""
+
+
+@dataclass
+class _Item:
+    method: str
+    owner: str
+    repo: str
+    args: tuple
+    future: asyncio.Future
+
+
+@dataclass
+class _RepoGroup:
+    """同一個倉庫在查詢中的別名與其所有項目"""
+
+    alias: str
+    owner: str
+    repo: str
+    items: list[_Item] = field(default_factory=list)
+
+
+def language_percentages(languages: dict[str, int]) -> dict[str, float]:
+    """將語言 bytes 轉換為百分比 (與 GitHubClient.get_languages 相同的計算方式)"""
+    # 計算總 bytes 數
+    total_bytes = sum(languages.values())
+
+    if total_bytes == 0:
+        return {}
+
+    # 轉換為百分比
+    result = {}
+    for language, bytes_count in languages.items():
+        percentage = round((bytes_count / total_bytes) * 100, 2)
+        result[language] = percentage
+
+    return result
+
+
+def _isoformat_utc(value: str | None) -> str:
+    """將時間字串轉為 UTC ISO 8601
+
+    GraphQL 的 GitTimestamp 帶有作者時區 (+08:00),REST 一律回傳 UTC;
+    轉成 UTC 後兩條路徑的輸出才會一致。
+    """
+    if not value:
+        return ""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def _string(value: str) -> str:
+    """GraphQL 字串字面值 (語法與 JSON 字串相同)"""
+    return json.dumps(value)
+
+
+def _history_alias(index: int) -> str:
+    return f"h{index}"
+
+
+def _repository_query(group: _RepoGroup) -> tuple[str, int]:
+    """產生單一倉庫的查詢片段,並回傳其中的 connection 數量 (用於估算點數)"""
+    fields = []
+    connections = 0
+    methods = {item.method for item in group.items}
+    if "get_repo_statistics" in methods:
+        fields.append(_STATS_FIELDS)
+        connections += 3
+    if "get_language_bytes" in methods:
+        fields.append(_LANGUAGES_FIELDS)
+        connections += 1
+
+    for index, item in enumerate(group.items):
+        if item.method != "get_recent_commits":
+            continue
+        limit, branch = item.args
+        history = _HISTORY_FIELDS % limit
+        if branch:
+            target = f"object(expression: {_string(branch)}) {{ ... on Commit {{ {history} }} }}"
+        else:
+            target = f"defaultBranchRef {{ target {{ ... on Commit {{ {history} }} }} }}"
+        fields.append(f"\n    {_history_alias(index)}: {target}")
+        connections += 1
+
+    query = (
+        f"  {group.alias}: repository(owner: {_string(group.owner)}, "
+        f"name: {_string(group.repo)}) {{{''.join(fields)}\n  }}"
+    )
+    return query, connections
+
+
+def build_query(groups: list[_RepoGroup]) -> tuple[str, int]:
+    """組合帶別名的查詢,並依 GitHub 的計算方式估算點數
+
+    GitHub 以「需要的 connection 請求數 / 100」計算點數,最少 1 點。
+    """
+    parts = []
+    connections = 0
+    for group in groups:
+        part, count = _repository_query(group)
+        parts.append(part)
+        connections += count
+    query = "query {\n  rateLimit { cost }\n" + "\n".join(parts) + "\n}"
+    return query, max(1, round(connections / 100))
+
+
+def _parse_statistics(node: dict) -> dict:
+    if node.get("defaultBranchRef") is None:
+        # 空倉庫沒有預設分支;REST 仍會回傳設定的分支名稱
+        raise Fallback()
+    return {
+        "stars": node["stargazerCount"],
+        "forks": node["forkCount"],
+        # REST 的 open_issues_count 包含開啟中的 PR
+        "open_issues": node["issues"]["totalCount"] + node["pullRequests"]["totalCount"],
+        "watchers": node["watchers"]["totalCount"],
+        "description": node.get("description") or "",
+        "language": (node.get("primaryLanguage") or {}).get("name") or "",
+        "created_at": _isoformat_utc(node.get("createdAt")),
+        "updated_at": _isoformat_utc(node.get("updatedAt")),
+        "default_branch": node["defaultBranchRef"]["name"],
+    }
+
+
+def _parse_languages(node: dict) -> dict:
+    languages = node["languages"]
+    if languages["pageInfo"]["hasNextPage"]:
+        raise Fallback()
+    return {edge["node"]["name"]: edge["size"] for edge in languages["edges"]}
+
+
+def _parse_commits(node: dict, index: int, branch: str | None) -> list[dict]:
+    target = node.get(_history_alias(index))
+    if target is not None and not branch:
+        target = target.get("target")
+    if not target or "history" not in target:
+        # 分支不存在、指向 tag 或倉庫為空;交給 REST 回傳相同的錯誤
+        raise Fallback()
+
+    result = []
+    for commit in target["history"]["nodes"]:
+        git_author = commit.get("author")
+        user = (git_author or {}).get("user")
+        result.append({
+            "sha": commit["oid"],
+            "message": commit["message"],
+            "author": git_author["name"] if git_author else "Unknown",
+            "author_login": user["login"] if user else "",
+            "date": _isoformat_utc(git_author["date"]) if git_author else "",
+            "url": commit["url"],
+        })
+
+    return result
+
+
+def _parse_item(node: dict, index: int, item: _Item) -> Any:
+    try:
+        if item.method == "get_repo_statistics":
+            return _parse_statistics(node)
+        if item.method == "get_language_bytes":
+            return _parse_languages(node)
+        return _parse_commits(node, index, item.args[1])
+    except (KeyError, TypeError) as e:
+        # 回應格式不符預期時退回 REST,而不是回傳不完整的資料
+        raise Fallback() from e
+
+
+class GraphQLBatcher:
+    """收集短時間窗口內的查詢,以單一 GraphQL 請求取得
+
+    Attributes:
+        max_batch: 單一查詢最多包含的倉庫數;0 表示停用
+        window: 收集查詢的等待秒數
+        queries: 已送出的 GraphQL 查詢數
+        batched: 由 GraphQL 取得的項目數
+        points: GitHub 回報的實際點數總和
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, int], Awaitable[dict]],
+        max_batch: int | None = None,
+        window: float | None = None,
+    ):
+        """初始化批次查詢器
+
+        Args:
+            send: 送出查詢的 coroutine 函式,參數為 (query, 預估點數),回傳回應 JSON
+            max_batch: 單一查詢的倉庫上限,預設讀取 GITHUB_GRAPHQL_BATCH 或 25
+            window: 收集窗口秒數,預設讀取 GITHUB_GRAPHQL_WINDOW 或 0.005
+        """
+        self._send = send
+        self.max_batch = max_batch if max_batch is not None else int(
+            os.environ.get("GITHUB_GRAPHQL_BATCH", DEFAULT_MAX_BATCH)
+        )
+        self.window = window if window is not None else float(
+            os.environ.get("GITHUB_GRAPHQL_WINDOW", DEFAULT_WINDOW)
+        )
+        self._pending: list[_Item] = []
+        self._tasks: set[asyncio.Task] = set()
+        self.queries = 0
+        self.batched = 0
+        self.points = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch > 0
+
+    async def load(self, method: str, owner: str, repo: str, *args) -> Any:
+        """排入一個查詢並等待結果
+
+        Args:
+            method: GRAPHQL_METHODS 中的方法名稱
+            owner: 倉庫擁有者
+            repo: 倉庫名稱
+            *args: 方法的其他參數 (get_recent_commits 為 limit, branch)
+
+        Returns:
+            Any: 與該方法 REST 路徑相同格式的結果
+
+        Raises:
+            Fallback: 此項目應改用 REST
+            RepositoryNotFoundError: 倉庫不存在
+        """
+        if method == "get_recent_commits" and not 1 <= args[0] <= MAX_PAGE_SIZE:
+            raise Fallback()
+
+        loop = asyncio.get_running_loop()
+        item = _Item(method, owner, repo, args, loop.create_future())
+        if not self._pending:
+            loop.call_later(self.window, self._flush)
+        self._pending.append(item)
+        return await item.future
+
+    def _flush(self) -> None:
+        # 等待窗口內被取消的呼叫 (逾時、斷線) 不再查詢
+        items = [item for item in self._pending if not item.future.done()]
+        self._pending = []
+        if not items:
+            return
+        if len(items) == 1:
+            # 只有一個項目時 REST (可用條件式請求) 比 GraphQL 更省
+            items[0].future.set_exception(Fallback())
+            return
+
+        groups: dict[tuple[str, str], _RepoGroup] = {}
+        for item in items:
+            key = (item.owner.lower(), item.repo.lower())
+            if key not in groups:
+                groups[key] = _RepoGroup(f"r{len(groups)}", item.owner, item.repo)
+            groups[key].items.append(item)
+
+        ordered = list(groups.values())
+        for start in range(0, len(ordered), self.max_batch):
+            task = asyncio.ensure_future(self._run(ordered[start:start + self.max_batch]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, groups: list[_RepoGroup]) -> None:
+        items = [item for group in groups for item in group.items]
+        try:
+            query, cost = build_query(groups)
+            body = await self._send(query, cost)
+            self.queries += 1
+            data = body.get("data")
+            if not data:
+                raise Fallback()
+            self.points += (data.get("rateLimit") or {}).get("cost", 0)
+            not_found = {
+                error["path"][0]
+                for error in body.get("errors") or []
+                if error.get("type") == "NOT_FOUND" and error.get("path")
+            }
+            for group in groups:
+                self._resolve(group, data.get(group.alias), group.alias in not_found)
+        except (Fallback, GitHubClientError):
+            # WHY fall back on any query-level failure: GraphQL has its own
+            # budget and failure modes; REST can still answer each item.
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(Fallback())
+        except BaseException as e:
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            raise
+
+    def _resolve(self, group: _RepoGroup, node: dict | None, not_found: bool) -> None:
+        for index, item in enumerate(group.items):
+            if item.future.done():
+                continue
+            if node is None:
+                if not_found:
+                    item.future.set_exception(RepositoryNotFoundError(
+                        f"Repository '{group.owner}/{group.repo}' not found"
+                    ))
+                else:
+                    item.future.set_exception(Fallback())
+                continue
+            try:
+                item.future.set_result(_parse_item(node, index, item))
+                self.batched += 1
+            except Fallback as e:
+                item.future.set_exception(e)
+
+    def stats(self) -> dict[str, int]:
+        """回傳 GraphQL 查詢數、批次取得的項目數與實際點數"""
+        return {
+            "graphql_queries": self.queries,
+            "graphql_batched": self.batched,
+            "graphql_points": self.points,
+        }
@@ -0,0 +1,113 @@
+# 容器健康檢查
+# python -m src.healthcheck;正常時結束碼為 0,否則印出原因並以 1 結束
+#
+# WHY not `python -c "import src.server"`: the check runs every 30 seconds, and
+# importing the server loads the MCP SDK, httpx and the whole client stack
+# (~0.4 s each time, over the 250 ms budget in benchmarks/startup_budget.json)
+# only to throw it away. Locating the modules does not execute them, so by
+# itself it would miss a syntax or import error in src.server. The server
+# itself therefore writes MCP_READY_FILE (its PID) once every module has
+# loaded and it is serving. The check requires that file and a live process.
+# When MCP_METRICS_PORT is set it also connects to the metrics port.
+
+import importlib.util
+import os
+import socket
+import sys
+
+# 服務執行時需要的套件與模組;只確認找得到,不實際載入
+REQUIRED_MODULES = (
+    "mcp",
+    "httpx",
+    "numpy",
+    "prometheus_client",
+    "src.server",
+    "src.async_github_client",
+)
+CONNECT_TIMEOUT = 2.0
+READY_FILE_ENV = "MCP_READY_FILE"
+
+
+def mark_ready() -> str | None:
+    """寫入 MCP_READY_FILE (內容為目前程序的 PID),由伺服器在開始服務時呼叫
+
+    Returns:
+        Optional[str]: 寫入的檔案路徑;未設定 MCP_READY_FILE 時為 None
+    """
+    path = os.environ.get(READY_FILE_ENV)
+    if not path:
+        return None
+    # 先寫入暫存檔再改名,健康檢查不會讀到寫到一半的內容
+    partial = f"{path}.{os.getpid()}"
+    with open(partial, "w") as f:
+        f.write(str(os.getpid()))
+    os.replace(partial, path)
+    return path
+
+
+def clear_ready(path: str | None) -> None:
+    """伺服器結束時移除 mark_ready() 寫入的檔案"""
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _check_ready(path: str) -> str | None:
+    """確認 ready 檔案存在且其中的程序仍在執行;回傳失敗原因"""
+    try:
+        with open(path) as f:
+            pid = int(f.read().strip())
+    except FileNotFoundError:
+        return f"server not ready: {path} does not exist"
+    except (OSError, ValueError) as e:
+        return f"server not ready: cannot read {path}: {e}"
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return f"server process {pid} from {path} is not running"
+    except PermissionError:
+        # 程序存在,只是屬於其他使用者
+        pass
+    return None
+
+
+def check() -> list[str]:
+    """執行健康檢查
+
+    Returns:
+        list[str]: 失敗原因;空清單表示健康
+    """
+    problems = [
+        f"module not found: {name}"
+        for name in REQUIRED_MODULES
+        if importlib.util.find_spec(name) is None
+    ]
+
+    ready_file = os.environ.get(READY_FILE_ENV)
+    if ready_file:
+        problem = _check_ready(ready_file)
+        if problem:
+            problems.append(problem)
+
+    port = os.environ.get("MCP_METRICS_PORT")
+    if port:
+        try:
+            with socket.create_connection(("127.0.0.1", int(port)), timeout=CONNECT_TIMEOUT):
+                pass
+        except (OSError, ValueError) as e:
+            problems.append(f"metrics port {port} not accepting connections: {e}")
+    return problems
+
+
+def main() -> int:
+    problems = check()
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
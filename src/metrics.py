@@ -0,0 +1,226 @@
+# Prometheus 指標
+# 定義 API 與 MCP 兩個程序共用的指標,以及在抓取時讀取 AsyncGitHubClient 統計的 collector
+#
+# WHY histograms at three layers: a slow p99 can come from GitHub (upstream),
+# from waiting in our own executor or event loop (request latency minus
+# upstream latency), or from JSON encoding (serialization). Only measuring each
+# layer separately lets a dashboard tell them apart.
+
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from prometheus_client import REGISTRY, Gauge, Histogram, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+logger = logging.getLogger(__name__)
+
+# 涵蓋快取命中 (毫秒以下) 到 MCP 工具逾時 (30 秒)
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+# JSON 編碼通常在毫秒以下,大型回應 (完整 commit 歷史、彙總結果) 才會到數十毫秒
+SERIALIZATION_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "github_upstream_request_duration_seconds",
+    "GitHub API request latency by client method and HTTP status",
+    ["method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "github_upstream_requests_in_flight",
+    "GitHub API requests currently awaiting a response",
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template, HTTP method and status",
+    ["route", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "API requests currently being handled",
+)
+TOOL_LATENCY = Histogram(
+    "mcp_tool_duration_seconds",
+    "MCP tool call latency (including executor queueing) by tool and outcome",
+    ["tool", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+SERIALIZATION = Histogram(
+    "response_serialization_seconds",
+    "Time spent encoding responses as JSON",
+    ["interface"],
+    buckets=SERIALIZATION_BUCKETS,
+)
+
+_upstream_method: ContextVar[str] = ContextVar("upstream_method", default="other")
+
+
+@contextmanager
+def upstream_method(method: str) -> Iterator[None]:
+    """在此區塊內送出的 GitHub 請求以 method 標記
+
+    WHY a context variable: requests are sent deep inside shared helpers
+    (_get/_request) that do not know which public client method they serve.
+    The label is reset on exit so it never leaks into the caller's context.
+    """
+    token = _upstream_method.set(method)
+    try:
+        yield
+    finally:
+        _upstream_method.reset(token)
+
+
+def observe_upstream(status: Any, seconds: float) -> None:
+    """記錄一次 GitHub 請求的延遲 (status 為 HTTP 狀態碼,網路錯誤時為 error)"""
+    UPSTREAM_LATENCY.labels(_upstream_method.get(), str(status)).observe(seconds)
+
+
+@contextmanager
+def serialization_timer(interface: str) -> Iterator[None]:
+    """記錄區塊內 JSON 編碼的耗時"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        SERIALIZATION.labels(interface).observe(time.perf_counter() - started)
+
+
+class ClientCollector(Collector):
+    """在每次抓取時讀取 AsyncGitHubClient 的快取與速率限制統計
+
+    WHY a collector instead of updating gauges: the client already keeps these
+    counters; reading them at scrape time costs nothing on the request path.
+    """
+
+    def __init__(
+        self,
+        get_client: Callable[[], Any | None],
+        get_executor: Callable[[], Any | None] | None = None,
+    ):
+        """初始化 collector
+
+        Args:
+            get_client: 回傳目前的 AsyncGitHubClient;尚未建立時回傳 None
+            get_executor: 回傳 MCP 的 ToolExecutor (只有 MCP 程序提供)
+        """
+        self._get_client = get_client
+        self._get_executor = get_executor
+
+    def collect(self):
+        executor = self._get_executor() if self._get_executor else None
+        if executor is not None:
+            gauge = executor.gauge()
+            queued = GaugeMetricFamily(
+                "mcp_tools_queued", "MCP tool calls waiting for an executor slot"
+            )
+            queued.add_metric([], gauge["queued"])
+            running = GaugeMetricFamily(
+                "mcp_tools_in_flight", "MCP tool calls currently running"
+            )
+            running.add_metric([], gauge["in_flight"])
+            yield queued
+            yield running
+
+        client = self._get_client()
+        if client is None:
+            return
+
+        stats = client.cache_stats()
+        for name, key, documentation in (
+            ("github_cache_hits", "hits", "Response cache hits"),
+            ("github_cache_misses", "misses", "Response cache misses"),
+            ("github_cache_evictions", "evictions", "Response cache evictions"),
+            ("github_cache_not_modified", "not_modified", "Revalidations answered with 304"),
+            ("github_cache_coalesced", "coalesced", "Lookups that joined an in-flight request"),
+            ("github_cache_stale_served", "stale_served", "Expired entries served while refreshing"),
+            ("github_graphql_queries", "graphql_queries", "Batched GraphQL queries sent"),
+            ("github_graphql_batched", "graphql_batched", "Lookups answered by batched GraphQL"),
+        ):
+            counter = CounterMetricFamily(name, documentation)
+            counter.add_metric([], stats.get(key, 0))
+            yield counter
+
+        lookups = stats["hits"] + stats["misses"]
+        ratio = GaugeMetricFamily(
+            "github_cache_hit_ratio", "Response cache hits / lookups since start"
+        )
+        ratio.add_metric([], stats["hits"] / lookups if lookups else 0.0)
+        yield ratio
+
+        size = GaugeMetricFamily("github_cache_bytes", "Estimated response cache size")
+        size.add_metric([], stats["bytes"])
+        yield size
+
+        remaining = GaugeMetricFamily(
+            "github_rate_limit_remaining",
+            "Remaining GitHub rate limit per token and resource",
+            labels=["token", "resource"],
+        )
+        limit = GaugeMetricFamily(
+            "github_rate_limit_limit",
+            "GitHub rate limit per token and resource",
+            labels=["token", "resource"],
+        )
+        for token, token_stats in client.rate_limit_stats().items():
+            for resource, budget in token_stats["budgets"].items():
+                if budget["remaining"] is not None:
+                    remaining.add_metric([token, resource], budget["remaining"])
+                if budget["limit"] is not None:
+                    limit.add_metric([token, resource], budget["limit"])
+        yield remaining
+        yield limit
+
+
+# 目前註冊在預設 registry 的 ClientCollector
+_client_collector: ClientCollector | None = None
+
+
+def register_client_collector(
+    get_client: Callable[[], Any | None],
+    get_executor: Callable[[], Any | None] | None = None,
+) -> None:
+    """向預設 registry 註冊 ClientCollector
+
+    由 MCP 的 main() 與 API 的 lifespan 在啟動時呼叫。再次呼叫時取代先前的
+    collector:同一個程序只會有一份客戶端統計,不會輸出重複的序列。
+    """
+    global _client_collector
+    if _client_collector is not None:
+        REGISTRY.unregister(_client_collector)
+    _client_collector = ClientCollector(get_client, get_executor)
+    REGISTRY.register(_client_collector)
+
+
+def start_metrics_server(port: int | None = None) -> int | None:
+    """在背景執行緒提供 /metrics (供沒有 HTTP 介面的 MCP 程序使用)
+
+    Args:
+        port: 監聽埠,預設讀取 MCP_METRICS_PORT;未設定時不啟動
+
+    Returns:
+        Optional[int]: 實際監聽的埠,未啟動或無法監聽時為 None
+    """
+    if port is None:
+        configured = os.environ.get("MCP_METRICS_PORT")
+        if not configured:
+            return None
+        port = int(configured)
+    try:
+        start_http_server(port)
+    except OSError as e:
+        # WHY not fail start-up: several MCP sessions on one host share the
+        # configured port; only the first can bind it, and the others must
+        # still serve their stdio client.
+        logger.warning("Metrics server not started on port %d: %s", port, e)
+        return None
+    return port
@@ -0,0 +1,147 @@
+# 慢請求取樣分析器
+# 請求進行期間定期取樣 event loop 執行緒的呼叫堆疊,請求超過門檻時
+# 以 folded stack 格式 (flamegraph.pl、speedscope 可直接讀取) 寫入檔案
+#
+# WHY sampling instead of cProfile: cProfile slows every call it traces and
+# would have to run on all requests to catch the rare slow one. A sampler
+# thread reading sys._current_frames() costs nothing on the request path, so
+# it can stay on in production and only slow requests leave a file behind.
+#
+# 取樣的是執行請求的執行緒在取樣當下正在做的事;asyncio 下同一執行緒
+# 也會執行其他請求的 task,而等待 GitHub 的時間會顯示為 event loop 的 select。
+# 佔用 CPU 的部分 (JSON 編碼、NumPy、pydantic) 才是這些檔案主要要找出的。
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+DEFAULT_INTERVAL_MS = 5.0
+DEFAULT_OUTPUT_DIR = "/tmp/github-analytics-profiles"
+# 避免一段持續變慢的期間把磁碟寫滿
+DEFAULT_MAX_FILES = 200
+
+
+@dataclass(eq=False)
+class _Session:
+    thread_id: int
+    samples: Counter = field(default_factory=Counter)
+
+
+def _fold(frame) -> str:
+    """將呼叫堆疊轉為 folded 格式 (由外而內,以 ; 分隔)"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        names.append(f"{module}:{getattr(code, 'co_qualname', code.co_name)}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SlowRequestProfiler:
+    """對慢請求輸出取樣堆疊的分析器
+
+    Attributes:
+        threshold: 超過此秒數的請求才寫入檔案
+        interval: 取樣間隔秒數
+        output_dir: 輸出目錄
+        written: 已寫入的檔案數
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        interval_ms: float = DEFAULT_INTERVAL_MS,
+        output_dir: str = DEFAULT_OUTPUT_DIR,
+        max_files: int = DEFAULT_MAX_FILES,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.output_dir = output_dir
+        self.max_files = max_files
+        self.written = 0
+        self._sessions: set[_Session] = set()
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_env(cls) -> "SlowRequestProfiler | None":
+        """依環境變數建立分析器
+
+        REQUEST_PROFILE_THRESHOLD_MS: 門檻毫秒數;未設定時停用 (回傳 None)
+        REQUEST_PROFILE_INTERVAL_MS: 取樣間隔,預設 5
+        REQUEST_PROFILE_DIR: 輸出目錄,預設 /tmp/github-analytics-profiles
+        """
+        threshold = os.environ.get("REQUEST_PROFILE_THRESHOLD_MS")
+        if not threshold:
+            return None
+        return cls(
+            float(threshold),
+            interval_ms=float(os.environ.get("REQUEST_PROFILE_INTERVAL_MS", DEFAULT_INTERVAL_MS)),
+            output_dir=os.environ.get("REQUEST_PROFILE_DIR", DEFAULT_OUTPUT_DIR),
+        )
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[None]:
+        """在區塊執行期間取樣目前執行緒;超過門檻時寫入 folded stack 檔案
+
+        Args:
+            label: 寫入檔名的請求名稱 (路由樣板或工具名稱)
+        """
+        session = _Session(threading.get_ident())
+        started = time.perf_counter()
+        self._start(session)
+        try:
+            yield
+        finally:
+            self._stop(session)
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.threshold and session.samples:
+                self._write(label, elapsed, session.samples)
+
+    def _start(self, session: _Session) -> None:
+        with self._lock:
+            self._sessions.add(session)
+            self._active.set()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="slow-request-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def _stop(self, session: _Session) -> None:
+        with self._lock:
+            self._sessions.discard(session)
+            if not self._sessions:
+                self._active.clear()
+
+    def _run(self) -> None:
+        while True:
+            # 沒有進行中的請求時不取樣
+            self._active.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for session in self._sessions:
+                    frame = frames.get(session.thread_id)
+                    if frame is not None:
+                        session.samples[_fold(frame)] += 1
+
+    def _write(self, label: str, elapsed: float, samples: Counter) -> None:
+        if self.written >= self.max_files:
+            return
+        self.written += 1
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_") or "request"
+        path = os.path.join(self.output_dir, f"{stamp}-{name}-{int(elapsed * 1000)}ms.folded")
+        with open(path, "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in samples.most_common())
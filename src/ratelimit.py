@@ -0,0 +1,276 @@
+# 速率限制追蹤與請求排程
+# 從每個 GitHub 回應標頭追蹤剩餘額度,並在額度用盡前調節對外請求的速度
+#
+# WHY track instead of react: GitHub only says "403 rate limit" once the hourly
+# budget is already gone, and from then on every request fails until the
+# reset. Reading X-RateLimit-* on every response lets us slow down while budget
+# remains, keep the last slice for interactive callers, and fail fast (with the
+# reset time) instead of sending requests that are certain to be rejected.
+
+import asyncio
+import os
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+
+from .github_client import RateLimitError
+
+# 介面層請求保留最後 10% 額度;背景刷新在剩下 25% 時就暫停
+DEFAULT_RESERVE_RATIO = 0.10
+DEFAULT_BACKGROUND_RESERVE_RATIO = 0.25
+
+# 前景請求最多為了 pacing 或 Retry-After 等待的秒數;超過就直接回報速率限制
+DEFAULT_MAX_WAIT = 5.0
+
+
+class Priority(IntEnum):
+    """請求優先權"""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+_priority: ContextVar[Priority] = ContextVar("priority", default=Priority.INTERACTIVE)
+
+
+class SharedPriority:
+    """多個呼叫者共用的一次載入 (見 SingleFlight) 的優先權
+
+    取所有加入者中最急迫的一個。
+
+    WHY: a background refresh that an interactive request joins is now
+    serving that request. Sending it at BACKGROUND would hold it to the
+    background reserve, and the user would get a rate-limit error while
+    interactive budget is still left.
+    """
+
+    def __init__(self, priority: Priority, parent: "SharedPriority | None" = None):
+        """初始化
+
+        Args:
+            priority: 建立者的優先權
+            parent: 外層共用載入的優先權 (巢狀載入會跟著外層提高)
+        """
+        self._priority = priority
+        self._parent = parent
+
+    @property
+    def priority(self) -> Priority:
+        if self._parent is None:
+            return self._priority
+        return min(self._priority, self._parent.priority)
+
+    def join(self, priority: Priority) -> None:
+        """加入一個呼叫者;優先權提高為兩者中較急迫的一個"""
+        self._priority = min(self._priority, priority)
+
+
+_shared_priority: ContextVar[SharedPriority | None] = ContextVar(
+    "shared_priority", default=None
+)
+
+
+def current_priority() -> Priority:
+    """取得目前 context 的請求優先權 (預設為 INTERACTIVE)
+
+    在共用載入的 task 內,回傳所有加入者中最急迫的優先權。
+    """
+    shared = _shared_priority.get()
+    if shared is not None:
+        return shared.priority
+    return _priority.get()
+
+
+def share_priority() -> SharedPriority:
+    """以目前 context 的優先權建立共用載入的優先權"""
+    return SharedPriority(current_priority(), parent=_shared_priority.get())
+
+
+def use_shared_priority(shared: SharedPriority) -> None:
+    """讓目前 context (共用載入的 task) 以 shared 的優先權送出請求"""
+    _shared_priority.set(shared)
+
+
+def set_priority(priority: Priority) -> None:
+    """設定目前 context (例如背景刷新 task) 的請求優先權"""
+    _priority.set(priority)
+
+
+@contextmanager
+def prioritized(priority: Priority) -> Iterator[None]:
+    """此區塊內的請求以 priority 送出,離開時還原原本的優先權
+
+    用於在呼叫者的 context 中執行、不應改變其後續請求的程式碼 (例如 async generator)。
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclass
+class Budget:
+    """單一資源 (core、graphql、search…) 的速率限制額度
+
+    Attributes:
+        limit: 每小時額度上限 (尚未看過回應時為 None)
+        remaining: 剩餘額度
+        reset_at: 額度重置時間 (epoch 秒)
+        blocked_until: secondary rate limit 的 Retry-After 截止時間
+    """
+
+    limit: int | None = None
+    remaining: int | None = None
+    reset_at: float = 0.0
+    blocked_until: float = 0.0
+
+
+class RateLimitScheduler:
+    """依剩餘額度調節請求的排程器
+
+    - 額度充足時不做任何等待
+    - 剩餘額度低於保留比例時,前景請求平均分散到重置時間前送出
+    - 背景請求在較高的保留比例就暫停 (拋出 RateLimitError,由呼叫端延後)
+    - 額度用盡或處於 Retry-After 期間時,不送出請求直接拋出 RateLimitError
+    """
+
+    def __init__(
+        self,
+        reserve_ratio: float | None = None,
+        background_reserve_ratio: float | None = None,
+        max_wait: float = DEFAULT_MAX_WAIT,
+    ):
+        """初始化排程器
+
+        Args:
+            reserve_ratio: 開始 pacing 的剩餘比例,預設讀取 GITHUB_RATE_RESERVE 或 0.10
+            background_reserve_ratio: 背景請求暫停的剩餘比例,
+                預設讀取 GITHUB_RATE_BACKGROUND_RESERVE 或 0.25
+            max_wait: 前景請求最多等待的秒數
+        """
+        self.reserve_ratio = reserve_ratio if reserve_ratio is not None else float(
+            os.environ.get("GITHUB_RATE_RESERVE", DEFAULT_RESERVE_RATIO)
+        )
+        self.background_reserve_ratio = (
+            background_reserve_ratio
+            if background_reserve_ratio is not None
+            else float(
+                os.environ.get(
+                    "GITHUB_RATE_BACKGROUND_RESERVE", DEFAULT_BACKGROUND_RESERVE_RATIO
+                )
+            )
+        )
+        self.max_wait = max_wait
+        self._budgets: dict[str, Budget] = {}
+        self._next_slot: dict[str, float] = {}
+
+    def budget(self, resource: str = "core") -> Budget:
+        """取得某資源的額度 (不存在時建立空白額度)"""
+        return self._budgets.setdefault(resource, Budget())
+
+    def observe(self, headers: Mapping[str, str], resource: str | None = None) -> None:
+        """以回應標頭更新額度
+
+        Args:
+            headers: GitHub 回應標頭
+            resource: 資源名稱;預設讀取 X-RateLimit-Resource,沒有時為 core
+        """
+        resource = headers.get("X-RateLimit-Resource") or resource or "core"
+        budget = self.budget(resource)
+
+        limit = headers.get("X-RateLimit-Limit")
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if limit and limit.isdigit():
+            budget.limit = int(limit)
+        if remaining and remaining.isdigit():
+            budget.remaining = int(remaining)
+        if reset and reset.isdigit():
+            budget.reset_at = float(reset)
+
+        retry_after = headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            budget.blocked_until = time.time() + int(retry_after)
+
+    async def acquire(self, resource: str = "core", cost: int = 1) -> None:
+        """在送出請求前取得額度,必要時等待或拋出 RateLimitError
+
+        優先權由 current_priority() 決定。
+
+        Args:
+            resource: 請求所屬資源
+            cost: 此請求消耗的額度 (REST 為 1;GraphQL 為預估點數)
+
+        Raises:
+            RateLimitError: 額度不足且無法在 max_wait 內恢復,或背景請求應延後
+        """
+        priority = current_priority()
+        budget = self.budget(resource)
+        now = time.time()
+
+        if budget.blocked_until > now:
+            wait = budget.blocked_until - now
+            if priority is Priority.BACKGROUND or wait > self.max_wait:
+                raise RateLimitError(
+                    "GitHub API secondary rate limit in effect",
+                    reset_at=budget.blocked_until,
+                )
+            await asyncio.sleep(wait)
+            now = time.time()
+
+        if budget.limit is None or budget.remaining is None:
+            return
+
+        if budget.reset_at <= now:
+            # 已過重置時間,舊數字不再有效;等下一個回應更新
+            budget.remaining = budget.limit
+            return
+
+        if budget.remaining < cost:
+            raise RateLimitError("GitHub API rate limit exceeded", reset_at=budget.reset_at)
+
+        ratio = (
+            self.background_reserve_ratio
+            if priority is Priority.BACKGROUND
+            else self.reserve_ratio
+        )
+        reserve = budget.limit * ratio
+
+        if budget.remaining <= reserve:
+            if priority is Priority.BACKGROUND:
+                raise RateLimitError(
+                    "GitHub API budget reserved for interactive requests",
+                    reset_at=budget.reset_at,
+                )
+            # 把剩餘額度平均分散到重置時間之前
+            interval = (budget.reset_at - now) / budget.remaining
+            slot = max(now, self._next_slot.get(resource, 0.0))
+            self._next_slot[resource] = slot + interval
+            wait = slot - now
+            if wait > self.max_wait:
+                raise RateLimitError(
+                    "GitHub API rate limit nearly exhausted", reset_at=budget.reset_at
+                )
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+        # WHY decrement locally: with many requests in flight, response headers
+        # lag behind. Counting optimistically keeps concurrent callers from all
+        # seeing the same "remaining" and overshooting the budget together.
+        budget.remaining -= cost
+
+    def stats(self) -> dict[str, dict]:
+        """回傳各資源的額度狀態"""
+        return {
+            resource: {
+                "limit": budget.limit,
+                "remaining": budget.remaining,
+                "reset_at": budget.reset_at,
+                "blocked_until": budget.blocked_until,
+            }
+            for resource, budget in self._budgets.items()
+        }
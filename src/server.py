@@ -3,7 +3,12 @@
 
 import asyncio
 import json
+import logging
 import os
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
 from typing import Any
 
 from mcp.server import Server
@@ -14,33 +19,127 @@ from mcp.types import (
     Tool,
 )
 
+from .async_github_client import AsyncGitHubClient
+from .cache import current_freshness
+from .executor import ToolExecutor, gather_bounded
 from .github_client import (
-    GitHubClient,
-    GitHubClientError,
-    RepositoryNotFoundError,
     AuthenticationError,
+    GitHubClientError,
     RateLimitError,
+    RepositoryNotFoundError,
+)
+from .healthcheck import clear_ready, mark_ready
+from .metrics import (
+    TOOL_LATENCY,
+    register_client_collector,
+    serialization_timer,
+    start_metrics_server,
+)
+from .profiling import SlowRequestProfiler
+from .shared_cache import SharedCache
+from .timing import request_timing, timed_phase
+from .tools.commits import commit_activity
+from .tools.contributors import author_concentration
+from .tools.languages import (
+    MAX_AGGREGATE_REPOSITORIES,
+    aggregate_language_bytes,
+    collect_language_bytes,
+    resolve_repositories,
 )
-
 
 # 建立 MCP Server 實例
 server = Server("github-analytics")
 
+logger = logging.getLogger(__name__)
+
 # WHY lazy init: The MCP server module is imported at container startup (health
-# check does `import src.server`). Eagerly creating GitHubClient here would
+# check does `import src.server`). Eagerly creating the client here would
 # require a valid GITHUB_TOKEN at import time, breaking the health check.
-github_client: GitHubClient | None = None
+github_client: AsyncGitHubClient | None = None
+# main() 會在背景執行緒預先建立客戶端,與第一個工具呼叫可能同時發生
+_github_client_lock = threading.Lock()
 
 
-def get_github_client() -> GitHubClient:
+def get_github_client() -> AsyncGitHubClient:
     """取得或建立 GitHub 客戶端實例"""
     global github_client
     if github_client is None:
-        token = os.environ.get("GITHUB_TOKEN")
-        github_client = GitHubClient(token=token)
+        with _github_client_lock:
+            if github_client is None:
+                token = os.environ.get("GITHUB_TOKEN")
+                # 每個 stdio session 都是新的程序;設定 GITHUB_DISK_CACHE 時,
+                # 同一台主機上的 session 共用磁碟快取,不必從冷快取開始
+                github_client = AsyncGitHubClient(
+                    token=token, shared_cache=SharedCache.from_env()
+                )
     return github_client
 
 
+def _prepare_github_client() -> None:
+    """預先建立客戶端;token 未設定時留給第一個工具呼叫回報"""
+    try:
+        get_github_client()
+    except AuthenticationError:
+        pass
+    except Exception:
+        # 其他錯誤 (設定錯誤、快取檔案無法開啟) 第一個工具呼叫會再遇到一次;
+        # 這裡先記下完整的 traceback,預先建立失敗也不影響 MCP 握手
+        logger.exception("Failed to prepare the GitHub client")
+
+
+# 所有工具呼叫共用的執行器 (並行上限 MCP_MAX_CONCURRENCY、逾時 MCP_TOOL_TIMEOUT)
+tool_executor = ToolExecutor()
+
+# 超過 REQUEST_PROFILE_THRESHOLD_MS 的工具呼叫輸出取樣堆疊 (未設定時為 None)
+slow_request_profiler = SlowRequestProfiler.from_env()
+
+# analyze_repositories 單次呼叫內同時進行的 GitHub 查詢上限
+ANALYZE_CONCURRENCY = int(os.environ.get("MCP_ANALYZE_CONCURRENCY", "8"))
+ANALYZE_MAX_REPOSITORIES = 30
+ANALYZE_FACETS = ("stats", "languages", "contributors", "commits")
+
+# WHY 50 for aggregate_languages: cache misses issued together are merged into
+# GraphQL queries of up to GITHUB_GRAPHQL_BATCH (25) repositories, so 50
+# in flight keeps two full batches going instead of many small ones.
+AGGREGATE_CONCURRENCY = int(os.environ.get("MCP_AGGREGATE_CONCURRENCY", "50"))
+
+
+def cache_metadata() -> dict[str, Any]:
+    """回傳最近一次 GitHub 查詢的快取新鮮度欄位
+
+    資料來自快取時,回傳 {"cache": {"age_seconds": ..., "stale": ...}};
+    stale 為 True 表示資料已過期、正在背景刷新。
+    """
+    freshness = current_freshness()
+    if freshness is None:
+        return {}
+    return {
+        "cache": {
+            "age_seconds": round(freshness.age, 1),
+            "stale": freshness.stale,
+        }
+    }
+
+
+def rate_limit_error(e: RateLimitError) -> dict[str, Any]:
+    """將速率限制錯誤轉為工具結果,包含建議的重試秒數"""
+    result: dict[str, Any] = {"error": "GitHub API rate limit exceeded"}
+    if e.retry_after:
+        result["retry_after_seconds"] = e.retry_after
+    return result
+
+
+def github_error(e: GitHubClientError) -> dict[str, Any]:
+    """將 GitHub 領域例外轉為工具結果 (與各工具的錯誤訊息相同)"""
+    if isinstance(e, RepositoryNotFoundError):
+        return {"error": "Repository not found"}
+    if isinstance(e, AuthenticationError):
+        return {"error": "Authentication failed. Check your GitHub token"}
+    if isinstance(e, RateLimitError):
+        return rate_limit_error(e)
+    return {"error": str(e)}
+
+
 # 定義所有可用的工具
 TOOLS = [
     Tool(
@@ -65,8 +164,9 @@ TOOLS = [
     Tool(
         name="list_recent_commits",
         description="列出 GitHub 倉庫最近的 commits 紀錄。"
-                    "可指定要取得的 commit 數量,以及可選擇特定分支。"
-                    "回傳每個 commit 的 SHA、作者、訊息和時間。",
+                    "可指定要取得的 commit 數量,以及可選擇特定分支、時間範圍或檔案路徑。"
+                    "回傳每個 commit 的 SHA、作者、訊息和時間;"
+                    "若還有更多 commits,會回傳 next_cursor 供取得下一頁。",
         inputSchema={
             "type": "object",
             "properties": {
@@ -88,6 +188,23 @@ TOOLS = [
                 "branch": {
                     "type": "string",
                     "description": "指定分支名稱,預設為倉庫的預設分支"
+                },
+                "since": {
+                    "type": "string",
+                    "description": "只列出此時間之後的 commits (ISO 8601,例如 2024-01-01T00:00:00Z)"
+                },
+                "until": {
+                    "type": "string",
+                    "description": "只列出此時間之前的 commits (ISO 8601)"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "只列出修改此檔案或目錄的 commits"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "上一次結果的 next_cursor,用於取得下一頁;"
+                                   "提供時其他篩選參數由 cursor 決定"
                 }
             },
             "required": ["owner", "repo"]
@@ -96,7 +213,8 @@ TOOLS = [
     Tool(
         name="analyze_contributors",
         description="分析 GitHub 倉庫的主要貢獻者。"
-                    "回傳貢獻者列表,包含每位貢獻者的 commit 數量、新增和刪除的程式碼行數。"
+                    "回傳貢獻者列表,包含每位貢獻者的 commit 數量、新增和刪除的程式碼行數"
+                    "(GitHub 仍在計算行數統計時為 null,並回傳 line_stats_pending: true,稍後再查詢即可)。"
                     "可用於了解專案的貢獻分布和核心維護者。",
         inputSchema={
             "type": "object",
@@ -140,6 +258,162 @@ TOOLS = [
             "required": ["owner", "repo"]
         }
     ),
+    Tool(
+        name="analyze_repositories",
+        description="一次分析多個 GitHub 倉庫,適合比較候選專案。"
+                    "可選擇要取得的面向:stats (統計)、languages (語言分布)、"
+                    "contributors (主要貢獻者)、commits (最近 commits)。"
+                    "所有倉庫並行查詢,回傳單一精簡的合併結果;個別倉庫失敗不影響其他倉庫。",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "repositories": {
+                    "type": "array",
+                    "description": "要分析的倉庫,格式為 owner/repo",
+                    "items": {"type": "string"},
+                    "minItems": 1,
+                    "maxItems": ANALYZE_MAX_REPOSITORIES
+                },
+                "facets": {
+                    "type": "array",
+                    "description": "要取得的面向,預設為全部",
+                    "items": {"type": "string", "enum": list(ANALYZE_FACETS)}
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "每個倉庫的 commit 數量,預設為 5",
+                    "default": 5,
+                    "minimum": 1,
+                    "maximum": 100
+                },
+                "top_n": {
+                    "type": "integer",
+                    "description": "每個倉庫的前 N 名貢獻者,預設為 5",
+                    "default": 5,
+                    "minimum": 1,
+                    "maximum": 100
+                }
+            },
+            "required": ["repositories"]
+        }
+    ),
+    Tool(
+        name="analyze_commit_activity",
+        description="分析 GitHub 倉庫的 commit 活躍度趨勢。"
+                    "回傳每日 (最近 90 天) 與每週 (最近 52 週) 的 commit 數、7 天滾動平均、"
+                    "星期分布、最近 28 天與前 28 天的比較,以及距離最新 commit 的天數。"
+                    "可用於判斷專案是否仍在積極維護。",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "倉庫擁有者的 GitHub 使用者名稱或組織名稱"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "倉庫名稱"
+                },
+                "branch": {
+                    "type": "string",
+                    "description": "指定分支名稱,若不指定則使用預設分支"
+                },
+                "days": {
+                    "type": "integer",
+                    "description": "分析最近幾天的 commits,預設為 365",
+                    "default": 365,
+                    "minimum": 1,
+                    "maximum": 3650
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    ),
+    Tool(
+        name="analyze_contributor_concentration",
+        description="分析 GitHub 倉庫 commits 在作者之間的集中程度。"
+                    "回傳 bus factor (涵蓋一半 commits 所需的最少作者數)、HHI、Gini 係數、"
+                    "最近 90 天的活躍作者數,以及前 N 名作者的 commit 比例。"
+                    "可用於評估專案對少數維護者的依賴風險。",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "owner": {
+                    "type": "string",
+                    "description": "倉庫擁有者的 GitHub 使用者名稱或組織名稱"
+                },
+                "repo": {
+                    "type": "string",
+                    "description": "倉庫名稱"
+                },
+                "branch": {
+                    "type": "string",
+                    "description": "指定分支名稱,若不指定則使用預設分支"
+                },
+                "days": {
+                    "type": "integer",
+                    "description": "分析最近幾天的 commits,預設為 365",
+                    "default": 365,
+                    "minimum": 1,
+                    "maximum": 3650
+                },
+                "top_n": {
+                    "type": "integer",
+                    "description": "要列出的前 N 名作者,預設為 10",
+                    "default": 10,
+                    "minimum": 1,
+                    "maximum": 100
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    ),
+    Tool(
+        name="aggregate_languages",
+        description="彙總多個倉庫的程式語言分布,適合研究技術趨勢。"
+                    "可指定組織 (org)、GitHub topic 或 owner/repo 列表 (三選一)。"
+                    "回傳以程式碼 bytes 加權的語言比例、各倉庫比例的平均、"
+                    "使用各語言的倉庫數,以及以該語言為主要語言的倉庫數。",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "org": {
+                    "type": "string",
+                    "description": "GitHub 組織或使用者名稱,彙總其公開倉庫"
+                },
+                "topic": {
+                    "type": "string",
+                    "description": "GitHub topic,彙總帶有此 topic 的倉庫 (依 stars 排序)"
+                },
+                "repositories": {
+                    "type": "array",
+                    "description": "要彙總的倉庫,格式為 owner/repo",
+                    "items": {"type": "string"},
+                    "minItems": 1,
+                    "maxItems": MAX_AGGREGATE_REPOSITORIES
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "由 org 或 topic 列出的倉庫數上限,預設為 100",
+                    "default": 100,
+                    "minimum": 1,
+                    "maximum": MAX_AGGREGATE_REPOSITORIES
+                },
+                "top_n": {
+                    "type": "integer",
+                    "description": "要列出的前 N 種語言,其餘合併為 other,預設為 15",
+                    "default": 15,
+                    "minimum": 1,
+                    "maximum": 100
+                },
+                "include_forks": {
+                    "type": "boolean",
+                    "description": "是否包含 fork 與封存的倉庫,預設為 false",
+                    "default": False
+                }
+            }
+        }
+    ),
 ]
 
 
@@ -154,36 +428,79 @@ async def list_tools() -> list[Tool]:
 # and avoids hidden magic — important for a reference project meant to be read.
 @server.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
-    """處理工具呼叫請求"""
+    """處理工具呼叫請求
+
+    REQUEST_TIMING=1 時,結果的 _meta.timing 附上此次呼叫的耗時分解
+    (cache、fill、throttle、upstream、analytics、encode 與快取命中次數)。
+    """
+    profile = slow_request_profiler.profile(name) if slow_request_profiler else nullcontext()
+    with request_timing() as timing, profile:
+        result = await dispatch_tool(name, arguments)
+    if timing is not None:
+        result.meta = {"timing": timing.as_dict()}
+    return result
+
+
+async def dispatch_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
+    """將工具呼叫分派給對應的 handler,並把結果或錯誤轉為 CallToolResult"""
+    started = time.perf_counter()
+    outcome = "error"
     try:
         if name == "get_repo_stats":
-            result = await handle_get_repo_stats(arguments)
+            handler = handle_get_repo_stats
         elif name == "list_recent_commits":
-            result = await handle_list_recent_commits(arguments)
+            handler = handle_list_recent_commits
         elif name == "analyze_contributors":
-            result = await handle_analyze_contributors(arguments)
+            handler = handle_analyze_contributors
         elif name == "get_language_breakdown":
-            result = await handle_get_language_breakdown(arguments)
+            handler = handle_get_language_breakdown
+        elif name == "analyze_repositories":
+            handler = handle_analyze_repositories
+        elif name == "analyze_commit_activity":
+            handler = handle_analyze_commit_activity
+        elif name == "analyze_contributor_concentration":
+            handler = handle_analyze_contributor_concentration
+        elif name == "aggregate_languages":
+            handler = handle_aggregate_languages
         else:
+            # 未知的工具名稱不記錄指標,避免任意字串成為標籤值
+            started = None
             return CallToolResult(
                 content=[TextContent(type="text", text=f"未知的工具: {name}")],
                 isError=True
             )
 
-        return CallToolResult(
-            content=[TextContent(type="text", text=json.dumps(result, ensure_ascii=False, indent=2))]
-        )
+        result = await tool_executor.run(handler, arguments)
+        outcome = "github_error" if "error" in result else "ok"
+
+        with serialization_timer("mcp"), timed_phase("encode"):
+            text = json.dumps(result, ensure_ascii=False, indent=2)
+        return CallToolResult(content=[TextContent(type="text", text=text)])
 
     except ValueError as e:
+        outcome = "invalid_arguments"
         return CallToolResult(
-            content=[TextContent(type="text", text=f"參數錯誤: {str(e)}")],
+            content=[TextContent(type="text", text=f"參數錯誤: {e!s}")],
+            isError=True
+        )
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        return CallToolResult(
+            content=[TextContent(
+                type="text",
+                text=f"執行逾時: {name} 超過 {tool_executor.timeout} 秒未完成",
+            )],
             isError=True
         )
     except Exception as e:
+        logger.exception("工具 %s 執行時發生未預期錯誤", name)
         return CallToolResult(
-            content=[TextContent(type="text", text=f"執行錯誤: {str(e)}")],
+            content=[TextContent(type="text", text=f"執行錯誤: {e!s}")],
             isError=True
         )
+    finally:
+        if started is not None:
+            TOOL_LATENCY.labels(name, outcome).observe(time.perf_counter() - started)
 
 
 async def handle_get_repo_stats(arguments: dict[str, Any]) -> dict[str, Any]:
@@ -196,7 +513,7 @@ async def handle_get_repo_stats(arguments: dict[str, Any]) -> dict[str, Any]:
 
     try:
         client = get_github_client()
-        stats = client.get_repo_statistics(owner, repo)
+        stats = await client.get_repo_statistics(owner, repo)
         return {
             "repository": f"{owner}/{repo}",
             "stats": {
@@ -210,13 +527,14 @@ async def handle_get_repo_stats(arguments: dict[str, Any]) -> dict[str, Any]:
             "created_at": stats["created_at"],
             "updated_at": stats["updated_at"],
             "default_branch": stats["default_branch"],
+            **cache_metadata(),
         }
     except RepositoryNotFoundError:
         return {"error": "Repository not found"}
     except AuthenticationError:
         return {"error": "Authentication failed. Check your GitHub token"}
-    except RateLimitError:
-        return {"error": "GitHub API rate limit exceeded"}
+    except RateLimitError as e:
+        return rate_limit_error(e)
     except GitHubClientError as e:
         return {"error": str(e)}
 
@@ -227,6 +545,10 @@ async def handle_list_recent_commits(arguments: dict[str, Any]) -> dict[str, Any
     repo = arguments.get("repo")
     limit = arguments.get("limit", 10)
     branch = arguments.get("branch")
+    since = arguments.get("since")
+    until = arguments.get("until")
+    path = arguments.get("path")
+    cursor = arguments.get("cursor")
 
     if not owner or not repo:
         raise ValueError("owner 和 repo 為必要參數")
@@ -234,21 +556,39 @@ async def handle_list_recent_commits(arguments: dict[str, Any]) -> dict[str, Any
     if not isinstance(limit, int) or limit < 1 or limit > 100:
         raise ValueError("limit 必須是 1-100 之間的整數")
 
+    for name, value in (("since", since), ("until", until)):
+        if value is not None:
+            try:
+                datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except (AttributeError, ValueError):
+                raise ValueError(f"{name} 必須是 ISO 8601 時間字串")
+
     try:
         client = get_github_client()
-        commits = client.get_recent_commits(owner, repo, limit=limit, branch=branch)
+        page = await client.get_commit_page(
+            owner,
+            repo,
+            limit=limit,
+            branch=branch,
+            since=since,
+            until=until,
+            path=path,
+            cursor=cursor,
+        )
         return {
             "repository": f"{owner}/{repo}",
-            "branch": branch or "default",
-            "limit": limit,
-            "commits": commits,
+            "branch": page["branch"] or "default",
+            "limit": page["limit"],
+            "commits": page["commits"],
+            "next_cursor": page["next_cursor"],
+            **cache_metadata(),
         }
     except RepositoryNotFoundError:
         return {"error": "Repository not found"}
     except AuthenticationError:
         return {"error": "Authentication failed. Check your GitHub token"}
-    except RateLimitError:
-        return {"error": "GitHub API rate limit exceeded"}
+    except RateLimitError as e:
+        return rate_limit_error(e)
     except GitHubClientError as e:
         return {"error": str(e)}
 
@@ -267,18 +607,19 @@ async def handle_analyze_contributors(arguments: dict[str, Any]) -> dict[str, An
 
     try:
         client = get_github_client()
-        contributors = client.get_contributors_stats(owner, repo, top_n=top_n)
+        stats = await client.get_contributor_line_stats(owner, repo, top_n=top_n)
         return {
             "repository": f"{owner}/{repo}",
             "top_n": top_n,
-            "contributors": contributors,
+            **stats,
+            **cache_metadata(),
         }
     except RepositoryNotFoundError:
         return {"error": "Repository not found"}
     except AuthenticationError:
         return {"error": "Authentication failed. Check your GitHub token"}
-    except RateLimitError:
-        return {"error": "GitHub API rate limit exceeded"}
+    except RateLimitError as e:
+        return rate_limit_error(e)
     except GitHubClientError as e:
         return {"error": str(e)}
 
@@ -293,29 +634,240 @@ async def handle_get_language_breakdown(arguments: dict[str, Any]) -> dict[str,
 
     try:
         client = get_github_client()
-        languages = client.get_languages(owner, repo)
+        languages = await client.get_languages(owner, repo)
         return {
             "repository": f"{owner}/{repo}",
             "languages": languages,
+            **cache_metadata(),
         }
     except RepositoryNotFoundError:
         return {"error": "Repository not found"}
     except AuthenticationError:
         return {"error": "Authentication failed. Check your GitHub token"}
-    except RateLimitError:
-        return {"error": "GitHub API rate limit exceeded"}
+    except RateLimitError as e:
+        return rate_limit_error(e)
     except GitHubClientError as e:
         return {"error": str(e)}
 
 
+async def handle_analyze_repositories(arguments: dict[str, Any]) -> dict[str, Any]:
+    """處理 analyze_repositories 工具
+
+    WHY one tool for N repositories: comparing libraries otherwise costs
+    4 tools × N sequential round trips between the agent and this server.
+    Here every (repository, facet) lookup runs concurrently under
+    MCP_ANALYZE_CONCURRENCY, and simultaneous cache misses are merged into
+    GraphQL batches by the client, so a comparison costs about one round trip.
+    """
+    repositories = arguments.get("repositories")
+    facets = arguments.get("facets") or list(ANALYZE_FACETS)
+    limit = arguments.get("limit", 5)
+    top_n = arguments.get("top_n", 5)
+
+    if not isinstance(repositories, list) or not repositories:
+        raise ValueError("repositories 必須是非空的 owner/repo 清單")
+    if len(repositories) > ANALYZE_MAX_REPOSITORIES:
+        raise ValueError(f"repositories 最多 {ANALYZE_MAX_REPOSITORIES} 個")
+
+    targets = []
+    for full_name in dict.fromkeys(repositories):
+        owner, _, repo = full_name.partition("/") if isinstance(full_name, str) else ("", "", "")
+        if not owner or not repo or "/" in repo:
+            raise ValueError(f"倉庫格式必須是 owner/repo: {full_name}")
+        targets.append((owner, repo))
+
+    unknown = set(facets) - set(ANALYZE_FACETS)
+    if unknown:
+        raise ValueError(f"未知的 facets: {', '.join(sorted(unknown))}")
+
+    if not isinstance(limit, int) or limit < 1 or limit > 100:
+        raise ValueError("limit 必須是 1-100 之間的整數")
+
+    if not isinstance(top_n, int) or top_n < 1 or top_n > 100:
+        raise ValueError("top_n 必須是 1-100 之間的整數")
+
+    client = get_github_client()
+
+    async def fetch(owner: str, repo: str, facet: str) -> Any:
+        if facet == "stats":
+            return await client.get_repo_statistics(owner, repo)
+        if facet == "languages":
+            return await client.get_languages(owner, repo)
+        if facet == "contributors":
+            contributors = await client.get_contributors_stats(owner, repo, top_n=top_n)
+            return [
+                {"login": c["login"], "contributions": c["contributions"]}
+                for c in contributors
+            ]
+        commits = await client.get_recent_commits(owner, repo, limit=limit)
+        return [
+            {
+                "sha": c["sha"][:7],
+                "author": c["author"],
+                "date": c["date"],
+                "message": c["message"].split("\n", 1)[0],
+            }
+            for c in commits
+        ]
+
+    calls = [(owner, repo, facet) for owner, repo in targets for facet in facets]
+    results = await gather_bounded(
+        [lambda call=call: fetch(*call) for call in calls],
+        limit=ANALYZE_CONCURRENCY,
+    )
+
+    analysis: dict[str, dict[str, Any]] = {
+        f"{owner}/{repo}": {} for owner, repo in targets
+    }
+    for (owner, repo, facet), result in zip(calls, results):
+        if isinstance(result, GitHubClientError):
+            result = github_error(result)
+        elif isinstance(result, Exception):
+            raise result
+        analysis[f"{owner}/{repo}"][facet] = result
+
+    # 倉庫不存在時每個面向都是同一個錯誤,合併成一筆
+    not_found = github_error(RepositoryNotFoundError(""))
+    for full_name, facet_results in analysis.items():
+        if all(value == not_found for value in facet_results.values()):
+            analysis[full_name] = not_found
+
+    return {
+        "facets": list(facets),
+        "repositories": analysis,
+    }
+
+
+def timeline_arguments(arguments: dict[str, Any]) -> tuple[str, str, str | None, int]:
+    """驗證 commit 時間序列分析工具共用的參數"""
+    owner = arguments.get("owner")
+    repo = arguments.get("repo")
+    branch = arguments.get("branch")
+    days = arguments.get("days", 365)
+
+    if not owner or not repo:
+        raise ValueError("owner 和 repo 為必要參數")
+
+    if not isinstance(days, int) or days < 1 or days > 3650:
+        raise ValueError("days 必須是 1-3650 之間的整數")
+
+    return owner, repo, branch, days
+
+
+async def handle_analyze_commit_activity(arguments: dict[str, Any]) -> dict[str, Any]:
+    """處理 analyze_commit_activity 工具"""
+    owner, repo, branch, days = timeline_arguments(arguments)
+
+    try:
+        client = get_github_client()
+        timeline = await client.get_commit_timeline(owner, repo, branch=branch, days=days)
+        with timed_phase("analytics"):
+            activity = commit_activity(timeline)
+        return {
+            "repository": f"{owner}/{repo}",
+            "branch": branch,
+            "days": days,
+            "truncated": timeline["truncated"],
+            **activity,
+            **cache_metadata(),
+        }
+    except GitHubClientError as e:
+        return github_error(e)
+
+
+async def handle_analyze_contributor_concentration(arguments: dict[str, Any]) -> dict[str, Any]:
+    """處理 analyze_contributor_concentration 工具"""
+    owner, repo, branch, days = timeline_arguments(arguments)
+    top_n = arguments.get("top_n", 10)
+
+    if not isinstance(top_n, int) or top_n < 1 or top_n > 100:
+        raise ValueError("top_n 必須是 1-100 之間的整數")
+
+    try:
+        client = get_github_client()
+        timeline = await client.get_commit_timeline(owner, repo, branch=branch, days=days)
+        with timed_phase("analytics"):
+            concentration = author_concentration(timeline, top_n=top_n)
+        return {
+            "repository": f"{owner}/{repo}",
+            "branch": branch,
+            "days": days,
+            "truncated": timeline["truncated"],
+            **concentration,
+            **cache_metadata(),
+        }
+    except GitHubClientError as e:
+        return github_error(e)
+
+
+async def handle_aggregate_languages(arguments: dict[str, Any]) -> dict[str, Any]:
+    """處理 aggregate_languages 工具"""
+    org = arguments.get("org")
+    topic = arguments.get("topic")
+    repositories = arguments.get("repositories")
+    limit = arguments.get("limit", 100)
+    top_n = arguments.get("top_n", 15)
+    include_forks = bool(arguments.get("include_forks", False))
+
+    if repositories is not None and not isinstance(repositories, list):
+        raise ValueError("repositories 必須是 owner/repo 清單")
+
+    if not isinstance(limit, int) or limit < 1 or limit > MAX_AGGREGATE_REPOSITORIES:
+        raise ValueError(f"limit 必須是 1-{MAX_AGGREGATE_REPOSITORIES} 之間的整數")
+
+    if not isinstance(top_n, int) or top_n < 1 or top_n > 100:
+        raise ValueError("top_n 必須是 1-100 之間的整數")
+
+    try:
+        client = get_github_client()
+        targets = await resolve_repositories(
+            client, org, topic, repositories, limit=limit, include_forks=include_forks
+        )
+        names, byte_counts, failed = await collect_language_bytes(
+            client, targets, AGGREGATE_CONCURRENCY
+        )
+    except GitHubClientError as e:
+        return github_error(e)
+
+    with timed_phase("analytics"):
+        aggregate = aggregate_language_bytes(byte_counts, top_n=top_n)
+    return {
+        "org": org,
+        "topic": topic,
+        "requested": len(targets),
+        "analyzed": len(names),
+        **aggregate,
+        "failed": failed,
+        **cache_metadata(),
+    }
+
+
 async def main():
     """啟動 MCP Server"""
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    # 抓取指標時讀取客戶端與執行器的統計 (客戶端尚未建立時略過)
+    register_client_collector(lambda: github_client, lambda: tool_executor)
+    # stdio 被 MCP 協定占用,指標改由獨立的 HTTP 埠 (MCP_METRICS_PORT) 提供
+    start_metrics_server()
+    # WHY create the client during the handshake: the first httpx client loads
+    # httpcore's HTTP/1.1 and HTTP/2 stacks and builds a TLS context (~0.1 s).
+    # The MCP client needs at least one round trip (initialize) before it can
+    # call a tool, so doing this in a thread meanwhile takes it off the first
+    # tool call instead of adding to it.
+    prepare = asyncio.create_task(asyncio.to_thread(_prepare_github_client))
+    # 到這裡所有模組都已載入成功;讓健康檢查確認伺服器真的在執行
+    ready_file = mark_ready()
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        clear_ready(ready_file)
+        await prepare
+        if github_client is not None:
+            await github_client.aclose()
 
 
 if __name__ == "__main__":
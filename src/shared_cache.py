@@ -0,0 +1,450 @@
+# 跨副本共用快取 (L2)
+# 讓多個 API gateway 副本共用同一份快取與「刷新鎖」,並以精簡的二進位格式儲存
+#
+# WHY a second tier: the HPA runs 2–5 gateway replicas. With only the in-process
+# TTLCache, every replica warms its own copy and spends its own share of the
+# GitHub rate limit on the same hot repositories. A shared Redis tier lets one
+# replica fetch and the others read; the in-process cache stays in front as L1
+# so a hot key costs no network round trip at all.
+#
+# 同一台主機上的 MCP 程序 (每個 stdio session 一個) 可改用 SQLite 檔案作為 L2,
+# 新的 session 不必從冷快取開始。
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections.abc import Awaitable, Callable
+from typing import Protocol
+
+from .cache import CacheEntry
+from .github_client import RepositoryNotFoundError
+
+KEY_PREFIX = "gha:"
+
+# WHY 10s: matches the client's default upstream timeout. A replica that holds
+# the lock longer than that has almost certainly failed; let another one retry.
+DEFAULT_LOCK_TTL = 10.0
+LOCK_POLL_INTERVAL = 0.05
+
+# WHY 256 MiB: entries are stored zlib-compressed, so this holds far more
+# repositories than a session touches; it only bounds a long-lived host.
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+# 每寫入多少次檢查一次大小並清除過期項目 (避免每次寫入都加總整個資料表)
+DISK_EVICT_EVERY = 64
+# 其他程序正在寫入時,等待 SQLite 寫入鎖的秒數
+DISK_BUSY_TIMEOUT = 5.0
+
+# 負面快取中可還原的例外類別
+_ERROR_TYPES = {cls.__name__: cls for cls in (RepositoryNotFoundError,)}
+
+
+class SharedStore(Protocol):
+    """共用快取儲存後端的最小介面"""
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def acquire(self, key: str, token: str, ttl: float) -> bool: ...
+
+    async def release(self, key: str, token: str) -> None: ...
+
+    async def aclose(self) -> None: ...
+
+
+class MemoryStore:
+    """單一程序內的 SharedStore 實作
+
+    行為與 RedisStore 相同 (TTL、NX 鎖),用於本機開發與測試,不需要 Redis。
+    """
+
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, float]] = {}
+
+    def _live(self, key: str) -> bytes | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] <= time.time():
+            del self._data[key]
+            return None
+        return item[0]
+
+    async def get(self, key: str) -> bytes | None:
+        return self._live(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (value, time.time() + ttl)
+
+    async def acquire(self, key: str, token: str, ttl: float) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._data[key] = (token.encode(), time.time() + ttl)
+        return True
+
+    async def release(self, key: str, token: str) -> None:
+        if self._live(key) == token.encode():
+            del self._data[key]
+
+    async def aclose(self) -> None:
+        self._data.clear()
+
+
+_DISK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+
+CREATE TABLE IF NOT EXISTS locks (
+    key TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SQLiteStore:
+    """以 SQLite 檔案實作的 SharedStore,供同一台主機上的多個程序共用
+
+    WHY SQLite: MCP clients start one server process per session over stdio,
+    so an in-process cache starts cold every time. A WAL-mode SQLite file gives
+    every process on the host the same cache with real transactions (the lock
+    is a row inserted atomically, as SET NX does in Redis) and no daemon to run.
+
+    容量超過 max_bytes 時,先刪除過期項目,再依到期時間由早到晚淘汰
+    (每 DISK_EVICT_EVERY 次寫入檢查一次,因此可能短暫略超過上限)。
+    WHY evict by expiry rather than LRU: recording every read would turn each
+    hit into a write contended by all processes; a hot key is rewritten on
+    every refresh, so its expiry is the latest anyway.
+
+    與 RedisStore 相同,SQLite 錯誤 (檔案損毀、磁碟已滿、鎖等待逾時)
+    一律視為未命中 / 已取得鎖,請求改由 GitHub 回答而不是失敗。
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_DISK_MAX_BYTES):
+        """開啟 (或建立) 快取檔案
+
+        Args:
+            path: SQLite 檔案路徑 (上層目錄不存在時會建立)
+            max_bytes: 項目大小 (壓縮後) 總和的上限
+        """
+        path = os.path.expanduser(path)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._writes = 0
+        # 與 CommitStore 相同:單一連線加鎖,由 to_thread 的工作執行緒呼叫
+        self._db = sqlite3.connect(path, timeout=DISK_BUSY_TIMEOUT, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # 快取資料遺失只代表重新向 GitHub 取得;WAL 下 NORMAL 不會損毀資料庫
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_DISK_SCHEMA)
+
+    def _get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM entries WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time() + ttl),
+            )
+            self._writes += 1
+            if self._writes % DISK_EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self) -> None:
+        """清除過期的項目與鎖,並淘汰最早到期的項目直到低於上限 (需持有 _lock)"""
+        now = time.time()
+        self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        self._db.execute("DELETE FROM locks WHERE expires_at <= ?", (now,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 一次淘汰到上限的 90%,避免之後每次檢查都要淘汰
+        excess = total - int(self.max_bytes * 0.9)
+        rows = self._db.execute("SELECT key, size FROM entries ORDER BY expires_at")
+        victims = []
+        for key, size in rows:
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def _acquire(self, key: str, token: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM locks WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO locks (key, token, expires_at) VALUES (?, ?, ?)",
+                (key, token, now + ttl),
+            )
+        return cursor.rowcount == 1
+
+    def _release(self, key: str, token: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM locks WHERE key = ? AND token = ?", (key, token))
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await asyncio.to_thread(self._get, key)
+        except sqlite3.Error:
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            await asyncio.to_thread(self._set, key, value, ttl)
+        except sqlite3.Error:
+            pass
+
+    async def acquire(self, key: str, token: str, ttl: float) -> bool:
+        try:
+            return await asyncio.to_thread(self._acquire, key, token, ttl)
+        except sqlite3.Error:
+            return True
+
+    async def release(self, key: str, token: str) -> None:
+        try:
+            await asyncio.to_thread(self._release, key, token)
+        except sqlite3.Error:
+            pass
+
+    async def aclose(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+# 只有持有者 (token 相同) 才能釋放鎖,避免誤刪其他副本在鎖過期後取得的新鎖
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisStore:
+    """以 Redis 實作的 SharedStore
+
+    WHY swallow Redis errors: the shared tier is an optimization. If Redis is
+    down, reads behave as misses and the lock is treated as acquired, so each
+    replica falls back to fetching from GitHub itself instead of failing the
+    request.
+    """
+
+    def __init__(self, url: str):
+        """初始化 Redis 連線
+
+        Args:
+            url: Redis 連線位址,例如 redis://redis:6379/0
+        """
+        # 只有啟用 Redis 時才需要安裝 redis 套件
+        import redis.asyncio as redis
+
+        self._errors = (redis.RedisError, OSError)
+        self._redis = redis.Redis.from_url(url)
+        self._release = self._redis.register_script(_RELEASE_SCRIPT)
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self._redis.get(key)
+        except self._errors:
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            await self._redis.set(key, value, px=max(1, int(ttl * 1000)))
+        except self._errors:
+            pass
+
+    async def acquire(self, key: str, token: str, ttl: float) -> bool:
+        try:
+            return bool(
+                await self._redis.set(key, token, px=int(ttl * 1000), nx=True)
+            )
+        except self._errors:
+            return True
+
+    async def release(self, key: str, token: str) -> None:
+        try:
+            await self._release(keys=[key], args=[token])
+        except self._errors:
+            pass
+
+    async def aclose(self) -> None:
+        await self._redis.aclose()
+
+
+def encode_entry(entry: CacheEntry) -> bytes:
+    """將快取項目序列化為 zlib 壓縮的 JSON"""
+    if entry.error is not None:
+        exc_type, args = entry.error
+        payload = {"e": [exc_type.__name__, list(args)], "x": entry.expires_at}
+    else:
+        payload = {"v": entry.value, "x": entry.expires_at, "s": entry.stored_at}
+        if entry.etag:
+            payload["t"] = entry.etag
+        if entry.last_modified:
+            payload["m"] = entry.last_modified
+    return zlib.compress(json.dumps(payload, separators=(",", ":")).encode())
+
+
+def decode_entry(data: bytes) -> CacheEntry | None:
+    """還原 encode_entry 產生的資料;格式不符時回傳 None"""
+    try:
+        raw = zlib.decompress(data)
+        payload = json.loads(raw)
+    except (zlib.error, ValueError):
+        return None
+
+    if "e" in payload:
+        name, args = payload["e"]
+        exc_type = _ERROR_TYPES.get(name)
+        if exc_type is None:
+            return None
+        error = (exc_type, tuple(args))
+        value = None
+    else:
+        error = None
+        value = payload["v"]
+    return CacheEntry(
+        value=value,
+        error=error,
+        expires_at=payload["x"],
+        size=len(raw),
+        etag=payload.get("t"),
+        last_modified=payload.get("m"),
+        stored_at=payload.get("s", time.time()),
+    )
+
+
+class SharedCache:
+    """跨副本共用的快取層
+
+    以 get_or_load() 提供「讀取或由單一副本載入」語意:
+    未命中時先取得分散式鎖,取得鎖的副本呼叫 loader 並寫回;
+    其他副本等待結果出現在共用快取中,而不是各自呼叫 GitHub。
+    """
+
+    def __init__(self, store: SharedStore, lock_ttl: float = DEFAULT_LOCK_TTL):
+        """初始化共用快取
+
+        Args:
+            store: 儲存後端 (RedisStore、SQLiteStore 或 MemoryStore)
+            lock_ttl: 刷新鎖的存活秒數
+        """
+        self._store = store
+        self._lock_ttl = lock_ttl
+
+    @classmethod
+    def from_env(cls) -> "SharedCache | None":
+        """依環境變數建立共用快取
+
+        REDIS_URL: Redis 位址 (跨主機共用);設為 memory:// 時使用 MemoryStore
+        GITHUB_DISK_CACHE: 未設定 REDIS_URL 時,以此 SQLite 檔案作為同一主機共用的快取
+        GITHUB_DISK_CACHE_MAX_BYTES: 磁碟快取大小上限,預設 256 MiB
+
+        兩者都未設定時回傳 None。
+        """
+        url = os.environ.get("REDIS_URL")
+        if url:
+            if url.startswith("memory://"):
+                return cls(MemoryStore())
+            return cls(RedisStore(url))
+        path = os.environ.get("GITHUB_DISK_CACHE")
+        if path:
+            return cls(SQLiteStore(
+                path,
+                max_bytes=int(
+                    os.environ.get("GITHUB_DISK_CACHE_MAX_BYTES", DEFAULT_DISK_MAX_BYTES)
+                ),
+            ))
+        return None
+
+    @staticmethod
+    def _key(key: tuple) -> str:
+        # WHY JSON instead of joining with ":": the parts are owner, repo,
+        # branch and cursor fields, which may be None or contain ":". A JSON
+        # array keeps ("a:b", "c") apart from ("a", "b:c") and None apart
+        # from "None".
+        return KEY_PREFIX + json.dumps(key, separators=(",", ":"), default=str)
+
+    async def get(self, key: tuple) -> CacheEntry | None:
+        """讀取未過期的共用快取項目"""
+        data = await self._store.get(self._key(key))
+        if data is None:
+            return None
+        entry = decode_entry(data)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        return entry
+
+    async def put(self, key: tuple, entry: CacheEntry) -> None:
+        """寫入共用快取項目 (Redis TTL 與項目到期時間一致)"""
+        ttl = entry.expires_at - time.time()
+        if ttl > 0:
+            await self._store.set(self._key(key), encode_entry(entry), ttl)
+
+    async def get_or_load(
+        self, key: tuple, loader: Callable[[], Awaitable[CacheEntry]]
+    ) -> CacheEntry:
+        """讀取共用快取;未命中時由單一副本呼叫 loader 載入
+
+        Args:
+            key: 快取鍵
+            loader: 向 GitHub 取資料並回傳 CacheEntry 的 coroutine 函式
+
+        Returns:
+            CacheEntry: 共用快取中的項目或 loader 的結果
+
+        Raises:
+            GitHubClientError: loader 拋出的例外
+        """
+        entry = await self.get(key)
+        if entry is not None:
+            return entry
+
+        lock_key = self._key(("lock", *key))
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self._lock_ttl
+        while not await self._store.acquire(lock_key, token, self._lock_ttl):
+            # 其他副本正在刷新:等待結果出現,或等鎖被釋放/過期後自己載入
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            entry = await self.get(key)
+            if entry is not None:
+                return entry
+            if time.monotonic() > deadline:
+                return await loader()
+
+        try:
+            # 取得鎖之前,上一個持有者可能剛寫入結果
+            entry = await self.get(key)
+            if entry is None:
+                entry = await loader()
+                await self.put(key, entry)
+            return entry
+        finally:
+            await self._store.release(lock_key, token)
+
+    async def aclose(self) -> None:
+        """關閉儲存後端連線"""
+        await self._store.aclose()
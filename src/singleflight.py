@@ -0,0 +1,81 @@
+# 請求合併 (single-flight)
+# 相同鍵的並行呼叫共用同一次上游請求,結果或例外分送給所有等待者
+#
+# WHY: a dashboard load fires dozens of identical requests within the same
+# second. They all miss the cache together, so without coalescing each one
+# would call GitHub — a thundering herd that costs latency and rate limit for
+# data that is about to be cached anyway.
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+from .ratelimit import (
+    SharedPriority,
+    current_priority,
+    share_priority,
+    use_shared_priority,
+)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """以鍵合併並行中的 coroutine 呼叫
+
+    Attributes:
+        shared: 加入既有呼叫 (未另外發出請求) 的次數
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, tuple[asyncio.Task, SharedPriority]] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """執行 func;若相同鍵的呼叫正在進行,改為等待它的結果
+
+        Args:
+            key: 合併用的鍵
+            func: 實際執行的 coroutine 函式
+
+        Returns:
+            T: func 的回傳值
+
+        共用的呼叫以所有等待者中最急迫的優先權送出請求 (見 SharedPriority)。
+
+        Raises:
+            Exception: func 拋出的例外 (所有等待者都會收到)
+        """
+        call = self._calls.get(key)
+        if call is None:
+            priority = share_priority()
+            # WHY a separate task: if the first caller is cancelled (client
+            # disconnect, MCP tool timeout), the shared call must keep running
+            # for everyone else who is waiting on it.
+            task = asyncio.ensure_future(self._run(priority, func))
+            self._calls[key] = (task, priority)
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            task, priority = call
+            priority.join(current_priority())
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _run(priority: SharedPriority, func: Callable[[], Awaitable[T]]) -> T:
+        use_shared_priority(priority)
+        return await func()
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
+        # 標記例外已讀取,避免所有等待者都被取消時出現 "never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
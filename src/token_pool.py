@@ -0,0 +1,171 @@
+# GitHub token 池
+# 將請求分散到多個 token,每次挑選剩餘額度最多的 token,並隔離失效或用盡的 token
+#
+# WHY a pool: one token gives 5000 requests/hour no matter how many replicas
+# the HPA adds, so the token — not CPU — is the throughput ceiling. Each token
+# keeps its own RateLimitScheduler, so pacing and budgets are tracked per token
+# exactly as they are for a single one.
+
+import os
+import time
+from dataclasses import dataclass, field
+
+from .github_client import AuthenticationError, RateLimitError
+from .ratelimit import RateLimitScheduler
+
+# 401 沒有重置時間;隔離一段時間後再試,讓輪替後的 token 自動恢復
+DEFAULT_UNAUTHORIZED_QUARANTINE = 3600.0
+
+
+@dataclass
+class TokenState:
+    """池中單一 token 的狀態
+
+    Attributes:
+        label: 用於統計與日誌的名稱 (不含 token 內容)
+        token: GitHub token
+        scheduler: 此 token 專屬的速率限制排程器
+        quarantined_until: 隔離截止時間 (epoch 秒)
+        quarantine_reason: 隔離原因 ("unauthorized" 或 "rate_limited")
+        requests: 已送出的請求數
+    """
+
+    label: str
+    token: str
+    scheduler: RateLimitScheduler = field(default_factory=RateLimitScheduler)
+    quarantined_until: float = 0.0
+    quarantine_reason: str = ""
+    requests: int = 0
+
+    def remaining(self, resource: str) -> float:
+        """此 token 在某資源的剩餘額度;尚未看過回應時視為無限,讓每個 token 都先被試用"""
+        budget = self.scheduler.budget(resource)
+        if budget.remaining is None or budget.reset_at <= time.time():
+            return float("inf")
+        return budget.remaining
+
+
+def _read_tokens(value: str) -> list[str]:
+    """解析以逗號或換行分隔的 token 清單"""
+    return [t.strip() for t in value.replace("\n", ",").split(",") if t.strip()]
+
+
+class TokenPool:
+    """多 token 池
+
+    只有一個 token 時不做隔離,行為與單一 token 完全相同:
+    每個請求都照常送到 GitHub,由 GitHub 的回應決定錯誤。
+    """
+
+    def __init__(self, tokens: list[str]):
+        """初始化 token 池
+
+        Args:
+            tokens: GitHub token 清單 (至少一個)
+
+        Raises:
+            AuthenticationError: 清單為空時
+        """
+        if not tokens:
+            raise AuthenticationError(
+                "GitHub token is required. Set GITHUB_TOKEN environment variable "
+                "or pass token to constructor."
+            )
+        self._states = [
+            TokenState(label=f"token-{i + 1}", token=token)
+            for i, token in enumerate(dict.fromkeys(tokens))
+        ]
+        self._unauthorized_quarantine = float(
+            os.environ.get("GITHUB_TOKEN_QUARANTINE", DEFAULT_UNAUTHORIZED_QUARANTINE)
+        )
+
+    @classmethod
+    def from_env(
+        cls, token: str | None = None, tokens: list[str] | None = None
+    ) -> "TokenPool":
+        """依參數或環境變數建立 token 池
+
+        優先順序: tokens 參數 → token 參數 → GITHUB_TOKENS (逗號分隔)
+        → GITHUB_TOKENS_FILE (掛載的 secret 檔案,逗號或換行分隔) → GITHUB_TOKEN。
+
+        Raises:
+            AuthenticationError: 找不到任何 token 時
+        """
+        if tokens:
+            return cls(tokens)
+        if token:
+            return cls([token])
+        if os.environ.get("GITHUB_TOKENS"):
+            return cls(_read_tokens(os.environ["GITHUB_TOKENS"]))
+        path = os.environ.get("GITHUB_TOKENS_FILE")
+        if path and os.path.exists(path):
+            with open(path) as f:
+                return cls(_read_tokens(f.read()))
+        return cls(_read_tokens(os.environ.get("GITHUB_TOKEN", "")))
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def select(self, resource: str = "core") -> TokenState:
+        """選出剩餘額度最多、未被隔離的 token
+
+        Args:
+            resource: 請求所屬資源 (core、graphql…)
+
+        Returns:
+            TokenState: 選中的 token
+
+        Raises:
+            AuthenticationError: 所有 token 都因 401 被隔離
+            RateLimitError: 所有 token 都因額度用盡被隔離
+        """
+        if len(self._states) == 1:
+            return self._states[0]
+
+        now = time.time()
+        available = [s for s in self._states if s.quarantined_until <= now]
+        if not available:
+            if all(s.quarantine_reason == "unauthorized" for s in self._states):
+                raise AuthenticationError("All configured GitHub tokens were rejected")
+            raise RateLimitError(
+                "GitHub API rate limit exceeded on all tokens",
+                reset_at=min(s.quarantined_until for s in self._states),
+            )
+        return max(available, key=lambda s: (s.remaining(resource), -s.requests))
+
+    def quarantine_unauthorized(self, state: TokenState) -> bool:
+        """將回應 401 的 token 隔離一段時間
+
+        Returns:
+            bool: 是否已隔離 (只有一個 token 時不隔離)
+        """
+        return self._quarantine(
+            state, time.time() + self._unauthorized_quarantine, "unauthorized"
+        )
+
+    def quarantine_rate_limited(self, state: TokenState, until: float) -> bool:
+        """將額度用盡 (或觸發 secondary rate limit) 的 token 隔離到重置時間
+
+        Returns:
+            bool: 是否已隔離 (只有一個 token 時不隔離)
+        """
+        return self._quarantine(state, until, "rate_limited")
+
+    def _quarantine(self, state: TokenState, until: float, reason: str) -> bool:
+        if len(self._states) == 1:
+            return False
+        state.quarantined_until = until
+        state.quarantine_reason = reason
+        return True
+
+    def stats(self) -> dict[str, dict]:
+        """回傳每個 token 的額度、請求數與隔離狀態 (不含 token 內容)"""
+        return {
+            s.label: {
+                "requests": s.requests,
+                "quarantined_until": s.quarantined_until,
+                "quarantine_reason": s.quarantine_reason,
+                "budgets": s.scheduler.stats(),
+            }
+            for s in self._states
+        }
@@ -1,2 +1,120 @@
 # Commit 分析工具
 # 分析倉庫的 commit 歷史、頻率和趨勢
+#
+# WHY NumPy: an activity report over a 100k-commit history touches every
+# commit several times (per day, per week, per weekday, rolling window). Doing
+# that with per-dict Python loops takes seconds; bucketing one int64 array of
+# timestamps with bincount/convolve takes milliseconds, which is what an
+# interactive agent needs.
+
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+DAY = 86400
+# 1970-01-01 是星期四;天數加 3 後,每 7 天的分組會從星期一開始
+_MONDAY_OFFSET = 3
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# 回傳的序列長度 (完整序列在大型倉庫中會有數千個點)
+DAILY_POINTS = 90
+WEEKLY_POINTS = 52
+
+
+def _date(day: int) -> str:
+    """將 epoch 天數轉為 YYYY-MM-DD"""
+    return datetime.fromtimestamp(day * DAY, timezone.utc).date().isoformat()
+
+
+def _timestamp(seconds: int) -> str:
+    return datetime.fromtimestamp(int(seconds), timezone.utc).isoformat()
+
+
+def commit_activity(
+    timeline: dict, now: float | None = None, window: int = 7
+) -> dict[str, Any]:
+    """計算 commit 頻率、滾動平均與趨勢
+
+    Args:
+        timeline: AsyncGitHubClient.get_commit_timeline 的回傳值
+        now: 計算「距今」時使用的時間 (epoch 秒),預設為現在
+        window: 滾動平均的天數
+
+    Returns:
+        dict: 包含:
+            - total_commits (int): commit 總數
+            - first_commit / last_commit (str | None): 最早/最新 commit 時間
+            - days_since_last_commit (float | None): 距離最新 commit 的天數
+            - active_days (int): 有 commit 的天數
+            - average_per_week (float): 從第一個 commit (或 since) 至今的每週平均
+            - daily (dict): 最近 90 天每天的 commit 數 {"start": 日期, "counts": [...]}
+            - rolling_average (list[float]): 與 daily 對應的 window 天滾動平均
+            - weekly (dict): 最近 52 週 (週一起算) 每週的 commit 數
+            - weekday (dict[str, int]): 依星期幾統計的 commit 數
+            - last_28_days / previous_28_days (int): 最近 28 天與前 28 天的 commit 數
+    """
+    # 在函式內載入:NumPy 約佔程序啟動的 0.04 秒,只有分析工具用得到
+    import numpy as np
+
+    now = time.time() if now is None else now
+    today = int(now // DAY)
+    timestamps = np.asarray(timeline["timestamps"], dtype=np.int64)
+
+    if timestamps.size == 0:
+        return {
+            "total_commits": 0,
+            "first_commit": None,
+            "last_commit": None,
+            "days_since_last_commit": None,
+            "active_days": 0,
+            "average_per_week": 0.0,
+            "daily": {"start": _date(today), "counts": []},
+            "rolling_average": [],
+            "weekly": {"start": _date(today), "counts": []},
+            "weekday": dict.fromkeys(WEEKDAYS, 0),
+            "last_28_days": 0,
+            "previous_28_days": 0,
+        }
+
+    days = timestamps // DAY
+    # 有時間範圍時從範圍起點開始計算,開頭沒有 commit 的日子也算在內
+    since = timeline.get("since")
+    first_day = int(days.min()) if since is None else min(since // DAY, int(days.min()))
+    last_day = max(today, int(days.max()))
+    daily = np.bincount(days - first_day, minlength=last_day - first_day + 1)
+
+    # 尾端對齊的滾動平均:第 i 天為第 i-window+1 天到第 i 天的平均
+    rolling = np.convolve(daily, np.ones(window), mode="full")[: daily.size] / window
+
+    weeks = (days + _MONDAY_OFFSET) // 7
+    # 與 daily 相同從 first_day 起算,since 之後開頭沒有 commit 的週也計入平均
+    first_week = (first_day + _MONDAY_OFFSET) // 7
+    last_week = (last_day + _MONDAY_OFFSET) // 7
+    weekly = np.bincount(weeks - first_week, minlength=last_week - first_week + 1)
+
+    weekday = np.bincount((days + _MONDAY_OFFSET) % 7, minlength=7)
+
+    daily_start = max(first_day, last_day - DAILY_POINTS + 1)
+    weekly_start = max(first_week, last_week - WEEKLY_POINTS + 1)
+    last_commit = int(timestamps.max())
+
+    return {
+        "total_commits": int(timestamps.size),
+        "first_commit": _timestamp(timestamps.min()),
+        "last_commit": _timestamp(last_commit),
+        "days_since_last_commit": round((now - last_commit) / DAY, 1),
+        "active_days": int(np.count_nonzero(daily)),
+        "average_per_week": round(float(timestamps.size) / max(weekly.size, 1), 2),
+        "daily": {
+            "start": _date(daily_start),
+            "counts": daily[daily_start - first_day:].tolist(),
+        },
+        "rolling_average": np.round(rolling[daily_start - first_day:], 2).tolist(),
+        "weekly": {
+            "start": _date(weekly_start * 7 - _MONDAY_OFFSET),
+            "counts": weekly[weekly_start - first_week:].tolist(),
+        },
+        "weekday": dict(zip(WEEKDAYS, weekday.tolist())),
+        "last_28_days": int(daily[-28:].sum()),
+        "previous_28_days": int(daily[-56:-28].sum()),
+    }
@@ -1,2 +1,98 @@
 # 貢獻者分析工具
 # 分析倉庫的貢獻者統計和活躍度
+#
+# 與 commits.py 相同,以 NumPy 陣列對整段 commit 歷史做向量化計算
+
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+DAY = 86400
+
+# bus factor 的門檻:至少要幾位作者才能涵蓋一半的 commits
+BUS_FACTOR_SHARE = 0.5
+
+
+def author_concentration(
+    timeline: dict,
+    now: float | None = None,
+    top_n: int = 10,
+    active_days: int = 90,
+) -> dict[str, Any]:
+    """計算作者分布、集中度與 bus factor
+
+    Args:
+        timeline: AsyncGitHubClient.get_commit_timeline 的回傳值
+        now: 計算活躍作者時使用的時間 (epoch 秒),預設為現在
+        top_n: 回傳的前 N 名作者
+        active_days: 最近幾天內有 commit 視為活躍作者
+
+    Returns:
+        dict: 包含:
+            - total_commits (int): commit 總數
+            - authors (int): 作者總數
+            - active_authors (int): 最近 active_days 天內有 commit 的作者數
+            - bus_factor (int): 涵蓋一半 commits 所需的最少作者數
+            - top_share (float): 最多 commit 的作者所佔比例
+            - hhi (float): Herfindahl-Hirschman 指數 (0-1,越大越集中)
+            - gini (float): commit 數的 Gini 係數 (0-1,越大越不平均)
+            - top_authors (list[dict]): 前 N 名作者的 commits、比例與最後 commit 時間
+    """
+    # 第一次分析時才載入 NumPy (見 commits.commit_activity)
+    import numpy as np
+
+    now = time.time() if now is None else now
+    timestamps = np.asarray(timeline["timestamps"], dtype=np.int64)
+    author_ids = np.asarray(timeline["author_ids"], dtype=np.int64)
+    names = timeline["authors"]
+
+    if timestamps.size == 0:
+        return {
+            "total_commits": 0,
+            "authors": 0,
+            "active_authors": 0,
+            "bus_factor": 0,
+            "top_share": 0.0,
+            "hhi": 0.0,
+            "gini": 0.0,
+            "top_authors": [],
+        }
+
+    counts = np.bincount(author_ids, minlength=len(names))
+    order = np.argsort(-counts, kind="stable")
+    ranked = counts[order]
+    total = int(timestamps.size)
+    shares = ranked / total
+
+    # 由多到少累加,第一個達到門檻的位置 + 1 就是 bus factor
+    bus_factor = int(np.searchsorted(np.cumsum(shares), BUS_FACTOR_SHARE) + 1)
+
+    # Gini:以遞增排序的 commit 數計算
+    ascending = ranked[::-1].astype(np.float64)
+    n = ascending.size
+    gini = float((2 * np.arange(1, n + 1) @ ascending) / (n * total) - (n + 1) / n)
+
+    last_commit = np.full(len(names), np.iinfo(np.int64).min)
+    np.maximum.at(last_commit, author_ids, timestamps)
+    recent = author_ids[timestamps >= now - active_days * DAY]
+
+    return {
+        "total_commits": total,
+        "authors": len(names),
+        "active_authors": int(np.unique(recent).size),
+        "bus_factor": bus_factor,
+        "top_share": round(float(shares[0]), 4),
+        "hhi": round(float(shares @ shares), 4),
+        "gini": round(gini, 4),
+        "top_authors": [
+            {
+                "author": names[i],
+                "commits": int(counts[i]),
+                "share": round(float(counts[i]) / total, 4),
+                "last_commit": datetime.fromtimestamp(
+                    int(last_commit[i]), timezone.utc
+                ).isoformat(),
+            }
+            for i in order[:top_n].tolist()
+        ],
+    }
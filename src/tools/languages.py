@@ -1,2 +1,171 @@
 # 語言分布工具
 # 分析倉庫使用的程式語言比例分布
+#
+# WHY a language × repository matrix: aggregating an org or topic means
+# summing thousands of small dicts. Laying the byte counts out as one int64
+# matrix turns the byte-weighted share, the per-repository mean share and the
+# primary-language counts into a few axis reductions.
+
+from typing import Any
+
+from ..async_github_client import AsyncGitHubClient
+from ..executor import gather_bounded
+from ..github_client import GitHubClientError
+
+# 單次彙總最多分析的倉庫數 (與搜尋 API 的結果上限相同)
+MAX_AGGREGATE_REPOSITORIES = 1000
+
+
+async def resolve_repositories(
+    client: AsyncGitHubClient,
+    org: str | None = None,
+    topic: str | None = None,
+    repositories: list[str] | None = None,
+    limit: int = 100,
+    include_forks: bool = False,
+) -> list[tuple[str, str]]:
+    """將組織、topic 或 owner/repo 列表展開為 (owner, repo) 列表
+
+    三者必須恰好提供一個;limit 只限制由組織或 topic 列出的倉庫數。
+    組織與 topic 會排除 fork (內容與上游重複) 與封存的倉庫,除非 include_forks 為 True。
+
+    Raises:
+        ValueError: 參數不正確
+        GitHubClientError: 列出倉庫失敗
+    """
+    if sum(1 for source in (org, topic, repositories) if source) != 1:
+        raise ValueError("org、topic、repositories 必須恰好提供一個")
+    if not 1 <= limit <= MAX_AGGREGATE_REPOSITORIES:
+        raise ValueError(f"limit 必須是 1-{MAX_AGGREGATE_REPOSITORIES} 之間的整數")
+
+    if repositories:
+        if len(repositories) > MAX_AGGREGATE_REPOSITORIES:
+            raise ValueError(f"repositories 最多 {MAX_AGGREGATE_REPOSITORIES} 個")
+        result = []
+        for name in dict.fromkeys(repositories):
+            owner, _, repo = name.partition("/") if isinstance(name, str) else ("", "", "")
+            if not owner or not repo or "/" in repo:
+                raise ValueError(f"倉庫格式必須是 owner/repo: {name}")
+            result.append((owner, repo))
+        return result
+
+    if org:
+        listed = await client.list_owner_repositories(org, limit=limit)
+    else:
+        listed = await client.search_topic_repositories(topic, limit=limit)
+    return [
+        (item["owner"], item["repo"])
+        for item in listed
+        if include_forks or not (item["fork"] or item["archived"])
+    ]
+
+
+async def collect_language_bytes(
+    client: AsyncGitHubClient,
+    repositories: list[tuple[str, str]],
+    concurrency: int,
+) -> tuple[list[str], list[dict[str, int]], list[dict[str, str]]]:
+    """並行取得每個倉庫的語言 bytes (快取未命中會合併成 GraphQL 批次查詢)
+
+    Returns:
+        tuple: (成功的倉庫名稱, 對應的語言 bytes, 失敗的倉庫與錯誤訊息)
+    """
+    results = await gather_bounded(
+        [
+            (lambda owner=owner, repo=repo: client.get_language_bytes(owner, repo))
+            for owner, repo in repositories
+        ],
+        concurrency,
+    )
+
+    names, byte_counts, errors = [], [], []
+    for (owner, repo), result in zip(repositories, results):
+        name = f"{owner}/{repo}"
+        if isinstance(result, GitHubClientError):
+            errors.append({"repository": name, "error": str(result)})
+        elif isinstance(result, Exception):
+            raise result
+        else:
+            names.append(name)
+            byte_counts.append(result)
+    return names, byte_counts, errors
+
+
+def aggregate_language_bytes(
+    byte_counts: list[dict[str, int]], top_n: int = 15
+) -> dict[str, Any]:
+    """以 bytes 加權彙總多個倉庫的語言分布
+
+    Args:
+        byte_counts: 每個倉庫的語言 → bytes (get_language_bytes 的回傳值)
+        top_n: 回傳的前 N 種語言,其餘合併為 other
+
+    Returns:
+        dict: 包含:
+            - repositories (int): 有程式碼的倉庫數
+            - total_bytes (int): 所有倉庫的 bytes 總和
+            - languages (list[dict]): 依 bytes 排序的前 N 種語言,每項包含
+              language、bytes、share (bytes 加權百分比)、
+              mean_share (各倉庫百分比的平均,每個倉庫權重相同)、
+              repositories (使用此語言的倉庫數)、primary (以此為主要語言的倉庫數)
+            - other (dict): 其餘語言的 languages (種類數)、bytes 與 share
+    """
+    # 第一次彙總時才載入 NumPy (見 commits.commit_activity)
+    import numpy as np
+
+    index: dict[str, int] = {}
+    rows, cols, values = [], [], []
+    for col, languages in enumerate(byte_counts):
+        for language, size in languages.items():
+            rows.append(index.setdefault(language, len(index)))
+            cols.append(col)
+            values.append(size)
+
+    matrix = np.zeros((len(index), len(byte_counts)), dtype=np.int64)
+    np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)),
+              np.asarray(values, dtype=np.int64))
+
+    repo_totals = matrix.sum(axis=0)
+    has_code = repo_totals > 0
+    matrix = matrix[:, has_code]
+    repo_totals = repo_totals[has_code]
+    total = int(repo_totals.sum())
+
+    if total == 0:
+        return {
+            "repositories": 0,
+            "total_bytes": 0,
+            "languages": [],
+            "other": {"languages": 0, "bytes": 0, "share": 0.0},
+        }
+
+    totals = matrix.sum(axis=1)
+    mean_share = (matrix / repo_totals).mean(axis=1) * 100
+    used_by = np.count_nonzero(matrix, axis=1)
+    primary = np.bincount(matrix.argmax(axis=0), minlength=len(index))
+
+    names = list(index)
+    order = np.argsort(-totals, kind="stable")
+    top, rest = order[:top_n], order[top_n:]
+    other_bytes = int(totals[rest].sum())
+
+    return {
+        "repositories": int(repo_totals.size),
+        "total_bytes": total,
+        "languages": [
+            {
+                "language": names[i],
+                "bytes": int(totals[i]),
+                "share": round(float(totals[i]) / total * 100, 2),
+                "mean_share": round(float(mean_share[i]), 2),
+                "repositories": int(used_by[i]),
+                "primary": int(primary[i]),
+            }
+            for i in top.tolist()
+        ],
+        "other": {
+            "languages": int(np.count_nonzero(totals[rest])),
+            "bytes": other_bytes,
+            "share": round(other_bytes / total * 100, 2),
+        },
+    }
@@ -0,0 +1,383 @@
+# 關注清單預取器
+# 在背景定期刷新設定好的倉庫 (統計、語言、貢獻者、最近 commits),
+# 讓這些倉庫的查詢在項目過期前就已經重新載入,使用者總是命中快取。
+# commit 列表的 TTL 比任何刷新間隔都短,依自己的 TTL 另外排程刷新
+#
+# WHY refresh intervals follow pushed_at: a repository pushed minutes ago will
+# change again soon, one untouched for months almost never does. Refreshing
+# every repository at the same rate either wastes budget on dormant ones or
+# lets busy ones go stale. Most refreshes of quiet repositories are answered
+# with 304, which GitHub does not count against the rate limit.
+#
+# 可在 FastAPI lifespan 內執行 (設定 WATCHLIST 即啟用),也可以獨立執行:
+#     python -m src.watchlist
+# 獨立執行時需搭配 REDIS_URL 或 GITHUB_DISK_CACHE,預取結果才會被其他程序讀到。
+
+import asyncio
+import logging
+import os
+import re
+import sys
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from .async_github_client import AsyncGitHubClient, refreshing
+from .executor import gather_bounded
+from .github_client import (
+    GitHubClientError,
+    RateLimitError,
+    RepositoryNotFoundError,
+    StatisticsPendingError,
+)
+from .ratelimit import Priority, set_priority
+from .shared_cache import SharedCache
+
+DEFAULT_MIN_INTERVAL = 60.0
+DEFAULT_MAX_INTERVAL = 3600.0
+# 刷新間隔 = 距離上次 push 的時間 × 此比例 (再限制在上下限之間)
+ACTIVITY_FACTOR = 0.1
+# TTL 長於刷新間隔的項目至少撐過此倍數的間隔,偶爾延遲一輪也不會過期
+TTL_MARGIN = 2.0
+# commit 列表在 TTL 的此比例時刷新,趕在過期之前
+COMMITS_REFRESH_FACTOR = 0.75
+DEFAULT_BUDGET_SHARE = 0.2
+DEFAULT_CONCURRENCY = 16
+# 每輪最多刷新的倉庫數 = 並行上限 × 此倍數;每輪結束都會重新檢查額度
+ROUND_FACTOR = 4
+# 沒有到期的倉庫時最長的休眠秒數 (關閉時不必等太久)
+MAX_SLEEP = 30.0
+BUDGET_WINDOW = 3600.0
+# 尚未看過任何回應時,假設每個 token 每小時 5000 次
+DEFAULT_HOURLY_LIMIT = 5000
+# 與 API 與 MCP 工具的預設參數相同,預取的項目才會是使用者查詢的那些快取鍵
+CONTRIBUTORS_TOP_N = 10
+COMMITS_LIMIT = 10
+
+_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WatchedRepository:
+    """關注清單中的倉庫與其刷新排程
+
+    Attributes:
+        owner: 擁有者
+        repo: 倉庫名稱
+        interval: 目前的刷新間隔 (秒)
+        next_due: 下次刷新的時間 (monotonic 秒)
+        commits_due: 下次刷新 commit 列表的時間 (monotonic 秒)
+        pushed_at: 上次刷新時看到的最後 push 時間
+        failures: 連續失敗次數
+    """
+
+    owner: str
+    repo: str
+    interval: float = DEFAULT_MIN_INTERVAL
+    next_due: float = 0.0
+    commits_due: float = 0.0
+    pushed_at: str | None = None
+    failures: int = 0
+
+    @property
+    def due(self) -> float:
+        """下一次有項目需要刷新的時間 (monotonic 秒)"""
+        return min(self.next_due, self.commits_due)
+
+
+def read_watchlist(text: str) -> list[WatchedRepository]:
+    """解析關注清單
+
+    以逗號、空白或換行分隔的 owner/repo;# 之後為註解。重複的倉庫只保留一個。
+
+    Raises:
+        ValueError: 項目不是 owner/repo 格式
+    """
+    repositories: dict[tuple[str, str], WatchedRepository] = {}
+    for line in text.splitlines():
+        for item in re.split(r"[,\s]+", line.split("#", 1)[0]):
+            if not item:
+                continue
+            owner, _, repo = item.partition("/")
+            if not _NAME.match(owner) or not _NAME.match(repo):
+                raise ValueError(f"Invalid watchlist entry: {item!r} (expected owner/repo)")
+            repositories.setdefault((owner.lower(), repo.lower()), WatchedRepository(owner, repo))
+    return list(repositories.values())
+
+
+def _spent(before: dict[str, dict], after: dict[str, dict]) -> int:
+    """兩次 rate_limit_stats() 之間消耗的額度 (所有 token 與資源合計)
+
+    以 remaining 的減少量計算,因此也包含同一期間其他請求的消耗 (保守的估計)。
+    第一次看到某資源時無從比較,改以 token 在這段期間送出的請求數計算。
+    """
+    spent = 0
+    for label, token in after.items():
+        previous = before.get(label, {})
+        previous_budgets = previous.get("budgets", {})
+        unknown = False
+        for resource, budget in token["budgets"].items():
+            old = previous_budgets.get(resource)
+            if budget["remaining"] is None:
+                continue
+            if old is None or old["remaining"] is None:
+                unknown = True
+            elif old["reset_at"] != budget["reset_at"]:
+                # 額度已重置:只計算重置後用掉的部分
+                spent += max(0, (budget["limit"] or 0) - budget["remaining"])
+            else:
+                spent += max(0, old["remaining"] - budget["remaining"])
+        if unknown:
+            spent += token["requests"] - previous.get("requests", 0)
+    return spent
+
+
+def _hourly_limit(stats: dict[str, dict]) -> int:
+    """所有 token 的 core 每小時額度合計"""
+    return sum(
+        (token["budgets"].get("core") or {}).get("limit") or DEFAULT_HOURLY_LIMIT
+        for token in stats.values()
+    )
+
+
+def _since_push(pushed_at: str) -> float | None:
+    try:
+        pushed = datetime.fromisoformat(pushed_at.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    return max(0.0, time.time() - pushed.timestamp())
+
+
+class WatchlistRefresher:
+    """在背景刷新關注清單中倉庫的快取項目
+
+    Attributes:
+        repositories: 關注的倉庫與其排程
+        budget_share: 可用於預取的每小時額度比例
+        commits_interval: commit 列表的刷新間隔 (秒);快取停用時為 None
+        refreshes: 完成的刷新次數
+        failures: 失敗的刷新次數
+    """
+
+    def __init__(
+        self,
+        client: AsyncGitHubClient,
+        repositories: list[WatchedRepository],
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        budget_share: float = DEFAULT_BUDGET_SHARE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        self.client = client
+        self.repositories = repositories
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.budget_share = budget_share
+        self.concurrency = concurrency
+        commits_ttl = client.ttl("get_commit_page")
+        self.commits_interval = commits_ttl * COMMITS_REFRESH_FACTOR if commits_ttl > 0 else None
+        self.refreshes = 0
+        self.failures = 0
+        # (monotonic 時間, 消耗的額度);只保留 BUDGET_WINDOW 內的紀錄
+        self._spending: deque[tuple[float, int]] = deque()
+        self._task: asyncio.Task | None = None
+        for watched in repositories:
+            watched.interval = min_interval
+
+    @classmethod
+    def from_env(
+        cls, get_client: Callable[[], AsyncGitHubClient]
+    ) -> "WatchlistRefresher | None":
+        """依環境變數建立預取器
+
+        WATCHLIST: 以逗號分隔的 owner/repo
+        WATCHLIST_FILE: 關注清單檔案 (每行一個 owner/repo,# 為註解),與 WATCHLIST 合併
+        WATCHLIST_MIN_INTERVAL / WATCHLIST_MAX_INTERVAL: 刷新間隔上下限秒數,預設 60 / 3600
+        WATCHLIST_BUDGET_SHARE: 可用於預取的每小時額度比例,預設 0.2
+        WATCHLIST_CONCURRENCY: 同時刷新的倉庫數,預設 16
+
+        兩者都未設定時回傳 None,也不會呼叫 get_client。
+
+        Raises:
+            ValueError: 關注清單格式錯誤
+        """
+        text = os.environ.get("WATCHLIST", "")
+        path = os.environ.get("WATCHLIST_FILE")
+        if path:
+            with open(path) as f:
+                text += "\n" + f.read()
+        repositories = read_watchlist(text)
+        if not repositories:
+            return None
+        return cls(
+            get_client(),
+            repositories,
+            min_interval=float(os.environ.get("WATCHLIST_MIN_INTERVAL", DEFAULT_MIN_INTERVAL)),
+            max_interval=float(os.environ.get("WATCHLIST_MAX_INTERVAL", DEFAULT_MAX_INTERVAL)),
+            budget_share=float(os.environ.get("WATCHLIST_BUDGET_SHARE", DEFAULT_BUDGET_SHARE)),
+            concurrency=int(os.environ.get("WATCHLIST_CONCURRENCY", DEFAULT_CONCURRENCY)),
+        )
+
+    def start(self) -> None:
+        """在背景 task 中開始刷新"""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def aclose(self) -> None:
+        """停止背景刷新"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        """持續刷新到期的倉庫,直到被取消"""
+        # 預取一律讓位給使用者的請求,並保留給前景的額度 (見 RateLimitScheduler)
+        set_priority(Priority.BACKGROUND)
+        while True:
+            now = time.monotonic()
+            due = sorted((w for w in self.repositories if w.due <= now), key=lambda w: w.due)
+            if due and self._within_budget():
+                before = self.client.rate_limit_stats()
+                batch = due[: self.concurrency * ROUND_FACTOR]
+                await gather_bounded(
+                    [lambda w=w: self.refresh(w) for w in batch], self.concurrency
+                )
+                self._record(_spent(before, self.client.rate_limit_stats()))
+                continue
+            # 沒有到期的倉庫,或本小時的預取額度已用完:等到下一個倉庫到期
+            wait = min((w.due for w in self.repositories), default=now + MAX_SLEEP) - now
+            await asyncio.sleep(min(MAX_SLEEP, max(1.0, wait)))
+
+    async def refresh(self, watched: WatchedRepository) -> None:
+        """刷新一個倉庫到期的項目
+
+        完整刷新依最後 push 時間排程;commit 列表依自己的 TTL 排程。
+        完整刷新失敗時,commit 列表跟著退避到下一次完整刷新。
+        """
+        if watched.next_due <= time.monotonic() and not await self._refresh_repository(watched):
+            watched.commits_due = watched.next_due
+            return
+        if self.commits_interval is not None and watched.commits_due <= time.monotonic():
+            await self._refresh_commits(watched)
+
+    async def _refresh_repository(self, watched: WatchedRepository) -> bool:
+        """刷新統計、語言與貢獻者,並依最後 push 時間調整下次刷新的間隔
+
+        Returns:
+            bool: 是否成功
+        """
+        owner, repo = watched.owner, watched.repo
+        client = self.client
+        try:
+            with refreshing(watched.interval, watched.interval * TTL_MARGIN):
+                results = await asyncio.gather(
+                    client.get_pushed_at(owner, repo),
+                    client.get_repo_statistics(owner, repo),
+                    client.get_language_bytes(owner, repo),
+                    client.get_contributors_stats(owner, repo, top_n=CONTRIBUTORS_TOP_N),
+                    return_exceptions=True,
+                )
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+            pushed_at = results[0]
+            # WHY outside refreshing(): line stats are keyed by pushed_at, so
+            # without a new push the cached entry is still exact. A plain read
+            # only calls /stats/contributors (slow, often 202) after a push or
+            # once the entry has expired.
+            try:
+                await client.get_contributor_activity(owner, repo)
+            except StatisticsPendingError:
+                # GitHub 仍在計算;下一次完整刷新時再取得
+                pass
+        except RateLimitError as e:
+            self.failures += 1
+            watched.next_due = time.monotonic() + max(self.min_interval, e.retry_after or 0)
+            return False
+        except RepositoryNotFoundError:
+            # 倉庫被刪除或改名;負面快取已經記下,很久之後再確認一次即可
+            self.failures += 1
+            watched.interval = self.max_interval
+            watched.next_due = time.monotonic() + self.max_interval
+            return False
+        except GitHubClientError:
+            self._back_off(watched)
+            return False
+        except Exception:
+            # 非預期的錯誤 (程式錯誤、回應格式改變) 不停止其他倉庫的預取,但必須留下紀錄
+            logger.exception("Watchlist refresh of %s/%s failed", owner, repo)
+            self._back_off(watched)
+            return False
+
+        self.refreshes += 1
+        watched.failures = 0
+        watched.pushed_at = pushed_at
+        since = _since_push(pushed_at)
+        interval = self.max_interval if since is None else since * ACTIVITY_FACTOR
+        watched.interval = min(self.max_interval, max(self.min_interval, interval))
+        watched.next_due = time.monotonic() + watched.interval
+        return True
+
+    async def _refresh_commits(self, watched: WatchedRepository) -> None:
+        """在 commit 列表過期前重新載入 (沒有新 commit 時 GitHub 回應 304)"""
+        owner, repo = watched.owner, watched.repo
+        retry_after = 0
+        try:
+            with refreshing(self.commits_interval):
+                await self.client.get_commit_page(owner, repo, limit=COMMITS_LIMIT)
+        except GitHubClientError as e:
+            self.failures += 1
+            if isinstance(e, RateLimitError):
+                retry_after = e.retry_after or 0
+        except Exception:
+            logger.exception("Watchlist refresh of %s/%s commits failed", owner, repo)
+            self.failures += 1
+        watched.commits_due = time.monotonic() + max(self.commits_interval, retry_after)
+
+    def _back_off(self, watched: WatchedRepository) -> None:
+        """失敗後以指數退避延後下次刷新"""
+        self.failures += 1
+        watched.failures += 1
+        backoff = self.min_interval * 2 ** min(watched.failures, 10)
+        watched.next_due = time.monotonic() + min(self.max_interval, backoff)
+
+    def _record(self, spent: int) -> None:
+        self._spending.append((time.monotonic(), spent))
+
+    def _within_budget(self) -> bool:
+        """過去一小時預取消耗的額度是否仍低於分配的比例"""
+        cutoff = time.monotonic() - BUDGET_WINDOW
+        while self._spending and self._spending[0][0] < cutoff:
+            self._spending.popleft()
+        used = sum(spent for _, spent in self._spending)
+        return used < self.budget_share * _hourly_limit(self.client.rate_limit_stats())
+
+
+async def main() -> None:
+    """獨立執行預取器 (python -m src.watchlist)"""
+    shared_cache = SharedCache.from_env()
+    if shared_cache is None:
+        logger.warning(
+            "Neither REDIS_URL nor GITHUB_DISK_CACHE is set; "
+            "prefetched entries stay in this process"
+        )
+    client = AsyncGitHubClient(token=os.environ.get("GITHUB_TOKEN"), shared_cache=shared_cache)
+    try:
+        refresher = WatchlistRefresher.from_env(lambda: client)
+        if refresher is None:
+            sys.exit("WATCHLIST or WATCHLIST_FILE must be set")
+        await refresher.run()
+    finally:
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+# 測試共用設定
+# 清除會影響客戶端行為的環境變數,並提供以 httpx.MockTransport 取代 GitHub 的客戶端
+
+import httpx
+import pytest
+
+from src.async_github_client import AsyncGitHubClient
+
+_ENVIRONMENT = (
+    "GITHUB_TOKEN",
+    "GITHUB_TOKENS",
+    "GITHUB_TOKENS_FILE",
+    "GITHUB_API_URL",
+    "GITHUB_GRAPHQL_URL",
+    "GITHUB_GRAPHQL_BATCH",
+    "GITHUB_CACHE_TTLS",
+    "GITHUB_CACHE_MAX_BYTES",
+    "GITHUB_CACHE_STALE_WINDOW",
+    "GITHUB_COMMIT_STORE",
+    "GITHUB_STATS_WAIT",
+    "REDIS_URL",
+    "GITHUB_DISK_CACHE",
+    "WATCHLIST",
+    "WATCHLIST_FILE",
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_environment(monkeypatch):
+    for name in _ENVIRONMENT:
+        monkeypatch.delenv(name, raising=False)
+
+
+def make_client(handler, **kwargs) -> AsyncGitHubClient:
+    """建立送往 handler 而非 GitHub 的客戶端
+
+    Args:
+        handler: 接收 httpx.Request、回傳 httpx.Response 的函式
+        **kwargs: 其他 AsyncGitHubClient 參數
+    """
+    kwargs.setdefault("token", "test-token")
+    return AsyncGitHubClient(transport=httpx.MockTransport(handler), **kwargs)
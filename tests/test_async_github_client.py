@@ -0,0 +1,186 @@
+# 非同步 GitHub 客戶端測試
+# HTTP 狀態碼與網路錯誤轉換為領域例外,以及貢獻者行數統計的合併與 202 (計算中) 回應
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.async_github_client import _compact_activity
+from src.cache import current_freshness
+from src.github_client import (
+    AuthenticationError,
+    GitHubClientError,
+    RateLimitError,
+    RepositoryNotFoundError,
+)
+from tests.conftest import make_client
+
+
+def _fetch_pushed_at(handler):
+    async def scenario():
+        async with make_client(handler) as client:
+            return await client.get_pushed_at("octo", "repo")
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("response, error, message", [
+    (httpx.Response(401, json={"message": "Bad credentials"}), AuthenticationError, "token"),
+    (httpx.Response(403, json={"message": "Resource not accessible"}),
+     AuthenticationError, "octo/repo"),
+    (httpx.Response(403, json={"message": "API rate limit exceeded for user"}),
+     RateLimitError, "rate limit"),
+    (httpx.Response(404, json={"message": "Not Found"}), RepositoryNotFoundError, "octo/repo"),
+    (httpx.Response(422, json={"message": "Validation Failed"}),
+     GitHubClientError, "Validation Failed"),
+    (httpx.Response(502, text="Bad Gateway"), GitHubClientError, "Bad Gateway"),
+])
+def test_status_codes_map_to_domain_errors(response, error, message):
+    with pytest.raises(error, match=message) as excinfo:
+        _fetch_pushed_at(lambda request: response)
+
+    if error is GitHubClientError:
+        assert type(excinfo.value) is GitHubClientError
+
+
+def test_rate_limit_carries_the_reset_time():
+    reset = int(time.time()) + 120
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            403,
+            json={"message": "forbidden"},
+            headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)},
+        )
+
+    with pytest.raises(RateLimitError) as excinfo:
+        _fetch_pushed_at(handler)
+
+    assert excinfo.value.reset_at == reset
+
+
+def test_secondary_rate_limit_uses_retry_after():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429, headers={"Retry-After": "30"})
+
+    started = time.time()
+    with pytest.raises(RateLimitError) as excinfo:
+        _fetch_pushed_at(handler)
+
+    assert excinfo.value.reset_at == pytest.approx(started + 30, abs=5)
+
+
+def test_network_errors_become_client_errors():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    with pytest.raises(GitHubClientError, match="request failed") as excinfo:
+        _fetch_pushed_at(handler)
+
+    assert isinstance(excinfo.value.__cause__, httpx.ConnectError)
+
+
+def _week(w, a=0, d=0, c=0):
+    return {"w": w, "a": a, "d": d, "c": c}
+
+
+def _author(login, total, weeks):
+    return {
+        "author": {
+            "login": login,
+            "avatar_url": f"https://avatars/{login}",
+            "html_url": f"https://github.com/{login}",
+        },
+        "total": total,
+        "weeks": weeks,
+    }
+
+
+def _contributor(login, contributions):
+    return {
+        "login": login,
+        "contributions": contributions,
+        "avatar_url": f"https://avatars/{login}",
+        "html_url": f"https://github.com/{login}",
+    }
+
+
+class _Stats:
+    """回傳倉庫、貢獻者與 /stats/contributors 的假 GitHub;stats 為 None 時回應 202"""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.stats_requests = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/stats/contributors"):
+            self.stats_requests += 1
+            if self.stats is None:
+                return httpx.Response(202, json={})
+            return httpx.Response(200, json=self.stats)
+        if path.endswith("/contributors"):
+            return httpx.Response(200, json=[
+                _contributor("alice", 30), _contributor("bob", 12), _contributor("carol", 3),
+            ])
+        return httpx.Response(200, json={"pushed_at": "2024-03-01T00:00:00Z"})
+
+
+def test_compact_activity_drops_leading_empty_weeks():
+    stats = [
+        _author("bob", 1, [_week(0), _week(604800), _week(1209600, a=5, d=1, c=1)]),
+        _author("alice", 3, [_week(0), _week(604800, a=10, d=2, c=2), _week(1209600, c=1)]),
+        {"author": None, "total": 0, "weeks": [_week(0), _week(604800), _week(1209600)]},
+    ]
+
+    activity = _compact_activity(stats)
+
+    assert activity["week_start"] == 604800
+    assert activity["weeks"] == 2
+    assert [a["login"] for a in activity["authors"]] == ["alice", "bob", "ghost"]
+    assert activity["authors"][0]["weekly_additions"] == [10, 0]
+    assert activity["authors"][0]["weekly_commits"] == [2, 1]
+    assert activity["authors"][1]["weekly_deletions"] == [0, 1]
+    assert _compact_activity([]) == {"week_start": 0, "weeks": 0, "authors": []}
+
+
+def test_line_stats_merge_activity_into_contributors():
+    handler = _Stats([
+        _author("alice", 20, [_week(0, a=100, d=10, c=12), _week(604800, a=50, d=5, c=8)]),
+        _author("bob", 10, [_week(0, a=7, d=3, c=10), _week(604800)]),
+    ])
+
+    async def scenario():
+        async with make_client(handler) as client:
+            result = await client.get_contributor_line_stats("octo", "repo", top_n=3)
+            return result, current_freshness()
+
+    result, freshness = asyncio.run(scenario())
+    lines = {c["login"]: (c["contributions"], c["additions"], c["deletions"])
+             for c in result["contributors"]}
+
+    assert result["line_stats_pending"] is False
+    assert lines["alice"] == (30, 150, 15)
+    assert lines["bob"] == (12, 7, 3)
+    # 不在 /stats/contributors 中的貢獻者沒有行數,而不是 0
+    assert lines["carol"] == (3, None, None)
+    # 新鮮度留在呼叫者的 context 中
+    assert freshness is not None
+
+
+def test_line_stats_report_pending_statistics(monkeypatch):
+    monkeypatch.setenv("GITHUB_STATS_WAIT", "0")
+    handler = _Stats(None)
+
+    async def scenario():
+        async with make_client(handler) as client:
+            return await client.get_contributor_line_stats("octo", "repo", top_n=3)
+
+    result = asyncio.run(scenario())
+
+    assert result["line_stats_pending"] is True
+    assert [c["login"] for c in result["contributors"]] == ["alice", "bob", "carol"]
+    assert all(c["additions"] is None for c in result["contributors"])
+    assert handler.stats_requests == 1
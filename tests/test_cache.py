@@ -0,0 +1,101 @@
+# 回應快取測試
+# TTL 過期、以估計大小為上限的 LRU 淘汰與負面快取
+
+import time
+
+import pytest
+
+from src.cache import CacheEntry, TTLCache, load_ttls
+from src.github_client import RepositoryNotFoundError
+
+
+def _entry(value, ttl=60.0, **kwargs) -> CacheEntry:
+    return CacheEntry.for_value(value, ttl, **kwargs)
+
+
+def test_hit_and_miss_are_counted():
+    cache = TTLCache()
+    cache.set("a", {"stars": 1}, ttl=60)
+
+    assert cache.get("a").unwrap() == {"stars": 1}
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_expired_entry_is_a_miss_and_removed():
+    cache = TTLCache()
+    cache.put("a", CacheEntry(value=1, error=None, expires_at=time.time() - 1, size=1))
+
+    assert cache.get("a") is None
+    assert cache.get_stale("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_size_is_estimated_from_json():
+    entry = _entry({"name": "x" * 100})
+
+    assert entry.size == len('{"name": "' + "x" * 100 + '"}')
+
+
+def test_evicts_least_recently_used_when_over_max_bytes():
+    value = "x" * 100
+    size = _entry(value).size
+    cache = TTLCache(max_bytes=size * 2)
+    cache.put("a", _entry(value))
+    cache.put("b", _entry(value))
+    # 讀取 a 讓 b 成為最久未使用的項目
+    cache.get("a")
+    cache.put("c", _entry(value))
+
+    assert cache.get_stale("b") is None
+    assert cache.get_stale("a") is not None
+    assert cache.get_stale("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == size * 2
+
+
+def test_replacing_a_key_does_not_double_count_bytes():
+    cache = TTLCache()
+    cache.put("a", _entry("x" * 10))
+    cache.put("a", _entry("y" * 20))
+
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] == _entry("y" * 20).size
+
+
+def test_entry_larger_than_cache_is_not_stored():
+    cache = TTLCache(max_bytes=10)
+    cache.put("small", _entry(1))
+    cache.put("huge", _entry("x" * 100))
+
+    assert cache.get_stale("huge") is None
+    assert cache.get_stale("small") is not None
+    assert cache.stats()["evictions"] == 0
+
+
+def test_negative_entry_reraises_the_cached_error():
+    cache = TTLCache()
+    cache.set_error("a", RepositoryNotFoundError("Repository 'o/r' not found"), ttl=30)
+
+    entry = cache.get("a")
+    with pytest.raises(RepositoryNotFoundError, match="o/r"):
+        entry.unwrap()
+    assert not entry.revalidatable
+
+
+def test_negative_entry_expires():
+    cache = TTLCache()
+    cache.put("a", CacheEntry.for_error(RepositoryNotFoundError("gone"), ttl=-1))
+
+    assert cache.get("a") is None
+
+
+def test_load_ttls_overrides_from_env(monkeypatch):
+    monkeypatch.setenv("GITHUB_CACHE_TTLS", "get_recent_commits=5, get_language_bytes=10")
+
+    ttls = load_ttls()
+
+    assert ttls["get_recent_commits"] == 5
+    assert ttls["get_language_bytes"] == 10
+    assert ttls["get_repo_statistics"] == 300
@@ -0,0 +1,98 @@
+# commit 活動分析測試
+# 以固定時間戳驗證每日/每週分組、滾動平均、星期分布、28 天窗口與每週平均
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src.tools.commits import WEEKDAYS, commit_activity
+
+
+def _ts(value: str) -> int:
+    return int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp())
+
+
+# 2024-01-01 是星期一
+NOW = _ts("2024-01-31T12:00:00")
+TIMELINE = {
+    "timestamps": [
+        _ts("2024-01-01T10:00:00"),
+        _ts("2024-01-01T15:00:00"),
+        _ts("2024-01-03T08:00:00"),
+        _ts("2024-01-29T23:59:59"),
+        _ts("2024-01-31T09:00:00"),
+    ],
+    "since": None,
+}
+
+
+def test_totals_and_recency():
+    activity = commit_activity(TIMELINE, now=NOW)
+
+    assert activity["total_commits"] == 5
+    assert activity["first_commit"] == "2024-01-01T10:00:00+00:00"
+    assert activity["last_commit"] == "2024-01-31T09:00:00+00:00"
+    assert activity["days_since_last_commit"] == pytest.approx(0.1)
+    assert activity["active_days"] == 4
+
+
+def test_daily_counts_and_rolling_average():
+    activity = commit_activity(TIMELINE, now=NOW)
+
+    daily = activity["daily"]
+    assert daily["start"] == "2024-01-01"
+    assert len(daily["counts"]) == 31
+    assert daily["counts"][:3] == [2, 0, 1]
+    assert daily["counts"][-3:] == [1, 0, 1]
+    rolling = activity["rolling_average"]
+    assert len(rolling) == 31
+    # 1/1 只有當天;1/7 涵蓋 1/1-1/7;1/8 起 1/1 移出窗口
+    assert rolling[0] == pytest.approx(round(2 / 7, 2))
+    assert rolling[6] == pytest.approx(round(3 / 7, 2))
+    assert rolling[7] == pytest.approx(round(1 / 7, 2))
+
+
+def test_weekly_bins_start_on_monday():
+    activity = commit_activity(TIMELINE, now=NOW)
+
+    assert activity["weekly"] == {"start": "2024-01-01", "counts": [3, 0, 0, 0, 2]}
+    assert activity["average_per_week"] == 1.0
+    assert activity["weekday"] == {**dict.fromkeys(WEEKDAYS, 0), "Mon": 3, "Wed": 2}
+
+
+def test_28_day_windows():
+    activity = commit_activity(TIMELINE, now=NOW)
+
+    # 最近 28 天為 1/4-1/31,前 28 天中只有 1/1-1/3 在歷史範圍內
+    assert activity["last_28_days"] == 2
+    assert activity["previous_28_days"] == 3
+
+
+def test_since_extends_the_series_and_the_weekly_average():
+    timeline = {**TIMELINE, "since": _ts("2023-12-25T00:00:00")}
+
+    activity = commit_activity(timeline, now=NOW)
+
+    assert activity["daily"]["start"] == "2023-12-25"
+    assert len(activity["daily"]["counts"]) == 38
+    assert activity["weekly"] == {"start": "2023-12-25", "counts": [0, 3, 0, 0, 0, 2]}
+    assert activity["average_per_week"] == round(5 / 6, 2)
+
+
+def test_series_are_truncated_to_the_most_recent_points():
+    timeline = {"timestamps": [_ts("2022-01-03T00:00:00"), NOW], "since": None}
+
+    activity = commit_activity(timeline, now=NOW)
+
+    assert len(activity["daily"]["counts"]) == 90
+    assert activity["daily"]["start"] == "2023-11-03"
+    assert len(activity["weekly"]["counts"]) == 52
+    assert activity["weekly"]["counts"][-1] == 1
+
+
+def test_empty_timeline():
+    activity = commit_activity({"timestamps": [], "since": None}, now=NOW)
+
+    assert activity["total_commits"] == 0
+    assert activity["daily"] == {"start": "2024-01-31", "counts": []}
+    assert activity["last_28_days"] == 0
@@ -0,0 +1,222 @@
+# commit 分頁 cursor 測試
+# cursor 編碼/解碼、拒絕被竄改的 cursor、第一頁後固定 HEAD、回報 cursor 的分支與每頁數量,
+# 以及完整歷史的逐頁產生與 NDJSON 匯出
+
+import asyncio
+import base64
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_github_client
+from api.main import app
+from src import server
+from src.async_github_client import _CommitCursor
+from src.ratelimit import Priority, current_priority
+from tests.conftest import make_client
+
+
+def _commit(sha: str) -> dict:
+    return {
+        "sha": sha,
+        "html_url": f"https://github.com/octo/repo/commit/{sha}",
+        "commit": {
+            "message": f"commit {sha}",
+            "author": {"name": "Octo", "date": "2024-01-01T00:00:00Z"},
+        },
+        "author": {"login": "octo"},
+    }
+
+
+def _raw_cursor(**fields) -> str:
+    return base64.urlsafe_b64encode(json.dumps(fields).encode()).decode().rstrip("=")
+
+
+class _History:
+    """依 sha / page / per_page 回傳 commits 的假 GitHub"""
+
+    def __init__(self, shas: list[str]):
+        self.shas = shas
+        self.requests: list[dict] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        self.requests.append(params)
+        per_page = int(params.get("per_page", 30))
+        page = int(params.get("page", 1))
+        shas = self.shas
+        if params.get("sha") in shas:
+            shas = shas[shas.index(params["sha"]):]
+        chunk = shas[(page - 1) * per_page:page * per_page]
+        return httpx.Response(200, json=[_commit(sha) for sha in chunk])
+
+
+def test_cursor_round_trip():
+    position = _CommitCursor(
+        sha="abc", page=3, per_page=20, since="2024-01-01T00:00:00+00:00",
+        path="src/", pinned=True, branch="main",
+    )
+
+    encoded = position.encode()
+
+    assert "=" not in encoded
+    assert _CommitCursor.decode(encoded) == position
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    _raw_cursor(sha=None, page=0, per_page=10),
+    _raw_cursor(sha=None, page=1, per_page=1000),
+    _raw_cursor(sha=None, page=1, per_page=10, admin=True),
+    _raw_cursor(page=1),
+])
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _CommitCursor.decode(cursor)
+
+
+def test_next_pages_are_pinned_to_the_first_page_head():
+    history = _History(["c5", "c4", "c3", "c2", "c1"])
+
+    async def scenario():
+        async with make_client(history) as client:
+            first = await client.get_commit_page("octo", "repo", limit=2, branch="main")
+            # 新的 push 不應讓後續分頁位移
+            history.shas = ["c6", *history.shas]
+            second = await client.get_commit_page("octo", "repo", cursor=first["next_cursor"])
+            return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert [c["sha"] for c in first["commits"]] == ["c5", "c4"]
+    assert [c["sha"] for c in second["commits"]] == ["c3", "c2"]
+    position = _CommitCursor.decode(first["next_cursor"])
+    assert (position.sha, position.pinned, position.branch) == ("c5", True, "main")
+    assert history.requests[1]["sha"] == "c5"
+
+
+def test_filtered_first_page_looks_up_the_branch_head():
+    history = _History(["c3", "c2", "c1"])
+
+    async def scenario():
+        async with make_client(history) as client:
+            return await client.get_commit_page("octo", "repo", limit=1, path="README.md")
+
+    page = asyncio.run(scenario())
+
+    assert _CommitCursor.decode(page["next_cursor"]).sha == "c3"
+    assert history.requests[1] == {"per_page": "1"}
+
+
+def test_partial_page_has_no_next_cursor():
+    async def scenario():
+        async with make_client(_History(["c1"])) as client:
+            return await client.get_commit_page("octo", "repo", limit=5)
+
+    assert asyncio.run(scenario())["next_cursor"] is None
+
+
+def test_cursor_page_reports_the_cursor_branch_and_limit(monkeypatch):
+    history = _History([f"c{i}" for i in range(10, 0, -1)])
+
+    async def scenario():
+        async with make_client(history) as client:
+            monkeypatch.setattr(server, "github_client", client)
+            first = await server.handle_list_recent_commits(
+                {"owner": "octo", "repo": "repo", "limit": 3, "branch": "dev"}
+            )
+            return await server.handle_list_recent_commits({
+                "owner": "octo", "repo": "repo", "limit": 50,
+                "cursor": first["next_cursor"],
+            })
+
+    second = asyncio.run(scenario())
+
+    assert second["branch"] == "dev"
+    assert second["limit"] == 3
+    assert len(second["commits"]) == 3
+
+
+def test_api_cursor_page_reports_the_cursor_branch_and_limit():
+    client = make_client(_History([f"c{i}" for i in range(10, 0, -1)]))
+    app.dependency_overrides[get_github_client] = lambda: client
+    try:
+        http = TestClient(app)
+        url = "/api/v1/repo/octo/repo/commits"
+        first = http.get(url, params={"limit": 3, "branch": "dev"}).json()
+        second = http.get(url, params={"limit": 50, "cursor": first["next_cursor"]}).json()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert second["branch"] == "dev"
+    assert second["limit"] == 3
+    assert len(second["commits"]) == 3
+
+
+def test_iterating_pages_does_not_change_the_callers_priority():
+    history = _History([f"c{i}" for i in range(150, 0, -1)])
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(current_priority())
+        return history(request)
+
+    async def scenario():
+        async with make_client(handler) as client:
+            pages = [page async for page in client.iter_commit_pages("octo", "repo")]
+            return pages, current_priority()
+
+    pages, after = asyncio.run(scenario())
+
+    assert [len(page) for page in pages] == [100, 50]
+    assert seen == [Priority.BACKGROUND] * 2
+    assert after == Priority.INTERACTIVE
+
+
+def _export(handler, **params):
+    client = make_client(handler)
+    app.dependency_overrides[get_github_client] = lambda: client
+    try:
+        return TestClient(app).get("/api/v1/repo/octo/repo/commits/export", params=params)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_export_streams_every_page_as_ndjson():
+    response = _export(_History([f"c{i}" for i in range(150, 0, -1)]))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [commit["sha"] for commit in lines] == [f"c{i}" for i in range(150, 0, -1)]
+
+
+def test_export_resumes_after_a_commit():
+    response = _export(_History([f"c{i}" for i in range(5, 0, -1)]), after="c4")
+
+    assert [json.loads(line)["sha"] for line in response.text.splitlines()] == ["c3", "c2", "c1"]
+
+
+def test_export_reports_a_missing_repository_with_404():
+    response = _export(lambda request: httpx.Response(404, json={"message": "Not Found"}))
+
+    assert response.status_code == 404
+    assert "octo/repo" in response.json()["detail"]
+
+
+def test_export_ends_with_a_resumable_error_line():
+    history = _History([f"c{i}" for i in range(150, 0, -1)])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params.get("page") == "2":
+            return httpx.Response(429, headers={"Retry-After": "60"})
+        return history(request)
+
+    lines = [json.loads(line) for line in _export(handler).text.splitlines()]
+
+    assert len(lines) == 101
+    assert lines[-1]["resume_after"] == "c51"
+    assert lines[-1]["retry_after_seconds"] > 0
@@ -0,0 +1,226 @@
+# 本機 commit 儲存測試
+# replace / advance (fast-forward 與 force push) / extend / timeline,
+# 以及以條件式請求與 compare API 進行的增量同步
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.commit_store import CommitStore
+from tests.conftest import make_client
+
+REPO = "octo/repo"
+
+
+def _commit(sha: str, day: int = 1, login: str = "octo", author: str = "Octo") -> dict:
+    return {
+        "sha": sha,
+        "message": f"commit {sha}",
+        "author": author,
+        "author_login": login,
+        "date": f"2024-01-{day:02d}T00:00:00+00:00",
+        "url": f"https://github.com/{REPO}/commit/{sha}",
+    }
+
+
+def _shas(store: CommitStore, branch: str = "") -> list[str]:
+    return [commit["sha"] for commit in store.recent(REPO, branch)]
+
+
+@pytest.fixture
+def store():
+    store = CommitStore(":memory:")
+    yield store
+    store.close()
+
+
+def test_replace_stores_commits_newest_first(store):
+    store.replace(REPO, "", [_commit("c3", 3), _commit("c2", 2), _commit("c1", 1)], '"e1"', True)
+
+    state = store.state(REPO, "")
+    assert _shas(store) == ["c3", "c2", "c1"]
+    assert (state.head_sha, state.etag, state.complete) == ("c3", '"e1"', True)
+    assert store.contains(REPO, "", "c2")
+    assert store.state(REPO, "dev") is None
+
+
+def test_replace_discards_the_previous_branch_history(store):
+    store.replace(REPO, "", [_commit("old2"), _commit("old1")], None, False)
+    store.replace(REPO, "", [_commit("new1")], None, False)
+
+    assert _shas(store) == ["new1"]
+    assert not store.contains(REPO, "", "old1")
+
+
+def test_advance_fast_forward_keeps_history(store):
+    store.replace(REPO, "", [_commit("c2"), _commit("c1")], '"e1"', True)
+
+    store.advance(REPO, "", "c2", [_commit("c3"), _commit("c4")], "c4", '"e2"')
+
+    assert _shas(store) == ["c4", "c3", "c2", "c1"]
+    assert store.state(REPO, "").head_sha == "c4"
+    assert store.state(REPO, "").etag == '"e2"'
+
+
+def test_advance_after_force_push_rewinds_to_the_merge_base(store):
+    store.replace(REPO, "", [_commit("c3"), _commit("c2"), _commit("c1")], None, True)
+
+    # c2 與 c3 被覆寫;merge base 為 c1
+    store.advance(REPO, "", "c1", [_commit("x2"), _commit("x3")], "x3", None)
+
+    assert _shas(store) == ["x3", "x2", "c1"]
+    assert not store.contains(REPO, "", "c3")
+
+
+def test_extend_prepends_older_commits_and_skips_known_ones(store):
+    store.replace(REPO, "", [_commit("c4"), _commit("c3")], None, False)
+
+    added = store.extend(REPO, "", [_commit("c3"), _commit("c2"), _commit("c1")], False)
+
+    assert added == 2
+    assert _shas(store) == ["c4", "c3", "c2", "c1"]
+    assert store.oldest(REPO, "")[0] == "c1"
+    assert store.oldest(REPO, "")[2] == 4
+    assert not store.state(REPO, "").complete
+
+
+def test_extend_without_new_commits_marks_the_branch_complete(store):
+    store.replace(REPO, "", [_commit("c2"), _commit("c1")], None, False)
+
+    assert store.extend(REPO, "", [_commit("c1")], False) == 0
+    assert store.state(REPO, "").complete
+
+
+def test_timeline_returns_epoch_seconds_and_authors(store):
+    store.replace(REPO, "", [
+        _commit("c3", 3, login=""),
+        _commit("c2", 2, login="bob"),
+        _commit("c1", 1, login="alice"),
+    ], None, True)
+
+    timeline = sorted(tuple(row) for row in store.timeline(REPO, ""))
+
+    assert timeline == [(1704067200, "alice"), (1704153600, "bob"), (1704240000, "Octo")]
+    assert len(store.timeline(REPO, "", since="2024-01-02T00:00:00+00:00")) == 2
+
+
+def test_branches_are_independent(store):
+    store.replace(REPO, "", [_commit("c1")], None, True)
+    store.replace(REPO, "dev", [_commit("d1"), _commit("c1")], None, True)
+
+    assert _shas(store) == ["c1"]
+    assert _shas(store, "dev") == ["d1", "c1"]
+
+
+class _FakeRepository:
+    """以 ETag 回應 commits 第一頁並提供 compare API 的假 GitHub"""
+
+    def __init__(self, shas: list[str]):
+        self.shas = shas
+        self.merge_base: str | None = None
+        self.paths: list[str] = []
+
+    def _github_commit(self, sha: str) -> dict:
+        return {
+            "sha": sha,
+            "html_url": f"https://github.com/{REPO}/commit/{sha}",
+            "commit": {
+                "message": f"commit {sha}",
+                "author": {"name": "Octo", "date": "2024-01-01T00:00:00Z"},
+            },
+            "author": {"login": "octo"},
+        }
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.paths.append(path)
+        if "/compare/" in path:
+            if self.merge_base is None:
+                return httpx.Response(404, json={"message": "Not Found"})
+            new = self.shas[:self.shas.index(self.merge_base)]
+            return httpx.Response(200, json={
+                "merge_base_commit": {"sha": self.merge_base},
+                "total_commits": len(new),
+                "commits": [self._github_commit(sha) for sha in reversed(new)],
+            })
+        etag = f'"{self.shas[0]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(
+            200, json=[self._github_commit(sha) for sha in self.shas], headers={"ETag": etag}
+        )
+
+
+def _sync(fake: _FakeRepository, pushes: list):
+    """同步一次,再依序套用每個 push 並重新同步
+
+    Returns:
+        tuple: (每次同步後的分支內容, 最後的同步狀態)
+    """
+
+    async def scenario():
+        # 客戶端關閉時一併關閉 commit 儲存,所以在 scenario 內讀取結果
+        store = CommitStore(":memory:")
+        async with make_client(fake, commit_store=store) as client:
+            history = []
+            await client.sync_commits("octo", "repo")
+            history.append(_shas(store))
+            for push in pushes:
+                push(fake)
+                await client.sync_commits("octo", "repo")
+                history.append(_shas(store))
+            return history, store.state(REPO, "")
+
+    return asyncio.run(scenario())
+
+
+def test_sync_without_new_push_is_a_conditional_request():
+    fake = _FakeRepository(["c2", "c1"])
+
+    history, state = _sync(fake, [lambda fake: None])
+
+    assert history == [["c2", "c1"], ["c2", "c1"]]
+    assert fake.paths == ["/repos/octo/repo/commits"] * 2
+    assert state.complete
+
+
+def test_sync_fast_forward_uses_compare():
+    def push(fake):
+        fake.shas = ["c4", "c3", *fake.shas]
+        fake.merge_base = "c2"
+
+    fake = _FakeRepository(["c2", "c1"])
+
+    history, state = _sync(fake, [push])
+
+    assert history[-1] == ["c4", "c3", "c2", "c1"]
+    assert fake.paths[-1] == "/repos/octo/repo/compare/c2...c4"
+    assert state.head_sha == "c4"
+    assert state.etag == '"c4"'
+
+
+def test_sync_force_push_rewinds_to_the_merge_base():
+    def force_push(fake):
+        fake.shas = ["x3", "x2", "c1"]
+        fake.merge_base = "c1"
+
+    fake = _FakeRepository(["c3", "c2", "c1"])
+
+    history, state = _sync(fake, [force_push])
+
+    assert history[-1] == ["x3", "x2", "c1"]
+    assert state.head_sha == "x3"
+
+
+def test_sync_rebuilds_when_the_old_head_is_gone():
+    def force_push(fake):
+        fake.shas = ["y2", "y1"]
+        fake.merge_base = None
+
+    fake = _FakeRepository(["c2", "c1"])
+
+    history, _ = _sync(fake, [force_push])
+
+    assert history[-1] == ["y2", "y1"]
+    assert "/repos/octo/repo/compare/c2...y2" in fake.paths
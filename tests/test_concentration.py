@@ -0,0 +1,129 @@
+# 作者集中度與語言彙總測試
+# 以已知答案驗證 bus factor、HHI、Gini,以及語言 × 倉庫矩陣的加權與平均比例
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from src.tools.contributors import author_concentration
+from src.tools.languages import aggregate_language_bytes, resolve_repositories
+
+NOW = datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp()
+DAY = 86400
+
+
+def _timeline(commits_per_author: list[int], days_ago: list[int] | None = None) -> dict:
+    """每位作者依序產生 commits;days_ago 為每位作者最後一個 commit 距今的天數"""
+    days_ago = days_ago or [0] * len(commits_per_author)
+    timestamps, author_ids = [], []
+    for author, (count, ago) in enumerate(zip(commits_per_author, days_ago)):
+        for i in range(count):
+            timestamps.append(int(NOW - (ago + i) * DAY))
+            author_ids.append(author)
+    return {
+        "timestamps": timestamps,
+        "author_ids": author_ids,
+        "authors": [f"author-{i}" for i in range(len(commits_per_author))],
+    }
+
+
+def test_single_author():
+    result = author_concentration(_timeline([7]), now=NOW)
+
+    assert result["bus_factor"] == 1
+    assert result["gini"] == 0.0
+    assert result["hhi"] == 1.0
+    assert result["top_share"] == 1.0
+
+
+def test_equal_authors():
+    result = author_concentration(_timeline([5, 5, 5, 5]), now=NOW)
+
+    assert result["bus_factor"] == 2
+    assert result["hhi"] == 0.25
+    assert result["gini"] == pytest.approx(0.0)
+
+
+def test_skewed_authors():
+    result = author_concentration(_timeline([1, 6, 1, 2]), now=NOW)
+
+    assert result["total_commits"] == 10
+    assert result["bus_factor"] == 1
+    assert result["top_share"] == 0.6
+    # 0.6² + 0.2² + 0.1² + 0.1²
+    assert result["hhi"] == 0.42
+    # 遞增 [1, 1, 2, 6]:Σ|xi - xj| / (2n² · mean) = 32 / 80
+    assert result["gini"] == 0.4
+    assert [a["author"] for a in result["top_authors"]] == [
+        "author-1", "author-3", "author-0", "author-2",
+    ]
+
+
+def test_bus_factor_counts_authors_needed_for_half_the_commits():
+    result = author_concentration(_timeline([3, 3, 2, 2]), now=NOW)
+
+    assert result["bus_factor"] == 2
+
+
+def test_active_authors_and_last_commit():
+    result = author_concentration(_timeline([2, 3], days_ago=[10, 200]), now=NOW, top_n=1)
+
+    assert result["authors"] == 2
+    assert result["active_authors"] == 1
+    assert result["top_authors"] == [{
+        "author": "author-1",
+        "commits": 3,
+        "share": 0.6,
+        "last_commit": datetime.fromtimestamp(NOW - 200 * DAY, timezone.utc).isoformat(),
+    }]
+
+
+def test_empty_history():
+    result = author_concentration({"timestamps": [], "author_ids": [], "authors": []}, now=NOW)
+
+    assert result["bus_factor"] == 0
+    assert result["top_authors"] == []
+
+
+def test_language_matrix_weights_and_means():
+    result = aggregate_language_bytes(
+        [{"Python": 300, "C": 100}, {"Python": 100}, {"Go": 600}, {}], top_n=2
+    )
+
+    assert result["repositories"] == 3
+    assert result["total_bytes"] == 1100
+    go, python = result["languages"]
+    assert go == {
+        "language": "Go", "bytes": 600, "share": 54.55,
+        "mean_share": 33.33, "repositories": 1, "primary": 1,
+    }
+    # bytes 加權 400/1100;各倉庫比例平均 (75% + 100% + 0%) / 3
+    assert python == {
+        "language": "Python", "bytes": 400, "share": 36.36,
+        "mean_share": 58.33, "repositories": 2, "primary": 2,
+    }
+    assert result["other"] == {"languages": 1, "bytes": 100, "share": 9.09}
+
+
+def test_language_matrix_sums_duplicate_entries():
+    result = aggregate_language_bytes([{"Rust": 10}, {"Rust": 30}])
+
+    assert result["languages"][0]["bytes"] == 40
+    assert result["languages"][0]["mean_share"] == 100.0
+    assert result["other"] == {"languages": 0, "bytes": 0, "share": 0.0}
+
+
+def test_language_matrix_without_code():
+    assert aggregate_language_bytes([{}, {"Shell": 0}])["repositories"] == 0
+
+
+def test_resolve_repositories_validates_names():
+    async def resolve(**kwargs):
+        return await resolve_repositories(None, **kwargs)
+
+    assert asyncio.run(resolve(repositories=["a/b", "a/b", "c/d"])) == [("a", "b"), ("c", "d")]
+    with pytest.raises(ValueError):
+        asyncio.run(resolve(repositories=["a/b/c"]))
+    with pytest.raises(ValueError):
+        asyncio.run(resolve(org="a", topic="b"))
@@ -0,0 +1,128 @@
+# 工具呼叫執行器測試
+# 並行上限、逾時、排隊/執行中 gauge,以及 gather_bounded 的上限與逐項錯誤
+
+import asyncio
+
+import pytest
+
+from src.executor import ToolExecutor, gather_bounded
+
+
+class _Peak:
+    """記錄同時執行中的最大數量"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, value=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return value
+
+
+def test_run_returns_the_result():
+    async def scenario():
+        return await ToolExecutor(max_concurrency=1, timeout=1).run(_Peak(), "ok")
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_run_limits_concurrency():
+    peak = _Peak()
+
+    async def scenario():
+        executor = ToolExecutor(max_concurrency=3, timeout=1)
+        return await asyncio.gather(*(executor.run(peak, i) for i in range(10)))
+
+    assert asyncio.run(scenario()) == list(range(10))
+    assert peak.peak == 3
+
+
+def test_gauge_counts_queued_and_in_flight_calls():
+    release = None
+
+    async def hold():
+        await release.wait()
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        executor = ToolExecutor(max_concurrency=2, timeout=1)
+        tasks = [asyncio.ensure_future(executor.run(hold)) for _ in range(5)]
+        # wait_for 可能另外包一層 task,多讓出幾次讓所有呼叫就定位
+        for _ in range(3):
+            await asyncio.sleep(0)
+        during = executor.gauge()
+        release.set()
+        await asyncio.gather(*tasks)
+        return during, executor.gauge()
+
+    during, after = asyncio.run(scenario())
+
+    assert during == {"queued": 3, "in_flight": 2, "max_concurrency": 2}
+    assert after == {"queued": 0, "in_flight": 0, "max_concurrency": 2}
+
+
+def test_run_times_out_and_frees_the_slot():
+    async def scenario():
+        executor = ToolExecutor(max_concurrency=1, timeout=0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(asyncio.sleep, 1)
+        return await executor.run(asyncio.sleep, 0, "next"), executor.gauge()
+
+    result, gauge = asyncio.run(scenario())
+
+    assert result == "next"
+    assert gauge["in_flight"] == 0
+
+
+def test_timeout_includes_time_spent_queued():
+    async def scenario():
+        executor = ToolExecutor(max_concurrency=1, timeout=0.1)
+        # 各自只需 0.07 秒,但第二個呼叫先排隊 0.07 秒,總時間超過逾時
+        return await asyncio.gather(
+            executor.run(asyncio.sleep, 0.07, "first"),
+            executor.run(asyncio.sleep, 0.07, "second"),
+            return_exceptions=True,
+        ), executor.gauge()
+
+    (first, second), gauge = asyncio.run(scenario())
+
+    assert first == "first"
+    assert isinstance(second, asyncio.TimeoutError)
+    assert gauge == {"queued": 0, "in_flight": 0, "max_concurrency": 1}
+
+
+def test_defaults_are_read_from_env(monkeypatch):
+    monkeypatch.setenv("MCP_MAX_CONCURRENCY", "4")
+    monkeypatch.setenv("MCP_TOOL_TIMEOUT", "2.5")
+
+    executor = ToolExecutor()
+
+    assert (executor.max_concurrency, executor.timeout) == (4, 2.5)
+
+
+def test_gather_bounded_limits_concurrency_and_keeps_order():
+    peak = _Peak()
+
+    async def scenario():
+        return await gather_bounded([lambda i=i: peak(i) for i in range(7)], limit=2)
+
+    assert asyncio.run(scenario()) == list(range(7))
+    assert peak.peak == 2
+
+
+def test_gather_bounded_returns_exceptions_per_item():
+    async def fail():
+        raise ValueError("missing")
+
+    async def scenario():
+        return await gather_bounded([lambda: asyncio.sleep(0, "a"), fail], limit=2)
+
+    first, second = asyncio.run(scenario())
+
+    assert first == "a"
+    assert isinstance(second, ValueError)
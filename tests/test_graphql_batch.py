@@ -0,0 +1,233 @@
+# GraphQL 批次查詢測試
+# 查詢組合與點數估算、依別名解析回應、NOT_FOUND 對應與退回 REST,以及預取不走批次
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.async_github_client import refreshing
+from src.github_client import GitHubClientError, RepositoryNotFoundError
+from src.graphql_batch import Fallback, GraphQLBatcher, _Item, _RepoGroup, build_query
+from tests.conftest import make_client
+
+
+def _group(alias, owner, repo, *items):
+    group = _RepoGroup(alias, owner, repo)
+    group.items = [_Item(method, owner, repo, args, None) for method, args in items]
+    return group
+
+
+def _languages(**sizes):
+    return {
+        "languages": {
+            "totalSize": sum(sizes.values()),
+            "pageInfo": {"hasNextPage": False},
+            "edges": [{"size": size, "node": {"name": name}} for name, size in sizes.items()],
+        }
+    }
+
+
+def _run(batcher, *calls):
+    async def scenario():
+        return await asyncio.gather(
+            *(batcher.load(*call) for call in calls), return_exceptions=True
+        )
+
+    return asyncio.run(scenario())
+
+
+def test_build_query_aliases_repositories_and_histories():
+    query, cost = build_query([
+        _group("r0", "octo", "one", ("get_repo_statistics", ()), ("get_language_bytes", ())),
+        _group("r1", "octo", "two", ("get_recent_commits", (10, None)),
+               ("get_recent_commits", (5, "dev"))),
+    ])
+
+    assert 'r0: repository(owner: "octo", name: "one")' in query
+    assert 'r1: repository(owner: "octo", name: "two")' in query
+    assert "stargazerCount" in query and "languages(first: 100" in query
+    assert "h0: defaultBranchRef { target { ... on Commit { history(first: 10)" in query
+    assert 'h1: object(expression: "dev") { ... on Commit { history(first: 5)' in query
+    assert "rateLimit { cost }" in query
+    assert cost == 1
+
+
+def test_build_query_escapes_names():
+    query, _ = build_query([_group("r0", 'a"b', "c\\d", ("get_language_bytes", ()))])
+
+    assert 'owner: "a\\"b"' in query
+    assert 'name: "c\\\\d"' in query
+
+
+def test_results_are_resolved_by_alias():
+    sent = []
+
+    async def send(query, cost):
+        sent.append(query)
+        return {"data": {
+            "rateLimit": {"cost": 1},
+            "r0": _languages(Python=300, C=100),
+            "r1": _languages(Go=50),
+        }}
+
+    batcher = GraphQLBatcher(send, max_batch=25, window=0)
+    results = _run(
+        batcher,
+        ("get_language_bytes", "octo", "one"),
+        ("get_language_bytes", "octo", "two"),
+    )
+
+    assert results == [{"Python": 300, "C": 100}, {"Go": 50}]
+    assert len(sent) == 1
+    assert batcher.stats() == {"graphql_queries": 1, "graphql_batched": 2, "graphql_points": 1}
+
+
+def test_same_repository_shares_one_alias():
+    async def send(query, cost):
+        assert query.count("repository(") == 1
+        return {"data": {"r0": _languages(Rust=10)}}
+
+    results = _run(
+        GraphQLBatcher(send, max_batch=25, window=0),
+        ("get_language_bytes", "Octo", "Repo"),
+        ("get_language_bytes", "octo", "repo"),
+    )
+
+    assert results == [{"Rust": 10}, {"Rust": 10}]
+
+
+def test_not_found_alias_raises_repository_not_found():
+    async def send(query, cost):
+        return {
+            "data": {"r0": None, "r1": _languages(Go=1)},
+            "errors": [{"type": "NOT_FOUND", "path": ["r0"]}],
+        }
+
+    missing, found = _run(
+        GraphQLBatcher(send, max_batch=25, window=0),
+        ("get_language_bytes", "octo", "gone"),
+        ("get_language_bytes", "octo", "here"),
+    )
+
+    assert isinstance(missing, RepositoryNotFoundError)
+    assert "octo/gone" in str(missing)
+    assert found == {"Go": 1}
+
+
+def test_unparseable_item_falls_back_alone():
+    async def send(query, cost):
+        truncated = _languages(C=1)
+        truncated["languages"]["pageInfo"]["hasNextPage"] = True
+        return {"data": {"r0": truncated, "r1": _languages(Go=1)}}
+
+    results = _run(
+        GraphQLBatcher(send, max_batch=25, window=0),
+        ("get_language_bytes", "octo", "huge"),
+        ("get_language_bytes", "octo", "small"),
+    )
+
+    assert isinstance(results[0], Fallback)
+    assert results[1] == {"Go": 1}
+
+
+def test_query_failure_falls_back_for_every_item():
+    async def send(query, cost):
+        raise GitHubClientError("GraphQL unavailable")
+
+    results = _run(
+        GraphQLBatcher(send, max_batch=25, window=0),
+        ("get_language_bytes", "octo", "one"),
+        ("get_repo_statistics", "octo", "two"),
+    )
+
+    assert all(isinstance(r, Fallback) for r in results)
+
+
+def test_single_item_and_oversized_pages_use_rest():
+    async def send(query, cost):
+        raise AssertionError("no query expected")
+
+    batcher = GraphQLBatcher(send, max_batch=25, window=0)
+
+    assert isinstance(_run(batcher, ("get_language_bytes", "octo", "one"))[0], Fallback)
+    assert isinstance(
+        _run(batcher, ("get_recent_commits", "octo", "one", 500, None))[0], Fallback
+    )
+
+
+def test_cancelled_item_is_dropped_before_the_flush():
+    async def send(query, cost):
+        raise AssertionError("no query expected")
+
+    errors = []
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        batcher = GraphQLBatcher(send, max_batch=25, window=0.01)
+        first = asyncio.ensure_future(batcher.load("get_language_bytes", "octo", "one"))
+        second = asyncio.ensure_future(batcher.load("get_language_bytes", "octo", "two"))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(Fallback):
+            await second
+        # 唯一的項目被取消時,flush 不得對已取消的 future 設定例外
+        lone = asyncio.ensure_future(batcher.load("get_language_bytes", "octo", "three"))
+        await asyncio.sleep(0)
+        lone.cancel()
+        await asyncio.sleep(0.02)
+        return batcher.queries
+
+    assert asyncio.run(scenario()) == 0
+    assert errors == []
+
+
+def test_client_falls_back_to_rest_when_graphql_has_no_data():
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path == "/graphql":
+            return httpx.Response(200, json={"errors": [{"message": "timeout"}]})
+        return httpx.Response(200, json={"Python": 10})
+
+    async def scenario():
+        async with make_client(handler) as client:
+            return await asyncio.gather(
+                client.get_language_bytes("octo", "one"),
+                client.get_language_bytes("octo", "two"),
+            )
+
+    assert asyncio.run(scenario()) == [{"Python": 10}, {"Python": 10}]
+    assert paths[0] == "/graphql"
+    assert sorted(paths[1:]) == ["/repos/octo/one/languages", "/repos/octo/two/languages"]
+
+
+def test_prefetch_uses_rest_so_entries_can_be_revalidated():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json={"Python": 10}, headers={"ETag": '"v1"'})
+
+    async def refresh(client):
+        with refreshing():
+            return await asyncio.gather(
+                client.get_language_bytes("octo", "one"),
+                client.get_language_bytes("octo", "two"),
+            )
+
+    async def scenario():
+        async with make_client(handler) as client:
+            await refresh(client)
+            await refresh(client)
+            return client.cache_stats()
+
+    stats = asyncio.run(scenario())
+
+    assert all(request.url.path != "/graphql" for request in requests)
+    assert len(requests) == 4
+    # 第二輪以第一輪取得的 ETag 重新驗證
+    assert stats["not_modified"] == 2
@@ -0,0 +1,78 @@
+# 健康檢查測試
+# ready 檔案必須存在且其中的程序仍在執行;預先建立客戶端時只忽略缺少 token
+
+import logging
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src import healthcheck, server
+from src.github_client import AuthenticationError
+
+
+@pytest.fixture
+def ready_file(tmp_path, monkeypatch):
+    path = tmp_path / "mcp.ready"
+    monkeypatch.setenv(healthcheck.READY_FILE_ENV, str(path))
+    monkeypatch.delenv("MCP_METRICS_PORT", raising=False)
+    return path
+
+
+def test_ready_server_passes(ready_file):
+    written = healthcheck.mark_ready()
+
+    assert written == str(ready_file)
+    assert ready_file.read_text() == str(os.getpid())
+    assert healthcheck.check() == []
+
+    healthcheck.clear_ready(written)
+    assert not ready_file.exists()
+
+
+def test_missing_ready_file_fails(ready_file):
+    assert healthcheck.check() == [f"server not ready: {ready_file} does not exist"]
+
+
+def test_exited_server_fails(ready_file):
+    process = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                             capture_output=True, text=True, check=True)
+    ready_file.write_text(process.stdout.strip())
+
+    (problem,) = healthcheck.check()
+
+    assert "is not running" in problem
+
+
+def test_without_ready_file_only_modules_are_checked(monkeypatch):
+    monkeypatch.delenv(healthcheck.READY_FILE_ENV, raising=False)
+    monkeypatch.delenv("MCP_METRICS_PORT", raising=False)
+
+    assert healthcheck.mark_ready() is None
+    assert healthcheck.check() == []
+
+
+def test_prepare_ignores_a_missing_token(monkeypatch, caplog):
+    def missing_token():
+        raise AuthenticationError("GitHub token is required")
+
+    monkeypatch.setattr(server, "get_github_client", missing_token)
+
+    with caplog.at_level(logging.ERROR, logger="src.server"):
+        server._prepare_github_client()
+
+    assert caplog.records == []
+
+
+def test_prepare_logs_other_errors(monkeypatch, caplog):
+    def broken():
+        raise OSError("unable to open database file")
+
+    monkeypatch.setattr(server, "get_github_client", broken)
+
+    with caplog.at_level(logging.ERROR, logger="src.server"):
+        server._prepare_github_client()
+
+    assert "Failed to prepare the GitHub client" in caplog.text
+    assert caplog.records[0].exc_info[0] is OSError
@@ -0,0 +1,58 @@
+# Prometheus 指標測試
+# 客戶端 collector 只註冊一份,以及 metrics 埠被占用時不影響啟動
+
+import logging
+import socket
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src import metrics
+from src.executor import ToolExecutor
+
+
+@pytest.fixture(autouse=True)
+def restore_registry():
+    previous = metrics._client_collector
+    yield
+    if metrics._client_collector is not previous:
+        REGISTRY.unregister(metrics._client_collector)
+        if previous is not None:
+            REGISTRY.register(previous)
+        metrics._client_collector = previous
+
+
+def _samples(name: str) -> list:
+    return [
+        sample
+        for family in REGISTRY.collect()
+        for sample in family.samples
+        if sample.name == name
+    ]
+
+
+def test_registering_again_replaces_the_collector():
+    executor = ToolExecutor(max_concurrency=3)
+
+    metrics.register_client_collector(lambda: None, lambda: executor)
+    metrics.register_client_collector(lambda: None, lambda: executor)
+
+    samples = _samples("mcp_tools_queued")
+    assert len(samples) == 1
+    assert samples[0].value == 0
+
+
+def test_start_metrics_server_without_port_does_nothing():
+    assert metrics.start_metrics_server() is None
+
+
+def test_start_metrics_server_survives_a_port_in_use(caplog):
+    with socket.socket() as listener:
+        listener.bind(("", 0))
+        listener.listen()
+        port = listener.getsockname()[1]
+
+        with caplog.at_level(logging.WARNING, logger="src.metrics"):
+            assert metrics.start_metrics_server(port) is None
+
+    assert f"port {port}" in caplog.text
@@ -0,0 +1,130 @@
+# 速率限制排程測試
+# 背景與前景請求各自的保留額度、接近用盡時的 pacing,以及 secondary rate limit 的處理
+
+import asyncio
+import time
+
+import pytest
+
+from src.github_client import RateLimitError
+from src.ratelimit import Priority, RateLimitScheduler, set_priority
+
+
+def _scheduler(remaining: int, limit: int = 100, reset_in: float = 3600, **kwargs):
+    scheduler = RateLimitScheduler(reserve_ratio=0.10, background_reserve_ratio=0.25, **kwargs)
+    budget = scheduler.budget()
+    budget.limit = limit
+    budget.remaining = remaining
+    budget.reset_at = time.time() + reset_in
+    return scheduler
+
+
+def _acquire(scheduler, priority=Priority.INTERACTIVE, times: int = 1):
+    async def scenario():
+        set_priority(priority)
+        for _ in range(times):
+            await scheduler.acquire()
+
+    asyncio.run(scenario())
+
+
+def test_observe_reads_rate_limit_headers():
+    scheduler = RateLimitScheduler()
+    scheduler.observe({
+        "X-RateLimit-Limit": "5000",
+        "X-RateLimit-Remaining": "4999",
+        "X-RateLimit-Reset": "1700000000",
+        "X-RateLimit-Resource": "graphql",
+    })
+
+    budget = scheduler.budget("graphql")
+    assert (budget.limit, budget.remaining, budget.reset_at) == (5000, 4999, 1700000000)
+    assert scheduler.budget("core").limit is None
+
+
+def test_unknown_budget_does_not_block():
+    scheduler = RateLimitScheduler()
+
+    _acquire(scheduler, Priority.BACKGROUND)
+
+    assert scheduler.budget().remaining is None
+
+
+def test_acquire_counts_down_optimistically():
+    scheduler = _scheduler(remaining=50)
+
+    _acquire(scheduler, times=3)
+
+    assert scheduler.budget().remaining == 47
+
+
+def test_background_request_stops_at_its_reserve():
+    scheduler = _scheduler(remaining=26)
+
+    _acquire(scheduler, Priority.BACKGROUND)
+    with pytest.raises(RateLimitError, match="reserved for interactive"):
+        _acquire(scheduler, Priority.BACKGROUND)
+    # 前景請求仍可使用 25% 保留額度
+    _acquire(scheduler)
+
+    assert scheduler.budget().remaining == 24
+
+
+def test_interactive_request_is_paced_within_its_reserve():
+    # 剩 5 個、0.25 秒後重置:每個請求間隔 0.05 秒
+    scheduler = _scheduler(remaining=5, reset_in=0.25)
+
+    started = time.perf_counter()
+    _acquire(scheduler, times=3)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed >= 0.08
+    assert scheduler.budget().remaining == 2
+
+
+def test_interactive_request_fails_when_pacing_exceeds_max_wait():
+    # 剩 2 個、1 小時後重置:第二個請求需等待半小時
+    scheduler = _scheduler(remaining=2, max_wait=1.0)
+
+    _acquire(scheduler)
+    with pytest.raises(RateLimitError, match="nearly exhausted") as excinfo:
+        _acquire(scheduler)
+
+    assert excinfo.value.reset_at == scheduler.budget().reset_at
+
+
+def test_exhausted_budget_raises_with_reset_time():
+    scheduler = _scheduler(remaining=0)
+
+    with pytest.raises(RateLimitError, match="exceeded") as excinfo:
+        _acquire(scheduler)
+
+    assert excinfo.value.reset_at == scheduler.budget().reset_at
+
+
+def test_budget_is_restored_after_reset():
+    scheduler = _scheduler(remaining=0, reset_in=-1)
+
+    _acquire(scheduler, Priority.BACKGROUND)
+
+    assert scheduler.budget().remaining == 100
+
+
+def test_secondary_rate_limit_blocks_background_and_long_waits():
+    scheduler = RateLimitScheduler(max_wait=1.0)
+    scheduler.observe({"Retry-After": "60"})
+
+    with pytest.raises(RateLimitError, match="secondary"):
+        _acquire(scheduler, Priority.BACKGROUND)
+    with pytest.raises(RateLimitError, match="secondary"):
+        _acquire(scheduler)
+
+
+def test_short_secondary_rate_limit_is_waited_out_by_interactive_requests():
+    scheduler = RateLimitScheduler(max_wait=1.0)
+    scheduler.budget().blocked_until = time.time() + 0.05
+
+    started = time.perf_counter()
+    _acquire(scheduler)
+
+    assert time.perf_counter() - started >= 0.04
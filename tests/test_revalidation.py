@@ -0,0 +1,149 @@
+# 快取重新驗證測試
+# 過期項目以 ETag / Last-Modified 送出條件式請求,304 延長項目;
+# stale window 內的過期項目先行回傳並在背景刷新
+
+import asyncio
+import time
+from dataclasses import replace
+
+import httpx
+
+from src.cache import TTLCache
+from tests.conftest import make_client
+
+KEY = ("get_pushed_at", "octo", "repo")
+
+
+def _expire(client, seconds_ago: float = 1.0) -> None:
+    entry = client._cache.get_stale(KEY)
+    client._cache.put(
+        KEY, replace(entry, expires_at=time.time() - seconds_ago, stored_at=time.time() - 100)
+    )
+
+
+def test_etag_revalidation_extends_the_entry():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(
+            200, json={"pushed_at": "2024-01-01T00:00:00Z"}, headers={"ETag": '"v1"'}
+        )
+
+    async def scenario():
+        async with make_client(handler) as client:
+            first = await client.get_pushed_at("octo", "repo")
+            _expire(client)
+            second = await client.get_pushed_at("octo", "repo")
+            return first, second, client._cache.get_stale(KEY), client.cache_stats()
+
+    started = time.time()
+    first, second, entry, stats = asyncio.run(scenario())
+
+    assert first == second == "2024-01-01T00:00:00+00:00"
+    assert len(requests) == 2
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert stats["not_modified"] == 1
+    # 304 讓項目重新計算 TTL (get_pushed_at 為 60 秒) 與資料取得時間
+    assert entry.expires_at >= started + 59
+    assert entry.stored_at >= started
+    assert entry.etag == '"v1"'
+
+
+def test_last_modified_revalidation():
+    modified = "Mon, 01 Jan 2024 00:00:00 GMT"
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-Modified-Since") == modified:
+            return httpx.Response(304)
+        return httpx.Response(
+            200, json={"pushed_at": "2024-01-01T00:00:00Z"}, headers={"Last-Modified": modified}
+        )
+
+    async def scenario():
+        async with make_client(handler) as client:
+            await client.get_pushed_at("octo", "repo")
+            _expire(client)
+            await client.get_pushed_at("octo", "repo")
+            return client._cache.get_stale(KEY)
+
+    entry = asyncio.run(scenario())
+
+    assert requests[1].headers["If-Modified-Since"] == modified
+    assert entry.last_modified == modified
+    assert entry.expires_at > time.time()
+
+
+def test_changed_resource_replaces_the_entry():
+    versions = iter(["2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        version = next(versions)
+        return httpx.Response(200, json={"pushed_at": version}, headers={"ETag": f'"{version}"'})
+
+    async def scenario():
+        async with make_client(handler) as client:
+            await client.get_pushed_at("octo", "repo")
+            _expire(client)
+            return await client.get_pushed_at("octo", "repo"), client._cache.get_stale(KEY)
+
+    value, entry = asyncio.run(scenario())
+
+    assert value == "2024-02-01T00:00:00+00:00"
+    assert entry.etag == '"2024-02-01T00:00:00Z"'
+
+
+def test_stale_entry_is_served_and_refreshed_in_background():
+    versions = iter(["2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"pushed_at": next(versions)})
+
+    async def scenario():
+        async with make_client(handler, cache=TTLCache(stale_window=300)) as client:
+            await client.get_pushed_at("octo", "repo")
+            _expire(client, seconds_ago=10)
+            stale = await client.get_pushed_at("octo", "repo")
+            await asyncio.gather(*client._background)
+            fresh = await client.get_pushed_at("octo", "repo")
+            return stale, fresh, client.cache_stats()
+
+    stale, fresh, stats = asyncio.run(scenario())
+
+    assert stale == "2024-01-01T00:00:00+00:00"
+    assert fresh == "2024-02-01T00:00:00+00:00"
+    assert stats["stale_served"] == 1
+
+
+def test_entry_past_the_stale_window_is_reloaded_in_the_foreground():
+    versions = iter(["2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"pushed_at": next(versions)})
+
+    async def scenario():
+        async with make_client(handler, cache=TTLCache(stale_window=5)) as client:
+            await client.get_pushed_at("octo", "repo")
+            _expire(client, seconds_ago=10)
+            return await client.get_pushed_at("octo", "repo"), client.cache_stats()
+
+    value, stats = asyncio.run(scenario())
+
+    assert value == "2024-02-01T00:00:00+00:00"
+    assert stats["stale_served"] == 0
+
+
+def test_ttl_cache_keeps_expired_entries_only_within_the_stale_window():
+    cache = TTLCache(stale_window=60)
+    cache.set("recent", 1, ttl=-30)
+    cache.set("old", 2, ttl=-90)
+
+    assert cache.get("recent") is None
+    assert cache.get("old") is None
+    assert cache.get_stale("recent") is not None
+    assert cache.get_stale("old") is None
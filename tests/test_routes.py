@@ -0,0 +1,136 @@
+# API 路由測試
+# 以 MockTransport 客戶端取代 GitHub,檢查回應內容、狀態碼與標頭 (貢獻者、批次統計)
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from api.dependencies import get_github_client
+from api.main import app
+from tests.conftest import make_client
+
+
+@pytest.fixture
+def api():
+    """回傳 (TestClient, 設定 handler 的函式);handler 接收 httpx.Request"""
+    def serve(handler):
+        client = make_client(handler)
+        app.dependency_overrides[get_github_client] = lambda: client
+        return TestClient(app)
+
+    yield serve
+    app.dependency_overrides.clear()
+
+
+def _contributors(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path.endswith("/stats/contributors"):
+        return httpx.Response(202, json={})
+    if path.endswith("/contributors"):
+        return httpx.Response(200, json=[{
+            "login": "alice",
+            "contributions": 3,
+            "avatar_url": "https://avatars/alice",
+            "html_url": "https://github.com/alice",
+        }])
+    return httpx.Response(200, json={"pushed_at": "2024-03-01T00:00:00Z"})
+
+
+def test_contributors_report_pending_line_stats_and_age(api, monkeypatch):
+    monkeypatch.setenv("GITHUB_STATS_WAIT", "0")
+    http = api(_contributors)
+
+    response = http.get("/api/v1/repo/octo/repo/contributors", params={"top_n": 1})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["line_stats_pending"] is True
+    assert body["contributors"][0]["additions"] is None
+    assert response.headers["Age"] == "0"
+
+
+def _repository(name: str) -> dict:
+    return {
+        "full_name": name,
+        "stargazers_count": 5,
+        "forks_count": 1,
+        "open_issues_count": 2,
+        "subscribers_count": 3,
+        "description": None,
+        "language": "Python",
+        "created_at": "2020-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+        "default_branch": "main",
+    }
+
+
+class _Repositories:
+    """只認得 known 中倉庫的假 GitHub REST API;limited 中的倉庫回應速率限制"""
+
+    def __init__(self, known: set[str], limited: frozenset[str] = frozenset()):
+        self.known = known
+        self.limited = limited
+        self.requests: list[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        name = request.url.path.removeprefix("/repos/")
+        self.requests.append(name)
+        if name in self.limited:
+            return httpx.Response(429, headers={"Retry-After": "60"})
+        if name not in self.known:
+            return httpx.Response(404, json={"message": "Not Found"})
+        return httpx.Response(200, json=_repository(name))
+
+
+@pytest.fixture
+def rest_only(monkeypatch):
+    # 批次端點測的是逐項結果,不經過 GraphQL 合併查詢
+    monkeypatch.setenv("GITHUB_GRAPHQL_BATCH", "0")
+
+
+def _batch(*names: str) -> dict:
+    return {"repositories": [dict(zip(("owner", "repo"), n.split("/"))) for n in names]}
+
+
+def test_batch_reports_each_repository(api, rest_only):
+    http = api(_Repositories({"octo/a", "octo/b"}, limited=frozenset({"octo/slow"})))
+
+    response = http.post(
+        "/api/v1/repos/stats:batch", json=_batch("octo/a", "octo/missing", "octo/b", "octo/slow")
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    results = body["results"]
+    assert [r["repository"] for r in results] == ["octo/a", "octo/missing", "octo/b", "octo/slow"]
+    assert [r["status_code"] for r in results] == [200, 404, 200, 429]
+    assert results[0]["stats"]["stars"] == 5
+    assert results[0]["error"] is None
+    assert results[1]["stats"] is None
+    assert "octo/missing" in results[1]["error"]
+    assert "rate limit" in results[3]["error"]
+
+
+def test_batch_duplicates_share_one_lookup(api, rest_only):
+    handler = _Repositories({"octo/a"})
+    http = api(handler)
+
+    body = http.post("/api/v1/repos/stats:batch", json=_batch("octo/a", "octo/a", "octo/a")).json()
+
+    assert body["succeeded"] == 3
+    assert [r["repository"] for r in body["results"]] == ["octo/a"] * 3
+    assert handler.requests == ["octo/a"]
+
+
+@pytest.mark.parametrize("count", [0, 501])
+def test_batch_rejects_empty_and_oversized_requests(api, rest_only, count):
+    handler = _Repositories(set())
+    http = api(handler)
+
+    response = http.post(
+        "/api/v1/repos/stats:batch", json=_batch(*(f"octo/r{i}" for i in range(count)))
+    )
+
+    assert response.status_code == 422
+    assert handler.requests == []
@@ -0,0 +1,150 @@
+# 跨副本共用快取測試
+# 快取鍵編碼不會混淆、MemoryStore / SQLiteStore 的讀寫與過期、刷新鎖與項目序列化
+
+import asyncio
+
+import pytest
+
+from src.cache import CacheEntry
+from src.github_client import RepositoryNotFoundError
+from src.shared_cache import (
+    MemoryStore,
+    SharedCache,
+    SQLiteStore,
+    decode_entry,
+    encode_entry,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStore()
+    return SQLiteStore(str(tmp_path / "cache" / "l2.db"))
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.mark.parametrize("first, second", [
+    (("get_commit_page", "o", "r", None), ("get_commit_page", "o", "r", "None")),
+    (("m", "a:b", "c"), ("m", "a", "b:c")),
+    (("m", 1), ("m", "1")),
+])
+def test_keys_do_not_collide(first, second):
+    assert SharedCache._key(first) != SharedCache._key(second)
+
+
+def test_key_is_stable_and_prefixed():
+    key = SharedCache._key(("get_repo_statistics", "octo", "repo"))
+
+    assert key == 'gha:["get_repo_statistics","octo","repo"]'
+
+
+def test_store_round_trip_and_expiry(store):
+    async def scenario():
+        await store.set("a", b"value", ttl=60)
+        await store.set("b", b"gone", ttl=-1)
+        result = await store.get("a"), await store.get("b"), await store.get("missing")
+        await store.aclose()
+        return result
+
+    assert _run(scenario()) == (b"value", None, None)
+
+
+def test_store_lock_is_exclusive_until_released(store):
+    async def scenario():
+        first = await store.acquire("lock", "t1", ttl=60)
+        second = await store.acquire("lock", "t2", ttl=60)
+        # 只有持有者能釋放鎖
+        await store.release("lock", "t2")
+        third = await store.acquire("lock", "t3", ttl=60)
+        await store.release("lock", "t1")
+        fourth = await store.acquire("lock", "t4", ttl=60)
+        await store.aclose()
+        return first, second, third, fourth
+
+    assert _run(scenario()) == (True, False, False, True)
+
+
+def test_expired_lock_can_be_taken(store):
+    async def scenario():
+        await store.acquire("lock", "t1", ttl=-1)
+        taken = await store.acquire("lock", "t2", ttl=60)
+        await store.aclose()
+        return taken
+
+    assert _run(scenario())
+
+
+def test_shared_cache_round_trip(store):
+    cache = SharedCache(store)
+    entry = CacheEntry.for_value({"stars": 5}, 60, etag='"v1"')
+
+    async def scenario():
+        await cache.put(("get_repo_statistics", "octo", "repo"), entry)
+        await cache.put(("expired",), CacheEntry.for_value(1, -1))
+        result = (
+            await cache.get(("get_repo_statistics", "octo", "repo")),
+            await cache.get(("get_repo_statistics", "octo", None)),
+            await cache.get(("expired",)),
+        )
+        await cache.aclose()
+        return result
+
+    stored, other, expired = _run(scenario())
+
+    assert stored.value == {"stars": 5}
+    assert stored.etag == '"v1"'
+    assert stored.expires_at == pytest.approx(entry.expires_at)
+    assert other is None
+    assert expired is None
+
+
+def test_get_or_load_runs_the_loader_once(store):
+    cache = SharedCache(store)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return CacheEntry.for_value(calls, 60)
+
+    async def scenario():
+        results = await asyncio.gather(*(cache.get_or_load(("k",), loader) for _ in range(3)))
+        await cache.aclose()
+        return [entry.value for entry in results]
+
+    assert _run(scenario()) == [1, 1, 1]
+    assert calls == 1
+
+
+def test_negative_entry_survives_encoding():
+    entry = CacheEntry.for_error(RepositoryNotFoundError("Repository 'o/r' not found"), 30)
+
+    decoded = decode_entry(encode_entry(entry))
+
+    with pytest.raises(RepositoryNotFoundError, match="o/r"):
+        decoded.unwrap()
+    assert decoded.expires_at == pytest.approx(entry.expires_at)
+
+
+def test_corrupt_data_decodes_to_none():
+    assert decode_entry(b"not zlib") is None
+
+
+def test_sqlite_store_evicts_earliest_expiry_over_max_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.shared_cache.DISK_EVICT_EVERY", 1)
+    store = SQLiteStore(str(tmp_path / "l2.db"), max_bytes=250)
+
+    async def scenario():
+        for i in range(3):
+            await store.set(f"k{i}", b"x" * 100, ttl=60 + i)
+        result = [await store.get(f"k{i}") is not None for i in range(3)]
+        await store.aclose()
+        return result
+
+    # 第三次寫入後超過上限,淘汰最早到期的 k0
+    assert _run(scenario()) == [False, True, True]
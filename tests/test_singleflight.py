@@ -0,0 +1,204 @@
+# 請求合併測試
+# 相同鍵的並行呼叫只執行一次,取消其中一個等待者不影響共用的呼叫;
+# 共用的呼叫以最急迫的等待者的優先權送出
+
+import asyncio
+import time
+
+import pytest
+
+from src.github_client import RateLimitError
+from src.ratelimit import Priority, RateLimitScheduler, current_priority, set_priority
+from src.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", load) for _ in range(5)))
+        return results, flight
+
+    results, flight = asyncio.run(scenario())
+
+    assert results == [1] * 5
+    assert calls == 1
+    assert flight.shared == 4
+    assert len(flight) == 0
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            flight.do("a", lambda: asyncio.sleep(0, "a")),
+            flight.do("b", lambda: asyncio.sleep(0, "b")),
+        ), flight.shared
+
+    results, shared = asyncio.run(scenario())
+
+    assert results == ["a", "b"]
+    assert shared == 0
+
+
+def test_exception_is_delivered_to_every_waiter():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_next_call_after_completion_runs_again():
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def scenario():
+        flight = SingleFlight()
+        return await flight.do("k", load), await flight.do("k", load)
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_cancelling_one_waiter_does_not_cancel_the_shared_call():
+    release = None
+
+    async def load():
+        await release.wait()
+        return "done"
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("k", load))
+        second = asyncio.ensure_future(flight.do("k", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_shared_call_survives_when_every_waiter_is_cancelled():
+    finished = []
+
+    async def load():
+        await asyncio.sleep(0.01)
+        finished.append(True)
+
+    async def scenario():
+        flight = SingleFlight()
+        waiter = asyncio.ensure_future(flight.do("k", load))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.03)
+        return len(flight)
+
+    assert asyncio.run(scenario()) == 0
+    assert finished == [True]
+
+
+def _scheduler_at(remaining: int) -> RateLimitScheduler:
+    scheduler = RateLimitScheduler(reserve_ratio=0.10, background_reserve_ratio=0.25)
+    scheduler.observe({
+        "X-RateLimit-Limit": "100",
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(time.time()) + 3600),
+    })
+    return scheduler
+
+
+def _background_then_interactive(load, join: bool):
+    async def background(flight):
+        set_priority(Priority.BACKGROUND)
+        return await flight.do("k", load)
+
+    async def scenario():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(background(flight))
+        await asyncio.sleep(0)
+        if join:
+            second = await flight.do("k", load)
+            return await first, second
+        return await first
+
+    return asyncio.run(scenario())
+
+
+def test_interactive_joiner_raises_the_shared_call_priority():
+    # 剩 20%:背景請求會被 25% 的保留額度擋下,前景請求可以送出
+    scheduler = _scheduler_at(remaining=20)
+    seen = []
+
+    async def load():
+        await asyncio.sleep(0.01)
+        seen.append(current_priority())
+        await scheduler.acquire()
+        return "done"
+
+    assert _background_then_interactive(load, join=True) == ("done", "done")
+    assert seen == [Priority.INTERACTIVE]
+    assert scheduler.budget().remaining == 19
+
+
+def test_background_call_without_interactive_joiner_keeps_the_reserve():
+    scheduler = _scheduler_at(remaining=20)
+
+    async def load():
+        await asyncio.sleep(0.01)
+        await scheduler.acquire()
+
+    with pytest.raises(RateLimitError, match="reserved"):
+        _background_then_interactive(load, join=False)
+
+
+def test_nested_call_follows_the_outer_call_priority():
+    seen = []
+
+    async def inner():
+        await asyncio.sleep(0.01)
+        seen.append(current_priority())
+
+    async def scenario():
+        flight, nested = SingleFlight(), SingleFlight()
+
+        async def outer():
+            await nested.do("inner", inner)
+
+        async def background():
+            set_priority(Priority.BACKGROUND)
+            await flight.do("outer", outer)
+
+        task = asyncio.ensure_future(background())
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await flight.do("outer", outer)
+        await task
+
+    asyncio.run(scenario())
+
+    assert seen == [Priority.INTERACTIVE]
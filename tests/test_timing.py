@@ -0,0 +1,92 @@
+# 請求耗時分解與慢請求分析器測試
+# Server-Timing 標頭的格式、TimedJSONResponse 的 encode 階段,以及分析器的啟用/停用
+
+import re
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import metrics
+from src import timing
+from src.timing import count_event, timed_phase
+
+_ENTRY = re.compile(r'^[a-z_]+(;dur=\d+\.\d{2})?(;desc="\d+x?")?$')
+
+
+def _spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _app(delay: float = 0.0) -> FastAPI:
+    app = FastAPI(default_response_class=metrics.TimedJSONResponse)
+
+    @app.get("/work")
+    async def work():
+        with timed_phase("upstream"):
+            # 佔用 event loop 執行緒,讓分析器取樣得到這個函式
+            _spin(delay)
+        count_event("cache_miss")
+        return {"ok": True}
+
+    app.add_middleware(metrics.ServerTimingMiddleware)
+    return app
+
+
+@pytest.fixture
+def timing_enabled(monkeypatch):
+    monkeypatch.setattr(timing, "TIMING_ENABLED", True)
+    monkeypatch.setattr(metrics, "TIMING_ENABLED", True)
+
+
+@pytest.fixture
+def profile_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("REQUEST_PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("REQUEST_PROFILE_INTERVAL_MS", "1")
+    monkeypatch.delenv("REQUEST_PROFILE_THRESHOLD_MS", raising=False)
+    return tmp_path
+
+
+def test_server_timing_header_lists_phases_and_total(timing_enabled, profile_dir):
+    response = TestClient(_app()).get("/work")
+
+    header = response.headers["Server-Timing"]
+    entries = [entry.strip() for entry in header.split(",")]
+    assert all(_ENTRY.match(entry) for entry in entries), header
+    names = [entry.split(";")[0] for entry in entries]
+    assert names[-1] == "total"
+    assert {"upstream", "encode", "cache_miss"} <= set(names)
+    assert 'cache_miss;desc="1"' in entries
+
+
+def test_no_header_when_timing_is_disabled(profile_dir):
+    response = TestClient(_app()).get("/work")
+
+    assert response.json() == {"ok": True}
+    assert "Server-Timing" not in response.headers
+
+
+def test_profiler_writes_folded_stacks_for_slow_requests(profile_dir, monkeypatch):
+    monkeypatch.setenv("REQUEST_PROFILE_THRESHOLD_MS", "10")
+
+    TestClient(_app(delay=0.05)).get("/work")
+
+    files = list(profile_dir.iterdir())
+    assert len(files) == 1
+    assert files[0].name.endswith("ms.folded")
+    assert "work" in files[0].name
+    stacks = files[0].read_text().splitlines()
+    assert any("test_timing:_app.<locals>.work" in line for line in stacks)
+    assert all(re.match(r"^\S+ \d+$", line) for line in stacks)
+
+
+def test_profiler_skips_fast_requests_and_is_off_by_default(profile_dir, monkeypatch):
+    assert metrics.ServerTimingMiddleware(_app()).profiler is None
+
+    monkeypatch.setenv("REQUEST_PROFILE_THRESHOLD_MS", "10000")
+    TestClient(_app(delay=0.01)).get("/work")
+
+    assert list(profile_dir.iterdir()) == []
@@ -0,0 +1,107 @@
+# token 池測試
+# 挑選剩餘額度最多 (同額度時請求數最少) 的 token,並隔離 401 與額度用盡的 token
+
+import time
+
+import pytest
+
+from src.github_client import AuthenticationError, RateLimitError
+from src.token_pool import TokenPool
+
+
+def _set_remaining(state, remaining: int) -> None:
+    budget = state.scheduler.budget()
+    budget.limit = 5000
+    budget.remaining = remaining
+    budget.reset_at = time.time() + 3600
+
+
+def test_duplicate_tokens_are_merged():
+    assert len(TokenPool(["a", "b", "a"])) == 2
+
+
+def test_empty_pool_requires_a_token():
+    with pytest.raises(AuthenticationError):
+        TokenPool([])
+
+
+def test_from_env_reads_comma_and_newline_separated_tokens(monkeypatch, tmp_path):
+    path = tmp_path / "tokens"
+    path.write_text("a\nb,c\n\n")
+    monkeypatch.setenv("GITHUB_TOKENS_FILE", str(path))
+
+    assert len(TokenPool.from_env()) == 3
+
+    monkeypatch.setenv("GITHUB_TOKENS", "x, y")
+    assert len(TokenPool.from_env()) == 2
+    assert len(TokenPool.from_env(token="z")) == 1
+
+
+def test_selects_the_token_with_most_remaining_budget():
+    pool = TokenPool(["a", "b", "c"])
+    a, b, c = pool._states
+    _set_remaining(a, 100)
+    _set_remaining(b, 4000)
+    _set_remaining(c, 2000)
+
+    assert pool.select() is b
+
+
+def test_unseen_token_is_tried_first():
+    pool = TokenPool(["a", "b"])
+    _set_remaining(pool._states[0], 4999)
+
+    assert pool.select() is pool._states[1]
+
+
+def test_ties_go_to_the_least_used_token():
+    pool = TokenPool(["a", "b", "c"])
+    for state, requests in zip(pool._states, (3, 1, 2)):
+        _set_remaining(state, 1000)
+        state.requests = requests
+
+    assert pool.select().token == "b"
+
+
+def test_quarantined_token_is_skipped_until_its_deadline():
+    pool = TokenPool(["a", "b"])
+    a, b = pool._states
+    _set_remaining(a, 4000)
+    _set_remaining(b, 10)
+
+    assert pool.quarantine_rate_limited(a, until=time.time() + 60)
+    assert pool.select() is b
+
+    a.quarantined_until = time.time() - 1
+    assert pool.select() is a
+
+
+def test_all_tokens_unauthorized_raises_authentication_error():
+    pool = TokenPool(["a", "b"])
+    for state in pool._states:
+        pool.quarantine_unauthorized(state)
+
+    with pytest.raises(AuthenticationError):
+        pool.select()
+
+
+def test_all_tokens_rate_limited_raises_with_earliest_reset():
+    pool = TokenPool(["a", "b"])
+    now = time.time()
+    pool.quarantine_rate_limited(pool._states[0], until=now + 120)
+    pool.quarantine_unauthorized(pool._states[1])
+
+    with pytest.raises(RateLimitError) as excinfo:
+        pool.select()
+
+    assert excinfo.value.reset_at == pytest.approx(now + 120)
+
+
+def test_single_token_is_never_quarantined():
+    pool = TokenPool(["only"])
+    state = pool.select()
+
+    assert not pool.quarantine_unauthorized(state)
+    assert not pool.quarantine_rate_limited(state, until=time.time() + 60)
+    assert pool.select() is state
+    assert pool.stats()["token-1"]["quarantine_reason"] == ""
@@ -1,2 +1,95 @@
 # MCP Tools 測試模組
 # 包含所有工具的單元測試
+
+import asyncio
+
+import httpx
+import pytest
+
+from src import server
+from tests.conftest import make_client
+
+
+class _GitHub:
+    """回傳倉庫與貢獻者的假 GitHub REST API;missing / limited 中的倉庫回應 404 / 429"""
+
+    def __init__(self, missing=(), limited=()):
+        self.missing = set(missing)
+        self.limited = set(limited)
+        self.requests: list[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append(path)
+        name = "/".join(path.split("/")[2:4])
+        if name in self.missing:
+            return httpx.Response(404, json={"message": "Not Found"})
+        if name in self.limited:
+            return httpx.Response(429, headers={"Retry-After": "60"})
+        if path.endswith("/contributors"):
+            return httpx.Response(200, json=[{
+                "login": "alice",
+                "contributions": 7,
+                "avatar_url": "https://avatars/alice",
+                "html_url": "https://github.com/alice",
+            }])
+        return httpx.Response(200, json={
+            "stargazers_count": 5,
+            "forks_count": 1,
+            "open_issues_count": 0,
+            "subscribers_count": 2,
+            "description": "",
+            "language": "Python",
+            "created_at": "2020-01-01T00:00:00Z",
+            "updated_at": "2024-01-01T00:00:00Z",
+            "default_branch": "main",
+        })
+
+
+def _analyze(handler, monkeypatch, arguments):
+    # 工具測的是逐項結果,不經過 GraphQL 合併查詢
+    monkeypatch.setenv("GITHUB_GRAPHQL_BATCH", "0")
+
+    async def scenario():
+        async with make_client(handler) as client:
+            monkeypatch.setattr(server, "github_client", client)
+            return await server.handle_analyze_repositories(arguments)
+
+    return asyncio.run(scenario())
+
+
+def test_analyze_repositories_combines_facets_per_repository(monkeypatch):
+    handler = _GitHub(missing={"octo/gone"}, limited={"octo/busy"})
+
+    result = _analyze(handler, monkeypatch, {
+        "repositories": ["octo/a", "octo/gone", "octo/a", "octo/busy"],
+        "facets": ["stats", "contributors"],
+    })
+
+    assert result["facets"] == ["stats", "contributors"]
+    repositories = result["repositories"]
+    # 重複的倉庫只分析一次,並保留第一次出現的順序
+    assert list(repositories) == ["octo/a", "octo/gone", "octo/busy"]
+    assert handler.requests.count("/repos/octo/a") == 1
+    assert repositories["octo/a"]["stats"]["stars"] == 5
+    assert repositories["octo/a"]["contributors"] == [{"login": "alice", "contributions": 7}]
+    # 不存在的倉庫合併成一筆錯誤;其他錯誤逐一面向回報
+    assert repositories["octo/gone"] == {"error": "Repository not found"}
+    assert repositories["octo/busy"]["stats"]["error"] == "GitHub API rate limit exceeded"
+    assert repositories["octo/busy"]["contributors"]["retry_after_seconds"] > 0
+
+
+@pytest.mark.parametrize("arguments, message", [
+    ({"repositories": []}, "非空"),
+    ({"repositories": ["octo"]}, "owner/repo"),
+    ({"repositories": ["octo/a/b"]}, "owner/repo"),
+    ({"repositories": ["octo/a"], "facets": ["stars"]}, "stars"),
+    ({"repositories": ["octo/a"], "limit": 0}, "limit"),
+])
+def test_analyze_repositories_rejects_invalid_arguments(monkeypatch, arguments, message):
+    handler = _GitHub()
+
+    with pytest.raises(ValueError, match=message):
+        _analyze(handler, monkeypatch, arguments)
+
+    assert handler.requests == []
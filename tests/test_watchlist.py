@@ -0,0 +1,206 @@
+# 關注清單預取器測試
+# 預取只延長 TTL 長於刷新間隔的項目、commit 列表依 TTL 另外刷新、行數統計只在 push 後重新取得、
+# 前景請求加入預取時以前景優先權送出,以及刷新失敗時的退避與紀錄
+
+import asyncio
+import logging
+import time
+
+import httpx
+
+from src.ratelimit import Priority, set_priority
+from src.watchlist import WatchedRepository, WatchlistRefresher, read_watchlist
+from tests.conftest import make_client
+
+REPOSITORY = {
+    "stargazers_count": 5,
+    "forks_count": 1,
+    "open_issues_count": 0,
+    "subscribers_count": 2,
+    "description": "",
+    "language": "Python",
+    "created_at": "2020-01-01T00:00:00Z",
+    "updated_at": "2024-01-01T00:00:00Z",
+    "pushed_at": "2024-01-01T00:00:00Z",
+    "default_branch": "main",
+}
+
+
+def github(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path == "/graphql":
+        return httpx.Response(200, json={"errors": [{"message": "unavailable"}]})
+    if path == "/repos/octo/repo":
+        return httpx.Response(200, json=REPOSITORY)
+    if path == "/repos/octo/repo/languages":
+        return httpx.Response(200, json={"Python": 100})
+    return httpx.Response(200, json=[])
+
+
+def _expiries(client) -> dict[str, float]:
+    """每個方法在 L1 中的剩餘 TTL (秒)"""
+    now = time.time()
+    return {key[0]: entry.expires_at - now for key, entry in client._cache._entries.items()}
+
+
+def test_read_watchlist_merges_duplicates_and_comments():
+    repositories = read_watchlist("octo/repo, Octo/Repo\n# comment\nother/x  # trailing")
+
+    assert [(w.owner, w.repo) for w in repositories] == [("octo", "repo"), ("other", "x")]
+
+
+def test_refresh_stretches_only_methods_that_outlive_the_interval():
+    async def scenario():
+        async with make_client(github) as client:
+            refresher = WatchlistRefresher(client, [], min_interval=200)
+            watched = WatchedRepository("octo", "repo", interval=200)
+            await refresher.refresh(watched)
+            return _expiries(client), refresher
+
+    expiries, refresher = asyncio.run(scenario())
+
+    assert refresher.refreshes == 1
+    # 統計 (300 秒) 長於間隔,延長到間隔的兩倍;語言 (6 小時) 維持原本的 TTL
+    assert 395 < expiries["get_repo_statistics"] <= 400
+    assert expiries["get_language_bytes"] > 6 * 3600 - 5
+    # commit 列表 (60 秒) 維持即時,不隨預取延長
+    assert expiries["get_commit_page"] <= 60
+    assert expiries["get_pushed_at"] <= 60
+
+
+def test_interactive_request_joining_a_refresh_is_not_held_to_the_background_reserve():
+    async def scenario():
+        async with make_client(github) as client:
+            # 剩 20%:背景請求被 25% 的保留額度擋下,前景請求仍可送出
+            scheduler = client._tokens.select("core").scheduler
+            budget = scheduler.budget()
+            budget.limit, budget.remaining, budget.reset_at = 100, 20, time.time() + 3600
+            acquire = scheduler.acquire
+
+            async def delayed_acquire(*args):
+                # 延後送出,讓前景請求在預取送出前加入
+                await asyncio.sleep(0.05)
+                await acquire(*args)
+
+            scheduler.acquire = delayed_acquire
+            refresher = WatchlistRefresher(client, [])
+
+            async def background():
+                set_priority(Priority.BACKGROUND)
+                await refresher.refresh(WatchedRepository("octo", "repo"))
+
+            task = asyncio.ensure_future(background())
+            await asyncio.sleep(0.01)
+            stats = await client.get_repo_statistics("octo", "repo")
+            await task
+            return stats, client.cache_stats(), refresher
+
+    stats, cache_stats, refresher = asyncio.run(scenario())
+
+    assert stats["stars"] == 5
+    assert cache_stats["coalesced"] >= 1
+    # 預取的其他查詢仍以背景優先權送出,被保留額度擋下
+    assert refresher.failures == 1
+
+
+def test_api_errors_back_off_without_logging(caplog):
+    def failing(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused")
+
+    async def scenario():
+        async with make_client(failing) as client:
+            refresher = WatchlistRefresher(client, [], min_interval=60)
+            watched = WatchedRepository("octo", "repo")
+            await refresher.refresh(watched)
+            return refresher, watched
+
+    with caplog.at_level(logging.ERROR, logger="src.watchlist"):
+        refresher, watched = asyncio.run(scenario())
+
+    assert refresher.failures == 1
+    assert watched.failures == 1
+    assert watched.next_due > time.monotonic() + 60
+    assert caplog.records == []
+
+
+def test_unexpected_errors_are_logged_and_backed_off(caplog):
+    def broken(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/graphql":
+            return github(request)
+        # 缺少必要欄位:解析時拋出 KeyError
+        return httpx.Response(200, json={})
+
+    async def scenario():
+        async with make_client(broken) as client:
+            refresher = WatchlistRefresher(client, [])
+            watched = WatchedRepository("octo", "repo")
+            await refresher.refresh(watched)
+            return refresher, watched
+
+    with caplog.at_level(logging.ERROR, logger="src.watchlist"):
+        refresher, watched = asyncio.run(scenario())
+
+    assert refresher.failures == 1
+    assert watched.failures == 1
+    assert "octo/repo" in caplog.text
+    assert caplog.records[0].exc_info is not None
+
+
+class _Pushes:
+    """github() 加上可變的 pushed_at,並記錄每個請求的路徑"""
+
+    def __init__(self):
+        self.pushed_at = "2024-01-01T00:00:00Z"
+        self.paths: list[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        if request.url.path == "/repos/octo/repo":
+            return httpx.Response(200, json={**REPOSITORY, "pushed_at": self.pushed_at})
+        return github(request)
+
+
+def test_commit_lists_are_refreshed_before_their_ttl_expires():
+    handler = _Pushes()
+
+    async def scenario():
+        async with make_client(handler) as client:
+            refresher = WatchlistRefresher(client, [], min_interval=3600)
+            watched = WatchedRepository("octo", "repo", interval=3600)
+            await refresher.refresh(watched)
+            after_full = (watched.next_due, watched.commits_due, _expiries(client))
+            handler.paths.clear()
+            # 只有 commit 列表到期:不重新整理其他項目
+            watched.commits_due = 0
+            await refresher.refresh(watched)
+            return refresher, after_full, list(handler.paths)
+
+    started = time.monotonic()
+    refresher, (next_due, commits_due, expiries), paths = asyncio.run(scenario())
+
+    assert refresher.commits_interval == 45
+    assert next_due >= started + 3600
+    # 下一次 commit 刷新排在項目過期之前
+    assert commits_due - started < expiries["get_commit_page"] <= 60
+    assert paths == ["/repos/octo/repo/commits"]
+
+
+def test_line_stats_are_refetched_only_after_a_push():
+    handler = _Pushes()
+
+    async def scenario():
+        async with make_client(handler) as client:
+            refresher = WatchlistRefresher(client, [])
+            watched = WatchedRepository("octo", "repo")
+            counts = []
+            for pushed_at in ("2024-01-01T00:00:00Z", "2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z"):
+                handler.pushed_at = pushed_at
+                watched.next_due = 0
+                await refresher.refresh(watched)
+                counts.append(handler.paths.count("/repos/octo/repo/stats/contributors"))
+            return counts, refresher
+
+    counts, refresher = asyncio.run(scenario())
+
+    assert counts == [1, 1, 2]
+    assert refresher.failures == 0